@@ -1,21 +1,32 @@
-import time
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
 import io
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 import requests
 import fitz  # PyMuPDF
 import re
 import os
-import json
+from functools import partial
 import google.generativeai as genai
-from fpdf import FPDF
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import PIL.Image  # Görsel işleme için
+from batch_runner import StageLimiter, call_with_backoff
+from gemini_cache import get_cache
+from drive_index import FolderIndex
+from drive_manifest import FolderManifest
+from drive_placement import PLACEMENT_COPY, link_into, placement_mode, resolve_target
+from sheet_writer import ProcessedWriteBack
+from google_clients import GoogleClients, pdf_media
+from download_client import DownloadClient
+from blob_cache import BlobCache, DEFAULT_CACHE_DIR
+from pdf_text import TextExtractor
+from ocr_fallback import render_for_vision
+from cv_pdf import create_standardized_pdf, find_font_path
+from job_store import Checkpoint, JobRunner, JobStore, DEFAULT_JOB_DB
+from pipeline import Pipeline, Stage, DEFAULT_QUEUE_SIZE
+from metrics import METRICS
+from memory_budget import MemoryBudget, DEFAULT_PER_CANDIDATE_MB
+from sheet_sync import SheetSync, DEFAULT_FULL_READ_INTERVAL, DEFAULT_SNAPSHOT_PATH
+from rate_limit import RATE_LIMITS, estimate_tokens, record_gemini_usage
+from gemini_batch import (GeminiBatcher, DEFAULT_BATCH_SIZE, DEFAULT_BATCH_TOKENS, DEFAULT_LINGER, json_config,
+                          parse_json_text)
 
 # ==========================================
 # ⚙️ AYARLAR
@@ -24,6 +35,10 @@ import PIL.Image  # Görsel işleme için
 CREDENTIALS_FILE = 'credentials.json'
 SHEET_NAME = 'İZMİR CV Form'
 ALLOWED_CATEGORIES = ["Teacher","Engineering", "Marketing", "HR", "Finance", "Sales", "IT", "Design"]
+GEMINI_MODEL = 'gemini-3-flash-preview'
+# Prompt değiştiğinde bu sürümü artırın; eski önbellek kayıtları otomatik geçersiz olur.
+PROMPT_VERSION = f"cv-enhance-v2:{','.join(ALLOWED_CATEGORIES)}"
+BULK_JOB = "bulk_upload"  # iş tablosundaki tür adı
 
 if "processing" not in st.session_state:
     st.session_state.processing = False
@@ -50,529 +65,695 @@ COLUMN_NAME = "Ad ve Soyad"
 COLUMN_DEPARTMENT = "Hangi alanda staja başvurmak istiyorsunuz ?"
 COLUMN_IS_PROCESSED = "IsProcessed"
 
+if find_font_path() is None:
+    st.warning("⚠️ Türkçe font dosyası bulunamadı. Karakterler dönüştürülüyor.")
 
-def get_drive_service():
-    scopes = ["https://www.googleapis.com/auth/drive"]
-    if "gcp_service_account" in st.secrets:
-        creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scopes)
-    else:
-        creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=scopes)
-    return build('drive', 'v3', credentials=creds)
 
+@st.cache_resource
+def get_stage_limiter():
+    """Toplu işlemde indirme / LLM / Drive aşamalarının eşzamanlılık sınırları."""
+    general = st.secrets["general"]
+    return StageLimiter({
+        "download": general.get("download_concurrency", 8),
+        "llm": general.get("llm_concurrency", 4),
+        "drive": general.get("drive_concurrency", 4),
+    })
 
-def get_or_create_drive_folder(service, folder_name, parent_id):
-    # Klasör ismindeki gereksiz boşlukları temizle
-    folder_name = folder_name.strip()
 
-    # Mevcut klasörü aramak için daha sağlam bir sorgu
-    query = (f"name = '{folder_name}' and "
-             f"mimeType = 'application/vnd.google-apps.folder' and "
-             f"trashed = false and "
-             f"'{parent_id}' in parents")
+def get_gemini_cache():
+    """Tüm entry point'lerin paylaştığı disk önbelleği (Gemini sonuçları)."""
+    general = st.secrets["general"]
+    cache_mb = general.get("gemini_cache_mb")
+    return get_cache(general.get("gemini_cache_path"), int(cache_mb) * 1024 * 1024 if cache_mb else None)
+
+
+@st.cache_resource
+def get_google_clients():
+    """Tüm oturum ve iş parçacıklarının paylaştığı Drive/Sheets istemci fabrikası."""
+    if "gcp_service_account" in st.secrets:
+        return GoogleClients.from_info(st.secrets["gcp_service_account"])
+    return GoogleClients.from_file(CREDENTIALS_FILE)
 
+
+def get_drive_service():
+    """Çağıran iş parçacığına ait, bağlantısı açık tutulan Drive servisi."""
+    return get_google_clients().drive()
+
+
+@st.cache_resource
+def get_rate_limits():
+    """Servis kotaları (dakikalık); tüm oturumlar ve işçiler aynı kovaları paylaşır."""
+    general = st.secrets["general"]
+    RATE_LIMITS.configure("gemini", general.get("gemini_rpm"), general.get("gemini_tpm"))
+    RATE_LIMITS.configure("drive", general.get("drive_rpm"))
+    RATE_LIMITS.configure("sheets", general.get("sheets_rpm"))
+    RATE_LIMITS.configure("typeform", general.get("typeform_rpm"))
+    RATE_LIMITS.configure("typeform_files", general.get("typeform_files_rpm"))
+    return RATE_LIMITS
+
+
+@st.cache_resource
+def get_memory_budget():
+    """`memory_budget_mb` verilirse yeni adaylar ancak süreç RSS'i bütçeye sığınca hatta alınır."""
+    general = st.secrets["general"]
+    if not general.get("memory_budget_mb"):
+        return None
+    return MemoryBudget(general["memory_budget_mb"],
+                        general.get("memory_per_candidate_mb", DEFAULT_PER_CANDIDATE_MB))
+
+
+@st.cache_resource
+def get_download_client():
+    """Typeform indirmeleri için havuzlu, yeniden deneyen ortak oturum (yerel PDF deposuyla)."""
+    general = st.secrets["general"]
+    blob_cache = BlobCache(general.get("blob_cache_dir", DEFAULT_CACHE_DIR),
+                           int(general.get("blob_cache_mb", 2048)) * 1024 * 1024)
+    return DownloadClient(pool_size=general.get("download_concurrency", 8),
+                          timeout=general.get("download_timeout", 60),
+                          blob_cache=blob_cache,
+                          rate_limit=get_rate_limits()["typeform_files"])
+
+
+@st.cache_resource
+def get_text_extractor():
+    """Sayfa/karakter bütçeli metin çıkarma; belgeler süreç havuzuna dağıtılır."""
+    general = st.secrets["general"]
+    return TextExtractor(workers=general.get("text_workers", min(4, os.cpu_count() or 1)),
+                         max_pages=general.get("text_max_pages", 4),
+                         max_chars=general.get("text_max_chars", 20000))
+
+
+@st.cache_resource
+def get_folder_index():
+    """Oturumlar boyunca sıcak tutulan klasör indeksi; kök ve havuz bir kez listelenir."""
+    index = FolderIndex()
+    general = st.secrets["general"]
     try:
-        results = service.files().list(
-            q=query,
-            spaces='drive',
-            fields='files(id, name)',
-            supportsAllDrives=True,
-            includeItemsFromAllDrives=True
-        ).execute().get('files', [])
-
-        if results:
-            # Eğer birden fazla bulunduysa, ilkini (en eskisini) döndür
-            return results[0]['id']
-
-        # Bulunamadıysa yeni oluştur
-        meta = {
-            'name': folder_name,
-            'mimeType': 'application/vnd.google-apps.folder',
-            'parents': [parent_id]
-        }
-        folder = service.files().create(
-            body=meta,
-            fields='id',
-            supportsAllDrives=True
-        ).execute()
-
-        return folder.get('id')
+        service = get_drive_service()
+        for parent_id in (general.get("root_folder_id"), general.get("pool_folder_id")):
+            index.warm(service, parent_id)
+    except Exception as e:
+        # Isınma başarısız olsa da indeks ıskada kendini tazeler
+        st.warning(f"⚠️ Drive klasörleri önceden listelenemedi: {e}")
+    return index
+
 
+@st.cache_resource
+def get_job_store():
+    """Toplu işlerin ve aday aşamalarının kalıcı kaydı; tarayıcı yenilemesi ve yeniden başlatmaya dayanır."""
+    return JobStore(st.secrets["general"].get("job_db_path", DEFAULT_JOB_DB))
+
+
+@st.cache_resource
+def get_job_runner():
+    """Betik iş parçacığından bağımsız arka plan yürütücüsü (süreç başına bir tane)."""
+    return JobRunner(get_job_store())
+
+
+def report_error(text, notify=None):
+    """Hat iş parçacıklarında `st.error` ekrana ulaşmaz; mesaj adayın kaydına (`notify`) gider."""
+    if notify is not None:
+        notify("error", text)
+    else:
+        st.error(text)
+
+
+def get_or_create_drive_folder(service, folder_name, parent_id, notify=None):
+    # Klasör ismindeki boşluklar indeks tarafından temizlenir; API'ye sadece ıskada gidilir
+    try:
+        return get_folder_index().get_or_create(service, folder_name, parent_id)
     except Exception as e:
-        st.error(f"Klasör işlemi sırasında hata: {e}")
+        report_error(f"Klasör işlemi sırasında hata: {e}", notify)
         return parent_id  # Hata olursa ana klasöre yükle
 
 
-def upload_to_drive(service, file_bytes, file_name, categories):
-    root_id = st.secrets["general"].get("root_folder_id")
-    final_categories = categories if categories else ["Others"]
-
-    for cat in final_categories:
-        folder_id = get_or_create_drive_folder(service, cat, root_id)
+@st.cache_resource
+def get_drive_manifest():
+    """Klasör başına tek listelemeyle tutulan ad → fileId görüntüsü."""
+    return FolderManifest(max_age=st.secrets["general"].get("drive_manifest_ttl", 600))
+
+
+def upload_if_missing(service, folder_id, file_name, file_bytes):
+    """Klasörde aynı isimde dosya yoksa yükler; kontrol manifestten yapılır.
+
+    `file_bytes` bayt ya da (indirilen PDF gibi) aranabilir bir dosya nesnesi olabilir.
+    Klasördeki (mevcut ya da yeni yüklenen) dosyanın kimliğini döndürür.
+    """
+    manifest = get_drive_manifest()
+    existing_id = manifest.find(service, folder_id, file_name)
+    if existing_id:
+        # Dosya zaten varsa üstüne yazmak yerine atla
+        return existing_id
+
+    stream = file_bytes if hasattr(file_bytes, "read") else io.BytesIO(file_bytes)
+    media, size = pdf_media(stream)
+    file_meta = {'name': file_name, 'parents': [folder_id]}
+    created = call_with_backoff(service.files().create(body=file_meta, media_body=media, fields='id',
+                                                       supportsAllDrives=True).execute,
+                                limit=get_rate_limits()["drive"])
+    METRICS.inc("bytes", size, direction="out", upstream="drive")
+    file_id = created.get('id')
+    if not file_id:
+        raise RuntimeError(f"Drive yüklemesi dosya kimliği döndürmedi: {file_name}")
+    manifest.record(folder_id, file_name, file_id)
+    return file_id
+
+
+def place_in_folders(service, folder_ids, file_name, file_bytes):
+    """Dosyayı tüm klasörlerde `file_name` adıyla görünür kılar.
+
+    `drive_placement` ayarı "copy" ise (varsayılan) her klasöre ayrı yüklenir.
+    "shortcut" / "parents" ise dosya bir kez (ilk klasöre) yüklenir, diğer
+    klasörlere aynı adlı kısayol ya da ek üst klasör olarak bağlanır; klasör
+    düzeni değişmez. Önceki çalıştırmada yüklenmiş dosya yeniden yüklenmez.
+    """
+    mode = placement_mode(st.secrets["general"].get("drive_placement"))
+    # Tüm klasörler aynı tamponu okur; klasör başına kopya yok
+    stream = file_bytes if hasattr(file_bytes, "read") else io.BytesIO(file_bytes)
+    # Klasör oluşturma hatasında aynı üst klasör birden çok kez gelebilir
+    folder_ids = list(dict.fromkeys(folder_ids))
+    if mode == PLACEMENT_COPY:
+        for folder_id in folder_ids:
+            upload_if_missing(service, folder_id, file_name, stream)
+        return
+
+    manifest = get_drive_manifest()
+    existing = {folder_id: manifest.find(service, folder_id, file_name) for folder_id in folder_ids}
+    missing = [folder_id for folder_id in folder_ids if not existing[folder_id]]
+    if not missing:
+        return
+    present = next((file_id for file_id in existing.values() if file_id), None)
+    if present is None:
+        target_id = upload_if_missing(service, missing[0], file_name, stream)
+        missing = missing[1:]
+    else:
+        # Klasördeki öğe önceki çalıştırmanın kısayolu olabilir; gerçek dosyaya bağlarız
+        target_id = resolve_target(service, present)
+    if not target_id:
+        raise RuntimeError(f"{file_name} için bağlanacak Drive dosyası bulunamadı")
+    for folder_id in missing:
+        manifest.record(folder_id, file_name, link_into(service, mode, target_id, folder_id, file_name))
 
-        # --- YENİ: Dosya Var mı Kontrolü ---
-        check_query = f"name = '{file_name}' and '{folder_id}' in parents and trashed = false"
-        existing_files = service.files().list(q=check_query, supportsAllDrives=True, includeItemsFromAllDrives=True).execute().get('files', [])
 
-        if existing_files:
-            # Dosya zaten varsa üstüne yazmak yerine atla veya güncelle
-            continue
+def upload_to_drive(service, file_bytes, file_name, categories, notify=None):
+    root_id = st.secrets["general"].get("root_folder_id")
+    final_categories = categories if categories else ["Others"]
 
-        media = MediaIoBaseUpload(io.BytesIO(file_bytes), mimetype='application/pdf')
-        file_meta = {'name': file_name, 'parents': [folder_id]}
-        service.files().create(body=file_meta, media_body=media, supportsAllDrives=True).execute()
+    folder_ids = [get_or_create_drive_folder(service, cat, root_id, notify) for cat in final_categories]
+    # Klasör çözülemezse get_or_create_drive_folder ana klasörü döndürür (hata adayın kaydına
+    # yazılmıştır); dosya sessizce köke düşmesin, aday "upload" nedeniyle düşüp yeniden denensin
+    if root_id in folder_ids:
+        return False
+    place_in_folders(service, folder_ids, file_name, file_bytes)
     return True
 
 # ==========================================
 # 🧠 YAPAY ZEKA & PDF OLUŞTURUCU
 # ==========================================
 
-@st.cache_data(show_spinner=False)
-def extract_data_with_gemini(text_content):
-    """Dağınık CV metnini standart JSON formatına çevirir."""
-
-    # 'flash' modeli en hızlısıdır.
-    model = genai.GenerativeModel('gemini-3-flash-preview')
-
-    # ALLOWED_CATEGORIES ve text_content değişkenlerinin tanımlı olduğunu varsayıyorum.
-
-    prompt = f"""
-        Act as a professional HR expert and Resume Writer. 
-        Your goal is to extract data from the provided CV and ENHANCE it to make the candidate stand out.
-
-        STRICT RULES FOR ENHANCEMENT:
-        1. PROFESSIONAL TONE: Use strong action verbs (e.g., "Spearheaded", "Optimized", "Engineered").
-        2. QUANTIFIABLE IMPACT: Transform descriptions into achievement-based statements using numerical data. If missing, use professional phrasing that implies significant scale or efficiency.
-        3. SUMMARY: Rewrite the 'summary' to be a powerful elevator pitch.
-        4. EXPERIENCE: Focus on results rather than duties.
-        5. ELEVATION & PRESTIGE: Elevate every task mentioned. Describe routine tasks in a way that reflects high responsibility, strategic importance, and leadership.
-        6. CHRONOLOGY: Precisely extract and format the start and end dates for each experience.
-
-        Pick one or more categories for 'suggested_categories' ONLY from this list: {ALLOWED_CATEGORIES}.
-        Return ONLY JSON. No markdown formatting.
-
-        JSON Schema:
-        {{
-            "name": "Full Name",
-            "suggested_categories": ["Category"],
-            "title": "Professional Title",
-            "location": "City",
-            "summary": "Enhanced professional summary",
-            "education": [{{ "degree": "", "school": "", "year": "" }}],
-            "experience": [{{ 
-                "role": "", 
-                "company": "", 
-                "start_date": "MM/YYYY or Year",
-                "end_date": "MM/YYYY, Year, or 'Present'",
-                "description": "Elevated and enhanced description with high-impact phrasing" 
-            }}],
-            "skills": {{ "tech": "List" }},
-            "spoken_languages": "List"
-        }}
-
-        CV TEXT:
-        {text_content}
-        """
-
-    try:
-        response = model.generate_content(prompt)
-        json_str = response.text.replace("```json", "").replace("```", "").strip()
-        return json.loads(json_str)
-    except Exception as e:
-        return None
+# Metin ve görsel (OCR) yolu aynı talimatları kullanır; CV metni/görselleri sona eklenir
+CV_PROMPT = f"""
+Act as a professional HR expert and Resume Writer. 
+Your goal is to extract data from the provided CV and ENHANCE it to make the candidate stand out.
+
+STRICT RULES FOR ENHANCEMENT:
+1. PROFESSIONAL TONE: Use strong action verbs (e.g., "Spearheaded", "Optimized", "Engineered").
+2. QUANTIFIABLE IMPACT: Transform descriptions into achievement-based statements using numerical data. If missing, use professional phrasing that implies significant scale or efficiency.
+3. SUMMARY: Rewrite the 'summary' to be a powerful elevator pitch.
+4. EXPERIENCE: Focus on results rather than duties.
+5. ELEVATION & PRESTIGE: Elevate every task mentioned. Describe routine tasks in a way that reflects high responsibility, strategic importance, and leadership.
+6. CHRONOLOGY: Precisely extract and format the start and end dates for each experience.
+
+Pick one or more categories for 'suggested_categories' ONLY from this list: {ALLOWED_CATEGORIES}.
+Return ONLY JSON. No markdown formatting.
+
+JSON Schema:
+{{
+    "name": "Full Name",
+    "suggested_categories": ["Category"],
+    "title": "Professional Title",
+    "location": "City",
+    "contact": "Contact line as written in the CV",
+    "summary": "Enhanced professional summary",
+    "education": [{{ "degree": "", "school": "", "year": "" }}],
+    "experience": [{{ 
+        "role": "", 
+        "company": "", 
+        "start_date": "MM/YYYY or Year",
+        "end_date": "MM/YYYY, Year, or 'Present'",
+        "description": "Elevated and enhanced description with high-impact phrasing" 
+    }}],
+    "projects": [{{ "name": "", "tech": "", "details": "" }}],
+    "certificates": [{{ "name": "", "issuer": "", "year": "" }}],
+    "skills": {{ "tech": "List" }},
+    "spoken_languages": "List",
+    "interests": "List"
+}}
+"""
+
+
+@st.cache_resource
+def get_gemini_batcher():
+    """Eşzamanlı işçilerin CV'lerini tek Gemini isteğinde toplayan ortak toplayıcı."""
+    general = st.secrets["general"]
+    return GeminiBatcher(GEMINI_MODEL, CV_PROMPT, limit=get_rate_limits()["gemini"], categories=ALLOWED_CATEGORIES,
+                         max_batch_size=general.get("gemini_batch_size", DEFAULT_BATCH_SIZE),
+                         max_batch_tokens=general.get("gemini_batch_tokens", DEFAULT_BATCH_TOKENS),
+                         linger=general.get("gemini_batch_linger", DEFAULT_LINGER),
+                         max_inflight=general.get("llm_concurrency", 4))
 
 
-class PDF(FPDF):
-    def __init__(self, font_family='Arial'):
-        super().__init__()
-        self.font_family = font_family
-
-    def header(self):
-        pass
-
-    def section_title(self, label):
-        # 'B' (Bold) için font ailesi desteği gerekir.
-        # Eğer özel font (DejaVu) kullanıyorsan ve Bold dosyasını yüklemediysen
-        # standart Arial'a düşebilir veya hata verebilir.
-        # Güvenlik için burada font_family değişkenini kullanıyoruz.
-        self.set_font(self.font_family, 'B', 12)
-        self.set_text_color(0, 51, 102)
-        self.cell(0, 10, label, 0, 1, 'L')
-        self.line(10, self.get_y(), 200, self.get_y())
-        self.ln(2)
-
-    def section_body(self, text):
-        self.set_font(self.font_family, '', 10)
-        self.set_text_color(0, 0, 0)
-        self.multi_cell(0, 5, text)
-        self.ln()
-
-
-def create_standardized_pdf(json_data):
-    """JSON verisinden PDF üretir (Özet ve Sertifikalar Eklendi)."""
-
-    # 1. Font Kontrolü
-    font_path = "DejaVuSans.ttf"
-    if not os.path.exists(font_path):
-        font_path = "Arial.ttf"
-
-    has_custom_font = os.path.exists(font_path)
-
-    # 2. PDF Başlatma
-    if has_custom_font:
-        pdf = PDF(font_family='TrFont')
-        # Normal, Bold, Italic, BoldItalic hepsi için aynı fontu tanımlıyoruz (Hata almamak için)
-        pdf.add_font('TrFont', '', font_path, uni=True)
-        pdf.add_font('TrFont', 'B', font_path, uni=True)
-        pdf.add_font('TrFont', 'I', font_path, uni=True)
-        pdf.add_font('TrFont', 'BI', font_path, uni=True)
-    else:
-        st.warning("⚠️ Türkçe font dosyası bulunamadı. Karakterler dönüştürülüyor.")
-        json_data = sanitize_json_recursively(json_data)
-        pdf = PDF(font_family='Arial')
-
-    pdf.add_page()
-    main_font = pdf.font_family
-
-    # --- ÜST BİLGİ (HEADER) ---
-    pdf.set_font(main_font, 'B', 16)
-    pdf.cell(0, 10, json_data.get('name', ''), 0, 1, 'C')
-
-    pdf.set_font(main_font, 'I', 12)
-    pdf.cell(0, 8, json_data.get('title', ''), 0, 1, 'C')
-
-    pdf.set_font(main_font, '', 10)
-    pdf.cell(0, 6, json_data.get('location', ''), 0, 1, 'C')
-
-    pdf.set_font(main_font, '', 9)
-    pdf.cell(0, 6, json_data.get('contact', ''), 0, 1, 'C')
-    pdf.ln(5)
-
-    # --- 🆕 SUMMARY (HAKKIMDA) ---
-    if json_data.get('summary'):
-        pdf.ln(5)  # Biraz boşluk
-        pdf.section_title('PROFESSIONAL SUMMARY')
-        pdf.section_body(json_data['summary'])
-
-    # --- EDUCATION ---
-    if json_data.get('education'):
-        pdf.section_title('EDUCATION')
-        for edu in json_data['education']:
-            pdf.set_font(main_font, 'B', 10)
-            pdf.cell(0, 5, f"{edu['degree']}", 0, 1)
-            pdf.set_font(main_font, '', 10)
-            pdf.cell(0, 5, f"{edu['school']} | {edu['year']}", 0, 1)
-            pdf.ln(2)
-
-    # --- EXPERIENCE ---
-    if json_data.get('experience'):
-        pdf.section_title('EXPERIENCE')
-        for exp in json_data['experience']:
-            pdf.set_font(main_font, 'B', 10)
-            pdf.write(5, f"{exp['role']} | ")
-            pdf.set_font(main_font, 'I', 10)
-            pdf.write(5, f"{exp['company']}")
-            pdf.ln(6)
-            pdf.set_font(main_font, '', 9)
-            pdf.multi_cell(0, 5, f"- {exp['description']}")
-            pdf.ln(3)
-
-    # --- PROJECTS ---
-    if json_data.get('projects'):
-        pdf.section_title('PROJECTS')
-        for proj in json_data['projects']:
-            pdf.set_font(main_font, 'B', 10)
-            pdf.write(5, f"{proj['name']}")
-            if proj.get('tech'):
-                pdf.set_font(main_font, 'I', 9)
-                pdf.write(5, f" ({proj['tech']})")
-            pdf.ln(6)
-            pdf.set_font(main_font, '', 9)
-            pdf.multi_cell(0, 5, f"{proj['details']}")
-            pdf.ln(3)
-
-    # --- 🆕 CERTIFICATES (SERTİFİKALAR) ---
-    if json_data.get('certificates'):
-        pdf.section_title('CERTIFICATES')
-        for cert in json_data['certificates']:
-            pdf.set_font(main_font, 'B', 10)
-            pdf.write(5, f"• {cert.get('name', '')}")
-
-            # Kurum ve Yıl bilgisi varsa parantez içinde ekleyelim
-            extras = []
-            if cert.get('issuer'): extras.append(cert['issuer'])
-            if cert.get('year'): extras.append(cert['year'])
-
-            if extras:
-                pdf.set_font(main_font, '', 10)
-                pdf.write(5, f" ({' - '.join(extras)})")
-
-            pdf.ln(5)
-        pdf.ln(2)
-
-    # --- SKILLS ---
-    if json_data.get('skills'):
-        pdf.section_title('TECHNICAL SKILLS')
-        skills = json_data['skills']
-        pdf.set_font(main_font, '', 10)
-        if isinstance(skills, dict):
-            for k, v in skills.items():
-                pdf.set_font(main_font, 'B', 10)
-                pdf.write(5, f"{k.capitalize()}: ")
-                pdf.set_font(main_font, '', 10)
-                pdf.write(5, v)
-                pdf.ln(5)
-        else:
-            pdf.multi_cell(0, 5, str(skills))
-        pdf.ln(2)
+def extract_data_with_gemini(text_content):
+    """Dağınık CV metnini standart JSON formatına çevirir (uygunsa başka CV'lerle aynı istekte).
 
-    # --- LANGUAGES ---
-    if json_data.get('spoken_languages'):
-        pdf.section_title('LANGUAGES')
-        pdf.section_body(json_data['spoken_languages'])
+    Sonuçlar disk önbelleğinde (gemini_cache) tutulur; hat iş parçacıklarından
+    çağrıldığı için Streamlit önbelleği kullanılmaz.
+    """
+    return get_gemini_batcher().extract(text_content)
 
-    # --- INTERESTS ---
-    if json_data.get('interests'):
-        pdf.section_title('INTERESTS')
-        pdf.section_body(json_data['interests'])
 
-    return pdf.output()
 # ==========================================
-# 🛠️ YARDIMCI FONKSİYONLAR
+# 🏭 ADAY HATTI (indir → çıkar → PDF → yükle → işaretle)
 # ==========================================
-def process_and_upload_single(name, row, service, cv_cols, silent=False):
-    token = str(row.get(COLUMN_TOKEN_ID, "NoToken"))
-    if str(row.get(COLUMN_IS_PROCESSED, "")).strip().lower() == "yes":
-          if not silent: st.warning(f"⚠️ {name} zaten işlenmiş.")
-          return False
+# Tekil buton da toplu iş de aynı aşamalı hattı kullanır (bkz. pipeline.py);
+# her aşama kendi eşzamanlılığıyla çalışır, aday sonraki aşamaya kuyrukla geçer.
 
-    pdf_url = ""
+def cv_url_of(row, cv_cols):
     for col in cv_cols:
         val = str(row.get(col, "")).strip()
         if "http" in val:
-            pdf_url = val
-            break
+            return val
+    return ""
 
-    if not pdf_url:
-        if not silent: st.error(f"{name} için CV Linki bulunamadı.")
-        return False
 
-    # --- YENİLENEN KISIM: Bağlantı Yönetimi ---
-    session = requests.Session()
-    # 3 kez deneme yap, hatalar arasında bekleme süresini artır
-    retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
+def stage_download(candidate, cv_cols, writeback):
+    row = candidate.payload["row"]
+    if not isinstance(row, pd.Series):
+        # Toplu işte satır iş tablosundan sözlük olarak gelir
+        row = pd.Series(row, name=candidate.payload.get("index"))
+    name, checkpoint = candidate.name, candidate.checkpoint
+    token = str(row.get(COLUMN_TOKEN_ID, "NoToken"))
+    candidate.data.update(row=row, token=token)
+
+    if str(row.get(COLUMN_IS_PROCESSED, "")).strip().lower() == "yes":
+        checkpoint.advance("marked")
+        return candidate.fail(f"⚠️ {name} zaten işlenmiş.", level="warning",
+                              reason="already_processed")
+
+    if checkpoint.reached("uploaded"):
+        # Dosyalar önceki çalıştırmada yüklendi; sadece Sheets işareti eksik
+        mark_row_processed(row, token, writeback, checkpoint, candidate.notify)
+        candidate.notify("success", f"✅ {name} daha önce yüklenmişti, işaretlendi.")
+        return candidate.finish()
+
+    pdf_url = cv_url_of(row, cv_cols)
+    if not pdf_url:
+        return candidate.fail(f"{name} için CV Linki bulunamadı.", reason="no_url")
 
     headers = {"Authorization": f"Bearer {st.secrets['general']['typeform_token']}"}
     try:
-        resp = requests.get(pdf_url, headers=headers, timeout=60)
-        
-        # 1. KONTROL: Dosya Typeform'dan başarıyla indirildi mi?
-        if resp.status_code == 200:
-            doc = fitz.open(stream=resp.content, filetype="pdf")
-            full_text = "".join([page.get_text() for page in doc])
-
-            cv_json = None
-
-            if len(full_text.strip()) > 50:
-                cv_json = extract_data_with_gemini(full_text)
-
-            if not cv_json or len(full_text.strip()) <= 50:
-                if not silent: st.info(f"🔍 {name} için metin okunamadı, görsel taraması (OCR) başlatılıyor...")
-                page = doc[0]
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                img = PIL.Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-                vision_model = genai.GenerativeModel('gemini-3-flash-preview') # Modeli güncelledik (daha kararlı)
-                
-                prompt = f"""
-                    Act as a professional HR expert and Resume Writer. 
-                    Your goal is to extract data from the provided CV and ENHANCE it to make the candidate stand out.
-            
-                    STRICT RULES FOR ENHANCEMENT:
-                    1. PROFESSIONAL TONE: Use strong action verbs (e.g., "Spearheaded", "Optimized", "Engineered").
-                    2. QUANTIFIABLE IMPACT: Transform descriptions into achievement-based statements using numerical data. If missing, use professional phrasing that implies significant scale or efficiency.
-                    3. SUMMARY: Rewrite the 'summary' to be a powerful elevator pitch.
-                    4. EXPERIENCE: Focus on results rather than duties.
-                    5. ELEVATION & PRESTIGE: Elevate every task mentioned. Describe routine tasks in a way that reflects high responsibility, strategic importance, and leadership.
-                    6. CHRONOLOGY: Precisely extract and format the start and end dates for each experience.
-            
-                    Pick one or more categories for 'suggested_categories' ONLY from this list: {ALLOWED_CATEGORIES}.
-                    Return ONLY JSON. No markdown formatting.
-            
-                    JSON Schema:
-                    {{
-                        "name": "Full Name",
-                        "suggested_categories": ["Category"],
-                        "title": "Professional Title",
-                        "location": "City",
-                        "summary": "Enhanced professional summary",
-                        "education": [{{ "degree": "", "school": "", "year": "" }}],
-                        "experience": [{{ 
-                            "role": "", 
-                            "company": "", 
-                            "start_date": "MM/YYYY or Year",
-                            "end_date": "MM/YYYY, Year, or 'Present'",
-                            "description": "Elevated and enhanced description with high-impact phrasing" 
-                        }}],
-                        "skills": {{ "tech": "List" }},
-                        "spoken_languages": "List"
-                    }}
-                    """
-                response = vision_model.generate_content([prompt, img])
-                
-                try:
-                    json_str = response.text.replace("```json", "").replace("```", "").strip()
-                    cv_json = json.loads(json_str)
-                except:
-                    cv_json = None
-
-            # 2. KONTROL: Yapay Zeka JSON üretebildi mi?
-            if cv_json:
-                new_pdf_bytes = create_standardized_pdf(cv_json)
-                raw_cats = cv_json.get("suggested_categories", ["Others"])
-                cats = list(set(raw_cats)) if isinstance(raw_cats, list) and len(raw_cats) > 0 else ["Others"]
-
-                success = upload_to_drive(service, new_pdf_bytes, f"{name}_Standart.pdf", cats)
-
-                pool_folder_id = st.secrets["general"].get("pool_folder_id")
-                if pool_folder_id:
-                    for cat in cats:
-                        cat_folder_id = get_or_create_drive_folder(service, cat, pool_folder_id)
-                        check_query = f"name = '{name}_Orijinal.pdf' and '{cat_folder_id}' in parents and trashed = false"
-                        existing = service.files().list(q=check_query, supportsAllDrives=True, includeItemsFromAllDrives=True).execute().get('files', [])
-                        if not existing:
-                            try:
-                                orig_media = MediaIoBaseUpload(io.BytesIO(resp.content), mimetype='application/pdf')
-                                orig_meta = {'name': f"{name}_Orijinal.pdf", 'parents': [cat_folder_id]}
-                                service.files().create(body=orig_meta, media_body=orig_media, supportsAllDrives=True).execute()
-                            except Exception as e:
-                                if not silent: st.warning(f"⚠️ {name} orijinal CV eklenirken hata: {e}")
-
-                # 3. KONTROL: Drive'a başarıyla yüklendi mi?
-                if success:
-                    mark_as_processed_in_sheet(token) # Sayfayı güncelleyen yeni fonksiyonumuz
-                    if not silent: st.success(f"✅ {name} yüklendi (Orijinal ve Standart)!")
-                    return True
-                else:
-                    if not silent: st.error("❌ Dosyalar Drive'a yüklenemedi.")
-            else:
-                if not silent: st.error("❌ Yapay zeka bu CV'den veri çıkaramadı. (JSON boş döndü)")
-        else:
-            if not silent: st.error(f"❌ Typeform'dan PDF indirilemedi! Hata Kodu: {resp.status_code}")
-
-    except Exception as e:
-        if not silent: st.error(f"❌ {name} işlenirken hata: {e}")
+        # Havuzlu, yeniden deneyen ortak oturum; dosya parça parça indirilir
+        with get_stage_limiter().stage("download"):
+            download = get_download_client().fetch(pdf_url, headers=headers)
     except requests.exceptions.ConnectionError:
-        if not silent: st.error(
-            f"🌐 Bağlantı hatası: İnternetinizi kontrol edin veya DNS kaynaklı bir sorun var ({name}).")
+        return candidate.fail(f"🌐 Bağlantı hatası: İnternetinizi kontrol edin veya DNS kaynaklı bir sorun var ({name}).",
+                              reason="connection")
     except requests.exceptions.Timeout:
-        if not silent: st.error(f"⏳ Zaman aşımı: Typeform sunucusu yanıt vermedi ({name}).")
-    except Exception as e:
-        if not silent: st.error(f"❌ Beklenmedik bir hata oluştu ({name}): {e}")
+        return candidate.fail(f"⏳ Zaman aşımı: Typeform sunucusu yanıt vermedi ({name}).", reason="timeout")
+    candidate.on_close(download.close)
+
+    # 1. KONTROL: Dosya Typeform'dan başarıyla indirildi mi?
+    if download.status_code != 200:
+        return candidate.fail(f"❌ Typeform'dan PDF indirilemedi! Hata Kodu: {download.status_code}",
+                              reason=f"http_{download.status_code}")
+    checkpoint.advance("downloaded")
+    candidate.data["download"] = download
+
+
+def stage_extract(candidate):
+    name, checkpoint = candidate.name, candidate.checkpoint
+    download = candidate.data["download"]
+    pdf_view = download.view()
+
+    # Aynı PDF daha önce işlendiyse (bu işte ya da önbellekte) Gemini'ye hiç gitmiyoruz
+    gemini_cache = get_gemini_cache()
+    cache_key = gemini_cache.make_key(pdf_view, GEMINI_MODEL, PROMPT_VERSION)
+    # JSON kipinden önce önbelleğe girmiş kayıtlar da aynı modele göre doğrulanır
+    cv_json = checkpoint.state.get("cv_json") or get_gemini_batcher().check(gemini_cache.get(cache_key))
+
+    if cv_json is None:
+        text_result = get_text_extractor().extract(download.path or pdf_view)
+        full_text = text_result.text
+        METRICS.observe("step_seconds", text_result.seconds, step="pdf_text")
+        candidate.messages.append(f"📄 Metin: {text_result.pages_read}/{text_result.page_count} sayfa, "
+                                  f"{text_result.chars} karakter, {text_result.seconds * 1000:.0f} ms")
+
+        if len(full_text.strip()) > 50:
+            # Eşzamanlı Gemini isteklerini toplayıcı sınırlar; aşamadaki diğer adaylar aynı isteğe katılır
+            cv_json = extract_data_with_gemini(full_text)
+
+        if not cv_json:
+            candidate.notify("info", f"🔍 {name} için metin okunamadı, görsel taraması (OCR) başlatılıyor...")
+            # Metin katmanı yoksa sadece boş sayfaları, Gemini metinde başarısız olduysa
+            # bütçedeki tüm sayfaları görsel olarak gönderiyoruz
+            if len(full_text.strip()) <= 50:
+                ocr_pages = text_result.empty_pages
+            else:
+                ocr_pages = list(range(text_result.pages_read))
+            with METRICS.timer("step_seconds", step="ocr_render"), fitz.open(stream=pdf_view, filetype="pdf") as doc:
+                vision = render_for_vision(doc, ocr_pages or [0],
+                                           st.secrets["general"].get("ocr_byte_budget_kb", 1536) * 1024)
+            candidate.messages.append(f"🖼️ OCR: {len(vision.pages)} sayfa, {vision.bytes // 1024} KB, "
+                                      f"DPI {vision.dpis}")
+
+            vision_model = genai.GenerativeModel(GEMINI_MODEL) # Modeli güncelledik (daha kararlı)
+
+            prompt = CV_PROMPT
+            with get_stage_limiter().stage("llm"):
+                gemini_limit = get_rate_limits()["gemini"]
+                cost = estimate_tokens(prompt, images=len(vision.parts))
+                batcher = get_gemini_batcher()
+                response = call_with_backoff(vision_model.generate_content, [prompt, *vision.parts],
+                                             generation_config=json_config(batcher.schema),
+                                             limit=gemini_limit, cost=cost)
+                record_gemini_usage(gemini_limit, response, cost)
 
-    return False
-def sanitize_text(text):
-    """Türkçe karakterleri İngilizce karşılıklarına çevirir (Font yoksa kullanılır)."""
-    if not isinstance(text, str):
-        return str(text)
-
-    replacements = {
-        'Ş': 'S', 'ş': 's',
-        'Ğ': 'G', 'ğ': 'g',
-        'İ': 'I', 'ı': 'i',
-        'Ö': 'O', 'ö': 'o',
-        'Ü': 'U', 'ü': 'u',
-        'Ç': 'C', 'ç': 'c'
-    }
-    for tr, eng in replacements.items():
-        text = text.replace(tr, eng)
-    return text.encode('latin-1', 'replace').decode('latin-1')
-
-
-def sanitize_json_recursively(data):
-    """JSON içindeki tüm metinleri temizler."""
-    if isinstance(data, dict):
-        return {k: sanitize_json_recursively(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_json_recursively(i) for i in data]
-    elif isinstance(data, str):
-        return sanitize_text(data)
+            try:
+                cv_json = batcher.check(parse_json_text(response.text))
+            except ValueError:
+                cv_json = None
+
+        if cv_json:
+            gemini_cache.put(cache_key, cv_json)
+
+    # 2. KONTROL: Yapay Zeka JSON üretebildi mi?
+    if not cv_json:
+        return candidate.fail("❌ Yapay zeka bu CV'den veri çıkaramadı. (JSON boş döndü)", reason="no_json")
+    if not checkpoint.reached("extracted"):
+        checkpoint.advance("extracted", cv_json=cv_json)
+    candidate.data["cv_json"] = cv_json
+
+
+def stage_render(candidate):
+    checkpoint = candidate.checkpoint
+    rendered_path = checkpoint.state.get("rendered_path")
+    if checkpoint.reached("rendered") and rendered_path and os.path.exists(rendered_path):
+        with open(rendered_path, "rb") as f:
+            new_pdf_bytes = f.read()
     else:
-        return data
+        new_pdf_bytes = create_standardized_pdf(candidate.data["cv_json"])
+        rendered_path = checkpoint.artifact_path("_Standart.pdf")
+        if rendered_path:
+            with open(rendered_path, "wb") as f:
+                f.write(new_pdf_bytes)
+        checkpoint.advance("rendered", rendered_path=rendered_path)
+    candidate.notify("info", f"📄 {candidate.name}: standart PDF {len(new_pdf_bytes) / 1024:.1f} KB")
+    candidate.data.update(pdf_bytes=new_pdf_bytes, rendered_path=rendered_path)
+
+
+def stage_upload(candidate):
+    name, checkpoint, data = candidate.name, candidate.checkpoint, candidate.data
+    raw_cats = data["cv_json"].get("suggested_categories", ["Others"])
+    # Sıra korunur: tek yüklemeli yerleşimde dosyanın asıl yeri ilk kategoridir
+    cats = list(dict.fromkeys(raw_cats)) if isinstance(raw_cats, list) and len(raw_cats) > 0 else ["Others"]
+
+    # get_drive_service her iş parçacığına kendi bağlantısını verir
+    service = get_drive_service()
+    # Aşama eşzamanlılığı iş başınadır; süreç geneli sınır (birden fazla iş / tekil buton) limiter'da
+    with get_stage_limiter().stage("drive"):
+        success = upload_to_drive(service, data["pdf_bytes"], f"{name}_Standart.pdf", cats, candidate.notify)
 
-@st.cache_data(ttl=600, show_spinner=False)
-def load_data():
-    # 3 Kez deneme hakkı veriyoruz
-    max_retries = 3
+        pool_folder_id = st.secrets["general"].get("pool_folder_id")
+        if pool_folder_id:
+            pool_ids = [get_or_create_drive_folder(service, cat, pool_folder_id, candidate.notify) for cat in cats]
+            try:
+                place_in_folders(service, pool_ids, f"{name}_Orijinal.pdf", data["download"].fileobj())
+            except Exception as e:
+                candidate.notify("warning", f"⚠️ {name} orijinal CV eklenirken hata: {e}")
+
+    # 3. KONTROL: Drive'a başarıyla yüklendi mi?
+    if not success:
+        return candidate.fail("❌ Dosyalar Drive'a yüklenemedi.", reason="upload")
+    checkpoint.advance("uploaded")
+    # İşaretleme aşaması Sheets toplu yazımını bekleyebilir; PDF'ler o sırada bellekte durmasın
+    candidate.release("download", "pdf_bytes")
+    rendered_path = data.get("rendered_path")
+    if rendered_path and os.path.exists(rendered_path):
+        os.remove(rendered_path)
+
+
+def stage_mark(candidate, writeback):
+    data = candidate.data
+    mark_row_processed(data["row"], data["token"], writeback, candidate.checkpoint, candidate.notify)
+    candidate.notify("success", f"✅ {candidate.name} yüklendi (Orijinal ve Standart)!")
+
+
+def make_cv_pipeline(cv_cols, writeback=None):
+    """Aday hattı; aşama eşzamanlılıkları secrets'taki limitlerden gelir."""
+    general = st.secrets["general"]
+    limits = get_stage_limiter().limits
+    return Pipeline([
+        Stage("download", partial(stage_download, cv_cols=cv_cols, writeback=writeback), limits["download"]),
+        # Toplayıcı bir isteği dolduracak kadar aday aynı anda beklemeli
+        Stage("extract", stage_extract, max(limits["llm"], general.get("gemini_batch_size", DEFAULT_BATCH_SIZE))),
+        Stage("render", stage_render, general.get("render_concurrency", 2)),
+        Stage("upload", stage_upload, limits["drive"]),
+        Stage("mark", partial(stage_mark, writeback=writeback), 1),
+    ], queue_size=general.get("pipeline_queue_size", DEFAULT_QUEUE_SIZE), memory_budget=get_memory_budget())
+
+
+def process_and_upload_single(name, row, cv_cols):
+    """Tek adayı aday hattından geçirir ve mesajlarını ekranda gösterir."""
+    token = str(row.get(COLUMN_TOKEN_ID, "NoToken"))
+    # Tekil işlemde kontrol noktası sadece bellekte tutulur
+    result = make_cv_pipeline(cv_cols).run_batch([(token, name, {"row": row}, Checkpoint())])[0]
+    for level, text in result.log:
+        getattr(st, level)(text)
+    return result.ok
+
+@st.cache_resource
+def get_sheet_sync():
+    """Form sayfasının diskteki (Parquet) kopyası; eşitlemede sadece yeni satırlar ve IsProcessed okunur."""
+    return SheetSync(open_form_worksheet,
+                     st.secrets["general"].get("sheet_snapshot_path", DEFAULT_SNAPSHOT_PATH),
+                     processed_column=COLUMN_IS_PROCESSED, token_column=COLUMN_TOKEN_ID,
+                     full_read_interval=st.secrets["general"].get("sheet_full_read_seconds",
+                                                                  DEFAULT_FULL_READ_INTERVAL))
+
+
+@st.cache_resource
+def get_metrics():
+    """Aşama süreleri ve sayaçlar + önbellek / kota / toplayıcı durumları tek kayıtta."""
+    METRICS.add_collector("gemini_cache", lambda: get_gemini_cache().stats())
+    METRICS.add_collector("blob_cache", lambda: get_download_client().blob_cache.stats())
+    METRICS.add_collector("gemini_batch", lambda: get_gemini_batcher().stats())
+    METRICS.add_collector("text_extract", lambda: get_text_extractor().stats())
+    METRICS.add_collector("sheet_sync", lambda: get_sheet_sync().stats())
+    METRICS.add_collector("rate_limit", lambda: get_rate_limits().stats(), label="upstream")
+    if get_memory_budget() is not None:
+        METRICS.add_collector("memory", lambda: get_memory_budget().stats())
+    return METRICS
+
+
+def show_metrics_panel():
+    """Toplu işten sonra: aşama p50/p95, servis çağrıları, aktarılan bayt, önbellek isabeti ve hata nedenleri."""
+    summary = get_metrics().summary()
+    counters = summary["counters"]
+    gauges = {name: values[0]["value"] for name, values in summary["gauges"].items() if len(values) == 1}
+
+    with st.expander("📈 Ölçümler (bu süreç açıldığından beri)"):
+        timings = [{"Ölçüm": name, **row} for name in ("stage_seconds", "step_seconds", "api_seconds")
+                   for row in summary["timings"].get(name, [])]
+        if timings:
+            st.dataframe(pd.DataFrame(timings).rename(columns={
+                "stage": "Aşama", "step": "Adım", "upstream": "Servis", "count": "Adet",
+                "avg_ms": "Ort. (ms)", "p50_ms": "p50 (ms)", "p95_ms": "p95 (ms)"}))
+
+        calls = {}
+        for row in counters.get("api_calls", []):
+            calls.setdefault(row["upstream"], {})[row["outcome"]] = row["value"]
+        if calls:
+            st.write("**Servis çağrıları**")
+            st.dataframe(pd.DataFrame.from_dict(calls, orient="index").fillna(0).astype(int))
+
+        transferred = " · ".join(f"{row['upstream']} {'↓' if row['direction'] == 'in' else '↑'} "
+                                 f"{row['value'] / (1024 * 1024):.1f} MB" for row in counters.get("bytes", []))
+        hit_rates = []
+        for cache in ("gemini_cache", "blob_cache"):
+            hits, misses = gauges.get(f"{cache}_hits", 0), gauges.get(f"{cache}_misses", 0)
+            if hits + misses:
+                hit_rates.append(f"{cache}: %{hits / (hits + misses) * 100:.0f}")
+        st.caption(f"📦 Aktarılan: {transferred or '-'} · 🗄️ Önbellek isabeti: {' · '.join(hit_rates) or '-'}")
+
+        failures = counters.get("failures", [])
+        if failures:
+            st.write("**Hata nedenleri**")
+            st.dataframe(pd.DataFrame(failures).rename(columns={"stage": "Aşama", "reason": "Neden",
+                                                                 "value": "Adet"}))
 
-    for attempt in range(max_retries):
-        try:
-            scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
 
-            # Credential Yükleme
-            if "gcp_service_account" in st.secrets:
-                creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scopes)
-            else:
-                creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=scopes)
-
-            client = gspread.authorize(creds)
-
-            # Dosyayı Açma
-            spreadsheet = client.open(SHEET_NAME)
-            sheet = spreadsheet.worksheet("İZMİR CV Form")
-
-            # Veriyi Çekme
-            data = sheet.get_all_values()
-
-            if not data: return pd.DataFrame()
-
-            # Başlıkları İşleme (Duplicate Fix)
-            headers = data[0]
-            rows = data[1:]
-            seen = {}
-            unique_headers = []
-            for col in headers:
-                if col in seen:
-                    seen[col] += 1
-                    unique_headers.append(f"{col}_{seen[col]}")
-                else:
-                    seen[col] = 0
-                    unique_headers.append(col)
-
-            # Başarılı olduysa DataFrame'i döndür ve döngüden çık
-            return pd.DataFrame(rows, columns=unique_headers)
-
-        except Exception as e:
-            # Hata verirse (İnternet kesilirse)
-            if attempt < max_retries - 1:  # Son deneme değilse
-                time.sleep(2)  # 2 saniye bekle ve tekrar dene
-                continue
-            else:
-                # Son denemede de hata verirse ekrana yaz
-                st.error(f"Google Sheets Bağlantı Hatası (3 kez denendi): {e}")
-                return pd.DataFrame()
+def load_data():
+    """Sayfanın yerel kopyasını DataFrame olarak döndürür.
 
-def mark_as_processed_in_sheet(token):
+    Kopya varsa beklemeden gösterilir ve eşitleme arka planda yapılır
+    (yeni satırlar bir sonraki yeniden çalıştırmada görünür); ilk açılışta
+    sayfa bir kez tam okunur.
+    """
+    sheet_sync = get_sheet_sync()
     try:
-        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        if "gcp_service_account" in st.secrets:
-            creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scopes)
+        if sheet_sync.has_snapshot:
+            sheet_sync.sync_in_background(st.secrets["general"].get("sheet_sync_seconds", 60))
         else:
-            creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=scopes)
-        
-        client = gspread.authorize(creds)
-        sheet = client.open(SHEET_NAME).worksheet("İZMİR CV Form")
-        
+            sheet_sync.sync()
+    except Exception as e:
+        st.error(f"Google Sheets Bağlantı Hatası: {e}")
+    return sheet_sync.dataframe()
+
+def start_bulk_job(job_id):
+    """Toplu işi arka planda başlatır ya da her adayı kaldığı aşamadan sürdürür."""
+    store = get_job_store()
+    runner = get_job_runner()
+    if runner.is_running(job_id):
+        return False
+
+    meta = store.get_job(job_id)["meta"]
+    writeback = make_processed_writeback(meta["columns"],
+                                         on_marked=lambda key: store.advance(job_id, key, "marked"))
+
+    def on_finish():
+        # Kuyrukta kalan IsProcessed işaretlerini son kez yaz
+        if writeback is not None:
+            writeback.close()
+
+    return runner.start(job_id, make_cv_pipeline(meta["cv_cols"], writeback), on_finish)
+
+
+@st.fragment(run_every=1)
+def show_bulk_progress(job_id):
+    """Çalışan işin ilerlemesi; sadece bu parça saniyede bir yenilenir, betiğin geri kalanı beklemez."""
+    runner = get_job_runner()
+    progress = get_job_store().progress(job_id)
+    st.progress(progress["finished"] / (progress["total"] or 1))
+    stages = " · ".join(f"{stage}: {count}" for stage, count in progress["by_stage"].items() if count)
+    throughput = " · ".join(f"{stage} {stats['per_min']:.1f}/dk"
+                            for stage, stats in runner.stage_stats(job_id).items() if stats["items"])
+    st.text(f"İşleniyor ({progress['finished']}/{progress['total']}) — {stages}"
+            + (f"\nHız: {throughput}" if throughput else ""))
+    if not runner.is_running(job_id):
+        # İş bitti: özet için sayfa bir kez baştan çizilir
+        st.session_state[f"bulk-watched-{job_id}"] = True
+        st.rerun()
+
+
+def show_bulk_job(job_id):
+    """İşin ilerlemesini tablodan okuyarak gösterir; iş arka planda sürer, sayfa yenilense de kaybolmaz."""
+    store = get_job_store()
+    runner = get_job_runner()
+    if runner.is_running(job_id):
+        show_bulk_progress(job_id)
+        return
+
+    progress = store.progress(job_id)
+    st.progress(progress["finished"] / (progress["total"] or 1))
+    if st.session_state.pop(f"bulk-watched-{job_id}", False):
+        # İşaretler kopyaya zaten yazıldı; sayfayla bir kez daha doğrulayalım
+        get_sheet_sync().sync_in_background()
+
+    marked = progress["by_stage"]["marked"]
+    st.success(f"✅ {marked}/{progress['total']} aday Drive'a yüklendi ve işaretlendi.")
+
+    cache_stats = get_gemini_cache().stats()
+    text_stats = get_text_extractor().stats()
+    st.caption(f"🗄️ Gemini önbelleği: {cache_stats['hits']} isabet / {cache_stats['misses']} ıska · "
+               f"📄 Metin çıkarma: ort. {text_stats['avg_ms']:.0f} ms/belge")
+    stage_stats = runner.stage_stats(job_id)
+    if stage_stats:
+        st.caption("🏭 Aşamalar: " + " · ".join(
+            f"{stage} {stats['per_min']:.1f}/dk (ort. {stats['avg_ms'] / 1000:.1f} sn)"
+            for stage, stats in stage_stats.items() if stats["items"]))
+
+    items = store.items(job_id)
+    with st.expander("📋 Aday Bazlı Sonuçlar", expanded=marked < progress["total"]):
+        st.dataframe(pd.DataFrame([{
+            "Aday": item["name"],
+            "Sonuç": "✅" if item["ok"] else ("❌" if item["ok"] is False else "⏳"),
+            "Aşama": item["stage"],
+            "Deneme": item["attempts"],
+            "Süre (sn)": round(item["seconds"] or 0, 1),
+            "Detay": item["messages"],
+        } for item in items]))
+    show_metrics_panel()
+
+    if marked < progress["total"]:
+        if st.button("🔁 Kalan Adaylarla Devam Et", key=f"resume-{job_id}"):
+            start_bulk_job(job_id)
+            st.rerun()
+
+
+def open_form_worksheet():
+    return get_google_clients().worksheet(SHEET_NAME, "İZMİR CV Form")
+
+
+def sheet_row_of(row):
+    """DataFrame satırının sayfadaki satır numarası (1. satır başlık, indeks 0'dan başlar)."""
+    return int(row.name) + 2
+
+
+def bulk_item_key(idx, row):
+    """Toplu işte adayın anahtarı; işaretleme geri bildirimi de bu anahtarla gelir."""
+    return str(row.get(COLUMN_TOKEN_ID) or f"row-{idx}")
+
+
+def make_processed_writeback(columns, on_marked=None):
+    """Toplu işlem için IsProcessed yazım kuyruğu; sütun yoksa None döner.
+
+    `on_marked(key)` satır sayfaya gerçekten yazıldığında, adayın iş anahtarıyla çağrılır.
+    """
+    columns = list(columns)
+    if COLUMN_IS_PROCESSED not in columns:
+        return None
+    general = st.secrets["general"]
+    return ProcessedWriteBack(
+        open_form_worksheet(),
+        processed_col=columns.index(COLUMN_IS_PROCESSED) + 1,
+        token_col=columns.index(COLUMN_TOKEN_ID) + 1 if COLUMN_TOKEN_ID in columns else None,
+        flush_every=general.get("sheet_flush_rows", 25),
+        flush_interval=general.get("sheet_flush_seconds", 10),
+        # Yazım iş parçacığında çalışır; hata ekrana değil süreç günlüğüne düşer
+        on_mismatch=lambda token, key: (mark_as_processed_in_sheet(token, lambda level, text: print(f"⚠️ {text}"))
+                                        and on_marked and on_marked(key)),
+        on_written=on_marked,
+    )
+
+
+def mark_row_processed(row, token, writeback, checkpoint, notify=None):
+    if writeback is not None:
+        # Toplu işlemde satır numarası zaten biliniyor; yazım kuyruğa alınır.
+        # `marked` aşaması toplu yazım başarılı olunca (on_written) kaydedilir.
+        writeback.mark(sheet_row_of(row), token, key=checkpoint.key)
+    elif mark_as_processed_in_sheet(token, notify):  # Sayfayı güncelleyen yeni fonksiyonumuz
+        checkpoint.advance("marked")
+    # Yerel kopyayı da güncelle; sonraki eşitleme sayfadaki değerle doğrular
+    get_sheet_sync().mark_processed(sheet_row_of(row))
+
+
+def mark_as_processed_in_sheet(token, notify=None):
+    try:
+        sheet = open_form_worksheet()
+        sheets_limit = get_rate_limits()["sheets"]
+
         # Sayfadaki Token'ı arayıp bul (Token'lar eşsizdir)
-        cell = sheet.find(token)
+        cell = call_with_backoff(sheet.find, token, limit=sheets_limit)
         if cell:
-            header = sheet.row_values(1)
+            header = call_with_backoff(sheet.row_values, 1, limit=sheets_limit)
             # Eğer başlıklar arasında "IsProcessed" varsa o hücreyi "Yes" yap
             if COLUMN_IS_PROCESSED in header:
                 col_idx = header.index(COLUMN_IS_PROCESSED) + 1
-                sheet.update_cell(cell.row, col_idx, "Yes")
+                call_with_backoff(sheet.update_cell, cell.row, col_idx, "Yes", limit=sheets_limit)
+                return True
     except Exception as e:
-        st.error(f"Google Sheets güncellenirken bir hata oluştu: {e}")
+        report_error(f"Google Sheets güncellenirken bir hata oluştu: {e}", notify)
+    return False
 
 
 # ==========================================
@@ -583,6 +764,7 @@ st.set_page_config(page_title="CV Master & Standardizer", layout="wide")
 st.title("🛡️ İzmir CV Form - Standardize Edici")
 st.markdown("---")
 
+get_rate_limits()  # Sheets/Drive modülleri ortak kovaları kullanır; kotalar ilk okumadan önce ayarlanır
 df = load_data()
 
 if not df.empty:
@@ -625,19 +807,21 @@ if not df.empty:
 
     # Drive servisini hazırlayalım
     drive_service = get_drive_service()
+    get_folder_index()  # Kategori klasörlerini toplu işlemden önce ana iş parçacığında ısıt
+
+    # Süreç yeniden başladıysa yarıda kalan toplu işler kaldıkları aşamadan sürer
+    for job_id in get_job_store().active_jobs(BULK_JOB):
+        start_bulk_job(job_id)
 
     with c2:
         st.write("**Bireysel İşlem**")
         
         if st.button("Seçiliyi Drive'a Gönder"):
-            # st.spinner ile ekranda dönen bir yükleniyor animasyonu gösterir
-            with st.spinner(f"⏳ {sel_name} işleniyor, lütfen bekleyin..."):
-                row = filtered_df[filtered_df[name_col] == sel_name].iloc[0]
-                process_and_upload_single(sel_name, row, drive_service, all_cv_cols)
-                
             try:
-                row = filtered_df[filtered_df[name_col] == sel_name].iloc[0]
-                process_and_upload_single(sel_name, row, drive_service, all_cv_cols)
+                # st.spinner ile ekranda dönen bir yükleniyor animasyonu gösterir
+                with st.spinner(f"⏳ {sel_name} işleniyor, lütfen bekleyin..."):
+                    row = filtered_df[filtered_df[name_col] == sel_name].iloc[0]
+                    process_and_upload_single(sel_name, row, all_cv_cols)
             finally:
                 # İşlem bittiğinde (hata alsa bile) butonu tekrar aç
                 st.session_state.processing = False
@@ -645,31 +829,32 @@ if not df.empty:
     with c3:
         st.write("**Toplu İşlem**")
         if st.button(f"Filtreli {len(filtered_df)} Kişiyi Drive'a Gönder"):
-            
+            job_store = get_job_store()
+
             if COLUMN_IS_PROCESSED in filtered_df.columns:
                 to_process_df = filtered_df[filtered_df[COLUMN_IS_PROCESSED].astype(str).str.strip().str.lower() != "yes"]
             else:
                 to_process_df = filtered_df 
 
-            if to_process_df.empty:
+            if job_store.active_jobs(BULK_JOB):
+                st.info("Devam eden bir toplu iş var; ilerlemesi aşağıda.")
+            elif to_process_df.empty:
                 st.info("Seçili listedeki tüm adaylar zaten daha önce gönderilmiş.")
             else:
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                total = len(to_process_df)
-
-                for i, (idx, row) in enumerate(to_process_df.iterrows()):
-                    c_name = row[name_col]
-                    status_text.text(f"İşleniyor ({i + 1}/{total}): {c_name}")
-
-                    process_and_upload_single(c_name, row, drive_service, all_cv_cols, silent=True)
-
-                    progress_bar.progress((i + 1) / total)
-                    time.sleep(1)  
-
-                st.success(f"✅ Yeni {total} aday Drive'a yüklendi!")
-                status_text.empty()
-                st.cache_data.clear()
+                # Satırlar iş tablosuna yazılır; işçiler betikten bağımsız, arka planda çalışır
+                items = [(bulk_item_key(idx, row), row[name_col],
+                          {"index": int(idx), "row": row.to_dict()})
+                         for idx, row in to_process_df.iterrows()]
+                job_id = job_store.create_job(BULK_JOB, items, meta={
+                    "cv_cols": all_cv_cols,
+                    "columns": list(filtered_df.columns),
+                })
+                start_bulk_job(job_id)
+
+    # Son toplu işin durumu (sayfa yenilense de arka planda sürer)
+    last_job_id = get_job_store().latest_job(BULK_JOB)
+    if last_job_id:
+        show_bulk_job(last_job_id)
 
     st.markdown("---")
     st.subheader("🛠️ Bakım ve Geri Dönük İşlemler")
@@ -680,9 +865,11 @@ if not df.empty:
         if not pool_folder_id:
             st.error("⚠️ Lütfen secrets.toml dosyasına 'pool_folder_id' ekleyin.")
         else:
-            processed_tokens = get_processed_tokens()
-            # Sadece DAHA ÖNCE İŞLENMİŞ olanları buluyoruz
-            old_df = filtered_df[filtered_df[COLUMN_TOKEN_ID].isin(processed_tokens)]
+            # Sadece DAHA ÖNCE İŞLENMİŞ olanları buluyoruz (IsProcessed eşitlemeyle güncel tutulur)
+            if COLUMN_IS_PROCESSED in filtered_df.columns:
+                old_df = filtered_df[filtered_df[COLUMN_IS_PROCESSED].astype(str).str.strip().str.lower() == "yes"]
+            else:
+                old_df = filtered_df.iloc[0:0]
 
             if old_df.empty:
                 st.info("İşlenmiş geçmiş kayıt bulunamadı.")
@@ -691,14 +878,16 @@ if not df.empty:
                 status_text = st.empty()
                 total = len(old_df)
                 uploaded_count = 0
+                drive_manifest = get_drive_manifest()
+                pool_folders = get_folder_index().children(pool_folder_id)
 
                 for i, (idx, row) in enumerate(old_df.iterrows()):
                     c_name = row[name_col]
                     status_text.text(f"Kontrol ediliyor ({i + 1}/{total}): {c_name}")
 
-                    # Orijinal dosyanın Drive havuzunda zaten olup olmadığını kontrol et
-                    check_query = f"name = '{c_name}_Orijinal.pdf' and trashed = false"
-                    existing = drive_service.files().list(q=check_query, supportsAllDrives=True).execute().get('files', [])
+                    # Orijinal dosyanın Drive havuzunda zaten olup olmadığını kontrol et (manifestten, API'siz)
+                    existing = any(drive_manifest.exists(drive_service, folder_id, f"{c_name}_Orijinal.pdf")
+                                   for folder_id in pool_folders.values())
 
                     if not existing:
                         # Dosya havuzda yok, demek ki indirmemiz lazım
@@ -712,25 +901,27 @@ if not df.empty:
                         if pdf_url:
                             try:
                                 headers = {"Authorization": f"Bearer {st.secrets['general']['typeform_token']}"}
-                                resp = requests.get(pdf_url, headers=headers, timeout=60)
-
-                                if resp.status_code == 200:
-                                    # Kategoriyi bulmak için metni oku ve Gemini'ye sor
-                                    doc = fitz.open(stream=resp.content, filetype="pdf")
-                                    full_text = "".join([page.get_text() for page in doc])
-
-                                    cv_json = extract_data_with_gemini(full_text)
+                                with get_download_client().fetch(pdf_url, headers=headers) as download:
+                                    if download.status_code != 200:
+                                        raise RuntimeError(f"Typeform HTTP {download.status_code}")
+                                    pdf_view = download.view()
+                                    # Kategori için önce önbelleğe bak; ilk çalıştırmada parse edildiyse LLM'e gitmez
+                                    gemini_cache = get_gemini_cache()
+                                    cache_key = gemini_cache.make_key(pdf_view, GEMINI_MODEL, PROMPT_VERSION)
+                                    cv_json = get_gemini_batcher().check(gemini_cache.get(cache_key))
+                                    if cv_json is None:
+                                        full_text = get_text_extractor().extract(download.path or pdf_view).text
+
+                                        cv_json = extract_data_with_gemini(full_text)
+                                        gemini_cache.put(cache_key, cv_json)
                                     cats = cv_json.get("suggested_categories", ["Others"]) if cv_json else ["Others"]
 
-                                    for cat in cats:
-                                        cat_folder_id = get_or_create_drive_folder(drive_service, cat, pool_folder_id)
-                                        orig_media = MediaIoBaseUpload(io.BytesIO(resp.content), mimetype='application/pdf')
-                                        orig_meta = {'name': f"{c_name}_Orijinal.pdf", 'parents': [cat_folder_id]}
-                                        drive_service.files().create(body=orig_meta, media_body=orig_media,
-                                                                     supportsAllDrives=True).execute()
+                                    pool_ids = [get_or_create_drive_folder(drive_service, cat, pool_folder_id)
+                                                for cat in cats]
+                                    place_in_folders(drive_service, pool_ids, f"{c_name}_Orijinal.pdf",
+                                                     download.fileobj())
 
                                     uploaded_count += 1
-                                    time.sleep(2)  # Gemini kotasını korumak için mola
                             except Exception as e:
                                 st.warning(f"⚠️ {c_name} işlenirken hata: {e}")
 
@@ -739,3 +930,5 @@ if not df.empty:
                 status_text.empty()
                 st.success(
                     f"✅ İşlem tamamlandı! Toplam {uploaded_count} eksik orijinal CV havuza kategorize edilerek eklendi.")
+                cache_stats = get_gemini_cache().stats()
+                st.caption(f"🗄️ Gemini önbelleği: {cache_stats['hits']} isabet / {cache_stats['misses']} ıska")
@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from metrics import METRICS
+
+# ==========================================
+# ⚙️ VARSAYILAN LİMİTLER
+# ==========================================
+
+DEFAULT_STAGE_LIMITS = {
+    "download": 8,  # Typeform indirmeleri (ağ)
+    "llm": 4,       # Gemini çağrıları (kota)
+    "drive": 4,     # Drive / Sheets yazmaları (kota)
+}
+
+RATE_LIMIT_STATUSES = (429,)
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+# ==========================================
+# 🚦 AŞAMA LİMİTLERİ
+# ==========================================
+
+class StageLimiter:
+    """Her aşama (indirme, LLM, Drive) için ayrı eşzamanlılık sınırı tutar."""
+
+    def __init__(self, limits=None):
+        merged = dict(DEFAULT_STAGE_LIMITS)
+        merged.update(limits or {})
+        self.limits = {name: max(1, int(value)) for name, value in merged.items()}
+        self._semaphores = {name: threading.BoundedSemaphore(value) for name, value in self.limits.items()}
+
+    @contextmanager
+    def stage(self, name):
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            yield
+            return
+        with semaphore:
+            yield
+
+
+# ==========================================
+# 🔁 KOTA / YENİDEN DENEME
+# ==========================================
+
+def _status_of(exc):
+    """Google, gspread ve requests hatalarından HTTP durum kodunu çıkarır."""
+    resp = getattr(exc, "resp", None)  # googleapiclient.errors.HttpError
+    if resp is not None and getattr(resp, "status", None):
+        return int(resp.status)
+    response = getattr(exc, "response", None)  # gspread.APIError / requests.HTTPError
+    if response is not None and getattr(response, "status_code", None):
+        return int(response.status_code)
+    code = getattr(exc, "code", None)  # google.api_core (Gemini) hataları
+    if isinstance(code, int):
+        return code
+    return None
+
+
+def _retry_after_of(exc):
+    """Hata yanıtında Retry-After başlığı varsa saniye cinsinden döndürür."""
+    for holder in (getattr(exc, "resp", None), getattr(getattr(exc, "response", None), "headers", None)):
+        if not holder:
+            continue
+        try:
+            value = holder.get("retry-after") or holder.get("Retry-After")
+        except AttributeError:
+            continue
+        if value:
+            try:
+                return max(0.0, float(value))
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def is_rate_limited(exc):
+    status = _status_of(exc)
+    if status in RATE_LIMIT_STATUSES:
+        return True
+    # Drive kota aşımını 403 + rateLimitExceeded / userRateLimitExceeded ile bildirir
+    return status == 403 and "ratelimitexceeded" in str(exc).lower()
+
+
+def is_retryable(exc):
+    return is_rate_limited(exc) or _status_of(exc) in RETRYABLE_STATUSES
+
+
+def call_with_backoff(func, *args, attempts=5, base_delay=1.0, max_delay=60.0, limit=None, cost=0, **kwargs):
+    """Kota (429) ve geçici sunucu hatalarında üstel + rastgele beklemeyle tekrar dener.
+
+    Sabit `time.sleep` yerine sadece gerçekten sınıra takıldığımızda bekleriz;
+    sunucu `Retry-After` gönderdiyse ona uyarız. `limit` (bkz. `rate_limit`)
+    verilirse her deneme önce servisin kovasından `cost` token ile yer alır ve
+    429'da bekleme kovaya bırakılır; böylece diğer işçiler de aynı süre durur.
+    """
+    upstream = limit.name if limit is not None else "other"
+    for attempt in range(attempts):
+        if limit is not None:
+            limit.acquire(cost)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            METRICS.observe("api_seconds", time.perf_counter() - started, upstream=upstream)
+            METRICS.inc("api_calls", upstream=upstream, outcome="rate_limited" if is_rate_limited(e) else "error")
+            if attempt == attempts - 1 or not is_retryable(e):
+                raise
+            delay = _retry_after_of(e)
+            if limit is not None and is_rate_limited(e):
+                limit.on_rate_limited(delay)
+                continue
+            if delay is None:
+                delay = min(max_delay, base_delay * (2 ** attempt))
+                delay = random.uniform(delay / 2, delay)
+            time.sleep(delay)
+        else:
+            METRICS.observe("api_seconds", time.perf_counter() - started, upstream=upstream)
+            METRICS.inc("api_calls", upstream=upstream, outcome="ok")
+            if limit is not None:
+                limit.on_success()
+            return result
+
+
+# ==========================================
+# 📋 ADAY SONUCU
+# ==========================================
+
+@dataclass
+class RowResult:
+    key: object
+    name: str
+    ok: bool
+    seconds: float
+    messages: list = field(default_factory=list)
+    log: list = field(default_factory=list)  # (seviye, metin)
@@ -0,0 +1,88 @@
+"""Standart CV PDF üretim süresi: her PDF'te add_font vs süreç geneli font kaydı.
+
+Çalıştırma (depo kökünden):
+    python benchmarks/bench_pdf_render.py --runs 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv_pdf  # noqa: E402
+from font_registry import FONT_REGISTRY  # noqa: E402
+
+SAMPLE_CV = {
+    "name": "Ayşe Yılmaz",
+    "title": "Yazılım Mühendisi",
+    "location": "İzmir, Türkiye",
+    "contact": "ayse@example.com | +90 555 000 00 00",
+    "summary": "Dağıtık sistemler ve veri işleme üzerine çalışan, öğrenmeye açık bir mühendis. " * 3,
+    "education": [{"degree": "Bilgisayar Mühendisliği", "school": "Ege Üniversitesi", "year": "2024"}],
+    "experience": [
+        {"role": "Stajyer", "company": "Örnek A.Ş.", "description": "Ölçeklenebilir servisler geliştirdi. " * 4},
+        {"role": "Asistan", "company": "Çağ Yazılım", "description": "Veri hattı bakımını üstlendi. " * 4},
+    ],
+    "projects": [{"name": "CV Ayrıştırıcı", "tech": "Python, Flask", "details": "Şablon tabanlı PDF üretimi. " * 3}],
+    "certificates": [{"name": "Bulut Temelleri", "issuer": "Google", "year": "2023"}],
+    "skills": {"diller": "Python, Go, SQL", "araçlar": "Docker, Git"},
+    "spoken_languages": "Türkçe (ana dil), İngilizce (C1)",
+    "interests": "Satranç, doğa yürüyüşü",
+}
+
+
+BASELINE_STYLES = ("", "B", "I", "BI")
+
+
+def _naive_attach(pdf, family, path, styles=("",)):
+    # Önceki davranış: her yeni PDF'te dört stil için TTF baştan ayrıştırılır.
+    # SingleFacePDF sadece düz stili ister; karşılaştırma eski maliyeti ölçsün diye `styles` yok sayılır.
+    for style in BASELINE_STYLES:
+        pdf.add_font(family, style, path)
+
+
+def _measure(runs):
+    timings = []
+    sizes = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = cv_pdf.create_standardized_pdf(SAMPLE_CV)
+        timings.append(time.perf_counter() - started)
+        sizes.append(len(output))
+    return timings, sizes
+
+
+def _report(label, timings, sizes):
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[max(0, int(len(ms) * 0.95) - 1)]
+    print(f"{label:<10} ortalama {statistics.mean(ms):7.1f} ms | p50 {statistics.median(ms):7.1f} ms | "
+          f"p95 {p95:7.1f} ms | {1000 / statistics.mean(ms):6.1f} PDF/sn | {statistics.mean(sizes) / 1024:.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(cv_pdf.__file__) or ".")
+    if cv_pdf.find_font_path() is None:
+        sys.exit("DejaVuSans.ttf bulunamadı; karşılaştırma anlamsız.")
+
+    original_attach = FONT_REGISTRY.attach
+    FONT_REGISTRY.attach = _naive_attach
+    try:
+        before = _measure(args.runs)
+    finally:
+        FONT_REGISTRY.attach = original_attach
+
+    FONT_REGISTRY.preload(cv_pdf.find_font_path())
+    after = _measure(args.runs)
+
+    _report("add_font", *before)
+    _report("registry", *after)
+
+
+if __name__ == "__main__":
+    main()
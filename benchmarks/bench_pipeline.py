@@ -0,0 +1,273 @@
+"""Uçtan uca aday hattı ölçümü: main.py'nin gerçek aşamaları, yerel taklitlere karşı.
+
+Typeform yerel HTTP sunucusundan (fake_typeform), Gemini / Drive / Sheets
+bellekteki taklitlerden (fakes) gelir; indirme, metin çıkarma, toplu Gemini,
+PDF üretimi, yükleme, iş tablosu ve kota kovaları gerçek koddur. Sonuçta
+aday/sn, aday başına servis çağrısı ve en yüksek RSS raporlanır.
+
+Çalıştırma (depo kökünden):
+    python benchmarks/bench_pipeline.py --candidates 60 --mix text=0.6,scanned=0.2,multipage=0.2
+    python benchmarks/bench_pipeline.py --json onceki.json
+    python benchmarks/bench_pipeline.py --compare onceki.json --tolerance 0.15
+
+Not: main.py'de OCR yolu yoktur; taranmış CV'ler orada "no_json" ile elenir
+ve hata nedenlerinde görünür. app.py yolu Streamlit çalışma ortamı ister.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_typeform import FAKE_FORM_ID, FAKE_TOKEN, NAME_FIELD, FakeTypeform, make_pdf, make_scanned_pdf  # noqa: E402
+from fakes import FakeDrive, FakeGemini, FakeGoogleClients, FakeWorksheet  # noqa: E402
+
+CATEGORIES = ["Engineering", "Marketing", "HR", "Finance", "Sales", "IT", "Design"]
+SHEET_NAME = "İZMİR CV Form"   # main.py'deki sayfa adı
+ROOT_FOLDER_ID = "bench-root"
+UNLIMITED_RPM = 1_000_000      # kotalar ölçümü boğmasın; gerçek kotalar için --rpm verin
+
+
+# ==========================================
+# 📚 SENTETİK CV KÜMESİ
+# ==========================================
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, share = part.partition("=")
+        mix[kind.strip()] = float(share)
+    unknown = set(mix) - {"text", "scanned", "multipage"}
+    if unknown:
+        raise ValueError(f"Bilinmeyen CV türü: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def make_corpus(count, mix, pages=3, seed=7):
+    """(ad, pdf_bytes, tür) listesi; türler `mix` oranlarında, her aday 1-2 kategoride."""
+    rng = random.Random(seed)
+    kinds = list(mix)
+    corpus = []
+    for number in range(count):
+        kind = rng.choices(kinds, weights=[mix[k] for k in kinds])[0]
+        name = f"Aday {number + 1}"
+        text = f"{name}\nDepartman: {', '.join(rng.sample(CATEGORIES, rng.randint(1, 2)))}"
+        if kind == "scanned":
+            pdf = make_scanned_pdf(text)
+        elif kind == "multipage":
+            pdf = make_pdf(text, pages=pages)
+        else:
+            pdf = make_pdf(text)
+        corpus.append((name, pdf, kind))
+    return corpus
+
+
+# ==========================================
+# 📏 ÖLÇÜM
+# ==========================================
+
+class RssSampler:
+    """Çalışma süresince yerleşik belleği örnekler; /proc yoksa ru_maxrss'e düşer."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    @staticmethod
+    def current():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.baseline = self.current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def configure_env(args, workdir, fake):
+    env = {
+        "JOB_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "BLOB_CACHE_DIR": os.path.join(workdir, "blobs"),
+        "GEMINI_CACHE_PATH": os.path.join(workdir, "gemini_cache.sqlite3"),
+        "SHEET_SNAPSHOT_PATH": os.path.join(workdir, "sheet.parquet"),
+        "TYPEFORM_CURSOR_PATH": os.path.join(workdir, "typeform_cursor.json"),
+        "TYPEFORM_TOKEN": FAKE_TOKEN,
+        "ROOT_FOLDER_ID": ROOT_FOLDER_ID,
+        "JOB_WORKERS": str(args.workers),
+        "GEMINI_BATCH_SIZE": str(args.batch_size),
+    }
+    for name in ("GEMINI_RPM", "DRIVE_RPM", "SHEETS_RPM", "TYPEFORM_RPM", "TYPEFORM_FILES_RPM"):
+        env[name] = str(args.rpm)
+    if args.memory_budget_mb:
+        env["MEMORY_BUDGET_MB"] = str(args.memory_budget_mb)
+    if args.placement:
+        env["DRIVE_PLACEMENT"] = args.placement
+    if args.source == "typeform":
+        env.update(TYPEFORM_FORM_ID=FAKE_FORM_ID, TYPEFORM_API_URL=fake.url, TYPEFORM_NAME_FIELD=NAME_FIELD)
+    os.environ.update(env)
+
+
+def run(args):
+    corpus = make_corpus(args.candidates, parse_mix(args.mix), pages=args.pages)
+    workdir = tempfile.mkdtemp(prefix="bench-pipeline-")
+    drive = FakeDrive(latency=args.drive_latency)
+    gemini = FakeGemini(latency=args.gemini_latency, per_cv_latency=args.gemini_per_cv)
+
+    with FakeTypeform() as fake:
+        rows = [["Ad ve Soyad", "CV", "Token"]]
+        for name, pdf, _ in corpus:
+            token = fake.add_response(name, pdf)
+            # collect_old_submissions sadece typeform.com / storage bağlantılarını tanır
+            rows.append([name, f"{fake.url}/files/{token}.pdf?storage", token])
+        worksheet = FakeWorksheet(rows, latency=args.sheets_latency)
+
+        configure_env(args, workdir, fake)
+        os.chdir(os.path.dirname(BENCH_DIR))  # DejaVuSans.ttf depo kökünde
+        import main  # noqa: E402  (ortam değişkenleri ayarlandıktan sonra)
+        main.google_clients = FakeGoogleClients(drive, {(SHEET_NAME, 0): worksheet})
+        main.TYPEFORM_TOKEN = FAKE_TOKEN
+        main.ROOT_FOLDER_ID = ROOT_FOLDER_ID
+
+        # Servisin aday başına print'leri raporu boğmasın
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet, gemini.install(), RssSampler() as rss:
+            started = time.perf_counter()
+            job_id, _ = main.job_store.claim_job(main.OLD_SUBMISSIONS_JOB)
+            main.start_old_submissions_job(job_id)
+            while main.job_runner.is_running(job_id):
+                time.sleep(0.05)
+            elapsed = time.perf_counter() - started
+
+        progress = main.job_store.progress(job_id)
+        typeform_calls = fake.requests["responses"] + fake.requests["files"]
+
+    count = len(corpus)
+    calls = {
+        "typeform": typeform_calls,
+        "gemini": gemini.calls,
+        "drive": drive.total_calls(),
+        "sheets": worksheet.total_calls(),
+    }
+    summary = main.METRICS.summary()
+    failures = {f"{row['stage']}/{row['reason']}": row["value"] for row in summary["counters"].get("failures", [])}
+    return {
+        "candidates": count,
+        "mix": {kind: sum(1 for _, _, k in corpus if k == kind) for kind in ("text", "scanned", "multipage")},
+        "uploaded": progress["by_stage"]["uploaded"],
+        "failed": progress["failed"],
+        "seconds": round(elapsed, 2),
+        "candidates_per_sec": round(count / elapsed, 2),
+        "calls": calls,
+        "calls_per_candidate": {name: round(value / count, 3) for name, value in calls.items()},
+        "total_calls_per_candidate": round(sum(calls.values()) / count, 3),
+        "drive_mb_uploaded": round(drive.bytes_uploaded / (1024 * 1024), 2),
+        "placement": main.DRIVE_PLACEMENT,
+        "baseline_rss_mb": round(rss.baseline / (1024 * 1024), 1),
+        "peak_rss_mb": round(rss.peak / (1024 * 1024), 1),
+        "stages": main.job_runner.stage_stats(job_id),
+        "memory": main.memory_budget.stats() if main.memory_budget is not None else None,
+        "stage_latency": summary["timings"].get("stage_seconds", []),
+        "failures": failures,
+    }
+
+
+# ==========================================
+# 📋 RAPOR
+# ==========================================
+
+def report(result):
+    print(f"Adaylar      {result['candidates']} {result['mix']}  →  yüklenen {result['uploaded']}, "
+          f"başarısız {result['failed']}")
+    print(f"Süre         {result['seconds']} sn  |  {result['candidates_per_sec']} aday/sn")
+    calls = "  ".join(f"{name} {value}" for name, value in result["calls_per_candidate"].items())
+    print(f"Çağrı/aday   {result['total_calls_per_candidate']}  ({calls})")
+    print(f"Drive        {result['drive_mb_uploaded']} MB yüklendi ({result.get('placement', 'copy')})")
+    print(f"RSS          başlangıç {result['baseline_rss_mb']} MB  |  tepe {result['peak_rss_mb']} MB")
+    if result["memory"]:
+        memory = result["memory"]
+        print(f"Bellek bütçesi {memory['limit_mb']} MB  |  {memory['deferred']} aday bekletildi "
+              f"({memory['waited_seconds']} sn)")
+    for row in result["stage_latency"]:
+        print(f"  {row['stage']:<10} p50 {row['p50_ms']:8.1f} ms | p95 {row['p95_ms']:8.1f} ms | {row['count']} aday")
+    for reason, count in result["failures"].items():
+        print(f"  ❌ {count} × {reason}")
+
+
+def compare(result, baseline, tolerance):
+    """Önceki ölçüme göre gerileme listesi (boşsa sorun yok)."""
+    regressions = []
+    if result["candidates_per_sec"] < baseline["candidates_per_sec"] * (1 - tolerance):
+        regressions.append(f"aday/sn {baseline['candidates_per_sec']} → {result['candidates_per_sec']}")
+    for key in ("total_calls_per_candidate", "peak_rss_mb"):
+        if result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key} {baseline[key]} → {result[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--mix", default="text=0.6,scanned=0.2,multipage=0.2")
+    parser.add_argument("--pages", type=int, default=3, help="çok sayfalı CV'lerin sayfa sayısı")
+    parser.add_argument("--source", choices=("sheet", "typeform"), default="sheet",
+                        help="adaylar sayfadan mı Typeform Responses API'den mi gelsin")
+    parser.add_argument("--workers", type=int, default=2, help="JOB_WORKERS (indirme/yükleme eşzamanlılığı)")
+    parser.add_argument("--batch-size", type=int, default=6, help="GEMINI_BATCH_SIZE")
+    parser.add_argument("--rpm", type=float, default=UNLIMITED_RPM, help="tüm servisler için dakikalık kota")
+    parser.add_argument("--gemini-latency", type=float, default=0.3, help="istek başına sabit gecikme (sn)")
+    parser.add_argument("--gemini-per-cv", type=float, default=0.05, help="istekteki CV başına ek gecikme (sn)")
+    parser.add_argument("--drive-latency", type=float, default=0.02)
+    parser.add_argument("--sheets-latency", type=float, default=0.05)
+    parser.add_argument("--placement", choices=("copy", "shortcut", "parents"),
+                        help="DRIVE_PLACEMENT (çok kategorili CV'yi bir kez yükle, diğer klasörlere bağla)")
+    parser.add_argument("--memory-budget-mb", type=float, help="MEMORY_BUDGET_MB (RSS bütçeli kabul)")
+    parser.add_argument("--verbose", action="store_true", help="servisin aday çıktılarını da göster")
+    parser.add_argument("--json", help="sonucu bu dosyaya yaz")
+    parser.add_argument("--compare", help="önceki --json çıktısıyla karşılaştır; gerilemede çıkış kodu 1")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+    # Ölçüm depo köküne geçer; göreli yollar çağrıldığı dizine göre kalsın
+    args.json = os.path.abspath(args.json) if args.json else None
+    args.compare = os.path.abspath(args.compare) if args.compare else None
+
+    result = run(args)
+    report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"⚠️ Gerileme: {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Typeform Responses API ve dosya indirmeleri için yerel taklit sunucu.
+
+Gerçek API'ye (ve kotasına) gitmeden `typeform_source` ve indirme yolunu
+denemek için. Tek başına da çalışır:
+    python benchmarks/fake_typeform.py --responses 50 --port 8765
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typeform_source import sign_payload  # noqa: E402
+
+FAKE_TOKEN = "fake-typeform-token"
+FAKE_FORM_ID = "fakeform"
+NAME_FIELD = "ad_soyad"
+CV_FIELD = "cv_pdf"
+
+
+def make_pdf(text, pages=1):
+    """Metin katmanlı basit bir CV PDF'i üretir."""
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{text}\nSayfa {number + 1}\nPython, SQL, Docker", fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_scanned_pdf(text, pages=1, dpi=150):
+    """Metin katmanı olmayan (taranmış gibi) CV: her sayfa tek bir görüntüdür."""
+    source = fitz.open(stream=make_pdf(text, pages), filetype="pdf")
+    doc = fitz.open()
+    for page in source:
+        pixmap = page.get_pixmap(dpi=dpi)
+        scanned = doc.new_page(width=page.rect.width, height=page.rect.height)
+        scanned.insert_image(scanned.rect, stream=pixmap.tobytes("png"))
+    source.close()
+    data = doc.tobytes(deflate=True)
+    doc.close()
+    return data
+
+
+class FakeTypeform:
+    """Bellekte yanıt listesi tutan, Typeform'un kullandığımız uçlarını taklit eden sunucu.
+
+    - GET /forms/<form_id>/responses  (page_size, since, sort=submitted_at,asc|desc, completed)
+    - GET /files/<dosya>              (Bearer token ister, ETag / If-None-Match destekler)
+
+    `webhook_event` / `send_webhook` ile bir yanıt, Typeform'un imzalı
+    webhook teslimatı olarak servisimize gönderilebilir.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, access_token=FAKE_TOKEN, form_id=FAKE_FORM_ID):
+        self.access_token = access_token
+        self.form_id = form_id
+        self.responses = []
+        self.files = {}
+        self.requests = {"responses": 0, "files": 0, "not_modified": 0}
+        self._lock = threading.Lock()
+        self._clock = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_response(self, name, pdf_bytes=None, seconds_later=1):
+        """Yeni bir gönderim ekler; `submitted_at` her seferinde ileri kayar."""
+        with self._lock:
+            self._clock += datetime.timedelta(seconds=seconds_later)
+            token = uuid.uuid4().hex
+            file_name = f"{token}.pdf"
+            self.files[file_name] = pdf_bytes if pdf_bytes is not None else make_pdf(name)
+            self.responses.append({
+                "token": token,
+                "response_id": token,
+                "submitted_at": self._clock.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "answers": [
+                    {"field": {"id": "f1", "ref": NAME_FIELD, "type": "short_text"}, "type": "text", "text": name},
+                    {"field": {"id": "f2", "ref": CV_FIELD, "type": "file_upload"}, "type": "file_url",
+                     "file_url": f"{self.url}/files/{file_name}"},
+                ],
+            })
+            return token
+
+    def webhook_event(self, token):
+        """Yanıtı Typeform webhook gövdesi (`form_response` olayı) olarak döndürür."""
+        with self._lock:
+            response = next(r for r in self.responses if r["token"] == token)
+        return {
+            "event_id": uuid.uuid4().hex,
+            "event_type": "form_response",
+            "form_response": dict(response, form_id=self.form_id),
+        }
+
+    def send_webhook(self, session, url, token, secret):
+        """Yanıtı imzalayıp `url`'ye POST eder; Typeform'un gönderdiği başlıklarla."""
+        body = json.dumps(self.webhook_event(token)).encode("utf-8")
+        return session.post(url, data=body, headers={"Content-Type": "application/json",
+                                                     "Typeform-Signature": sign_payload(secret, body)})
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.headers.get("Authorization") != f"Bearer {fake.access_token}":
+                    return self._json(401, {"code": "AUTHENTICATION_FAILED"})
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                if parsed.path == f"/forms/{fake.form_id}/responses":
+                    return self._responses(query)
+                if parsed.path.startswith("/files/"):
+                    return self._file(parsed.path[len("/files/"):])
+                return self._json(404, {"code": "NOT_FOUND"})
+
+            def _responses(self, query):
+                with fake._lock:
+                    fake.requests["responses"] += 1
+                    items = list(fake.responses)
+                if "since" in query:
+                    items = [r for r in items if r["submitted_at"] >= query["since"]]  # Typeform gibi kapsayıcı
+                if query.get("sort", "submitted_at,desc").endswith("desc"):
+                    items.reverse()
+                page_size = min(int(query.get("page_size", 25)), 1000)
+                page = items[:page_size]
+                return self._json(200, {"total_items": len(items), "page_count": -(-len(items) // page_size),
+                                        "items": page})
+
+            def _file(self, name):
+                data = fake.files.get(name)
+                if data is None:
+                    return self._json(404, {"code": "NOT_FOUND"})
+                etag = f'"{name}"'
+                with fake._lock:
+                    fake.requests["files"] += 1
+                    if self.headers.get("If-None-Match") == etag:
+                        fake.requests["not_modified"] += 1
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-typeform", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--responses", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    fake = FakeTypeform(port=args.port)
+    for number in range(args.responses):
+        fake.add_response(f"Aday {number + 1}")
+    print(f"Taklit Typeform: {fake.url}  form={fake.form_id}  token={fake.access_token}")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Gemini, Drive ve Sheets için bellekte çalışan taklitler (ölçüm betikleri için).
+
+Gerçek istemcilerin kullandığımız yüzeyini taklit eder; servis kodu
+değişmeden bunlara bağlanır:
+- `FakeGoogleClients`: `GoogleClients` yerine (`drive()`, `worksheet()`)
+- `FakeGemini.install()`: `google.generativeai.GenerativeModel` yerine
+Her taklit çağrı sayısı ve isteğe bağlı yapay gecikme tutar.
+"""
+import itertools
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import google.generativeai as genai
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+
+
+# ==========================================
+# 📁 DRIVE
+# ==========================================
+
+class _Request:
+    def __init__(self, drive, method, func):
+        self._drive = drive
+        self._method = method
+        self._func = func
+
+    def execute(self, num_retries=0):
+        return self._drive._call(self._method, self._func)
+
+
+class _Files:
+    def __init__(self, drive):
+        self._drive = drive
+
+    def create(self, body=None, media_body=None, fields=None, supportsAllDrives=None, **kwargs):
+        return _Request(self._drive, "create", lambda: self._drive._create(body or {}, media_body))
+
+    def list(self, q="", pageSize=100, pageToken=None, fields=None, **kwargs):
+        return _Request(self._drive, "list", lambda: self._drive._list(q, int(pageSize), pageToken))
+
+    def update(self, fileId, body=None, addParents=None, removeParents=None, fields=None, **kwargs):
+        return _Request(self._drive, "update",
+                        lambda: self._drive._update(fileId, body or {}, addParents, removeParents))
+
+    def get(self, fileId, fields=None, **kwargs):
+        return _Request(self._drive, "get", lambda: dict(self._drive.files_by_id[fileId], id=fileId))
+
+
+class FakeDrive:
+    """Drive v3 `files()` uçlarının (create/list/update/get) bellekteki karşılığı.
+
+    Sorgudan yalnızca `'<id>' in parents`, `mimeType = '...'`, `name = '...'`
+    ve `shortcutDetails.targetId = '...'` parçaları yorumlanır.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = float(latency)
+        self.files_by_id = {}
+        self.calls = {}
+        self.bytes_uploaded = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def files(self):
+        return _Files(self)
+
+    def _call(self, method, func):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            return func()
+
+    def _create(self, body, media_body):
+        file_id = f"file{next(self._ids)}"
+        size = 0
+        if media_body is not None:
+            size = media_body.size()
+            media_body.getbytes(0, size)  # gövde gerçekten okunur (akış kopyası dahil)
+            self.bytes_uploaded += size
+        self.files_by_id[file_id] = {
+            "name": body.get("name", ""),
+            "mimeType": body.get("mimeType", "application/pdf"),
+            "parents": list(body.get("parents") or []),
+            "shortcutDetails": dict(body.get("shortcutDetails") or {}),
+            "size": size,
+        }
+        return {"id": file_id}
+
+    def _update(self, file_id, body, add_parents, remove_parents):
+        meta = self.files_by_id[file_id]
+        parents = [p for p in meta["parents"] if p not in (remove_parents or "").split(",")]
+        for parent in (add_parents or "").split(","):
+            if parent and parent not in parents:
+                parents.append(parent)
+        meta["parents"] = parents
+        meta.update({k: v for k, v in body.items() if k != "parents"})
+        return {"id": file_id, "parents": list(parents)}
+
+    def _list(self, q, page_size, page_token):
+        parent = re.search(r"'([^']+)' in parents", q)
+        mime = re.search(r"mimeType\s*=\s*'([^']+)'", q)
+        name = re.search(r"name\s*=\s*'([^']+)'", q)
+        target = re.search(r"shortcutDetails\.targetId\s*=\s*'([^']+)'", q)
+        matches = [
+            {"id": file_id, "name": meta["name"], "mimeType": meta["mimeType"]}
+            for file_id, meta in self.files_by_id.items()
+            if (not parent or parent.group(1) in meta["parents"])
+            and (not mime or meta["mimeType"] == mime.group(1))
+            and (not name or meta["name"] == name.group(1))
+            and (not target or meta["shortcutDetails"].get("targetId") == target.group(1))
+        ]
+        start = int(page_token or 0)
+        response = {"files": matches[start:start + page_size]}
+        if start + page_size < len(matches):
+            response["nextPageToken"] = str(start + page_size)
+        return response
+
+    # --- Ölçüm yardımcıları ---
+
+    def folder_contents(self, folder_id):
+        return [meta["name"] for meta in self.files_by_id.values() if folder_id in meta["parents"]]
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+
+# ==========================================
+# 📊 SHEETS
+# ==========================================
+
+def _a1_to_rowcol(cell):
+    match = re.fullmatch(r"([A-Z]*)(\d*)", cell)
+    letters, digits = match.groups()
+    col = 0
+    for char in letters:
+        col = col * 26 + ord(char) - 64
+    return (int(digits) if digits else None), (col or None)
+
+
+class FakeWorksheet:
+    """gspread `Worksheet`'in `get_all_values` / `batch_get` / `batch_update` karşılığı."""
+
+    def __init__(self, rows, latency=0.0):
+        self.rows = [list(row) for row in rows]
+        self.latency = float(latency)
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _count(self, method):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    def _range(self, a1):
+        start, _, end = a1.partition(":")
+        row1, col1 = _a1_to_rowcol(start)
+        row2, col2 = _a1_to_rowcol(end) if end else (row1, col1)
+        row1, row2 = row1 or 1, row2 or len(self.rows)
+        width = max((len(row) for row in self.rows), default=0)
+        col1, col2 = col1 or 1, col2 or width
+        values = []
+        for row in self.rows[row1 - 1:row2]:
+            cells = row[col1 - 1:col2]
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def get_all_values(self):
+        with self._lock:
+            self._count("get_all_values")
+            return [list(row) for row in self.rows]
+
+    def batch_get(self, ranges):
+        with self._lock:
+            self._count("batch_get")
+            return [self._range(a1) for a1 in ranges]
+
+    def batch_update(self, data):
+        with self._lock:
+            self._count("batch_update")
+            for item in data:
+                row, col = _a1_to_rowcol(item["range"].split(":")[0])
+                while len(self.rows) < row:
+                    self.rows.append([])
+                cells = self.rows[row - 1]
+                while len(cells) < col:
+                    cells.append("")
+                cells[col - 1] = item["values"][0][0]
+
+    def append_row(self, values):
+        with self._lock:
+            self.rows.append(list(values))
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+
+class FakeGoogleClients:
+    """`GoogleClients` yerine geçer; tüm iş parçacıkları aynı taklitleri paylaşır."""
+
+    def __init__(self, drive=None, worksheets=None):
+        self._drive = drive or FakeDrive()
+        self._worksheets = worksheets or {}
+
+    def drive(self):
+        return self._drive
+
+    def worksheet(self, spreadsheet_name, worksheet):
+        return self._worksheets[(spreadsheet_name, worksheet)]
+
+
+# ==========================================
+# 🤖 GEMINI
+# ==========================================
+
+_CV_TAG = re.compile(r'<cv id="([^"]+)">\n(.*?)\n</cv>', re.S)
+
+
+class FakeGemini:
+    """Deterministik Gemini: yanıtı istekteki `response_schema`'dan ve CV metninden üretir.
+
+    - Ad, CV metninin ilk satırıdır (metin boşsa boş kalır; doğrulama ve
+      onarım yolu da böylece çalışır).
+    - Kategoriler şemadaki enum değerlerinden metinde geçenlerdir.
+    - Toplu istekte (`<cv id=...>` etiketleri) her CV için `id`'li bir
+      nesne döner; görsel (OCR) isteklerinde sabit bir aday üretilir.
+    """
+
+    def __init__(self, latency=0.0, per_cv_latency=0.0):
+        self.latency = float(latency)
+        self.per_cv_latency = float(per_cv_latency)
+        self.calls = 0
+        self.vision_calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def install(self):
+        original = genai.GenerativeModel
+        genai.GenerativeModel = lambda model_name, **kwargs: _FakeModel(self, model_name)
+        try:
+            yield self
+        finally:
+            genai.GenerativeModel = original
+
+    def generate(self, contents, generation_config):
+        parts = contents if isinstance(contents, list) else [contents]
+        prompt = "\n".join(part for part in parts if isinstance(part, str))
+        images = len(parts) - sum(isinstance(part, str) for part in parts)
+        schema = (generation_config or {}).get("response_schema") or {"type": "object", "properties": {}}
+
+        cvs = _CV_TAG.findall(prompt)
+        if images:
+            texts = [("", "Taranmış Aday\nEngineering")]
+        elif cvs:
+            texts = cvs
+        else:
+            texts = [("", prompt.rsplit("CV TEXT:\n", 1)[-1])]
+
+        with self._lock:
+            self.calls += 1
+            self.vision_calls += 1 if images else 0
+            self.prompt_chars += len(prompt)
+        delay = self.latency + self.per_cv_latency * len(texts)
+        if delay:
+            time.sleep(delay)
+
+        if schema.get("type") == "array":
+            payload = [dict(_fill(schema["items"], text), id=cv_id) for cv_id, text in texts]
+        else:
+            payload = _fill(schema, texts[0][1])
+        text = json.dumps(payload, ensure_ascii=False)
+        usage = SimpleNamespace(total_token_count=len(prompt) // 4 + images * 258 + len(text) // 4)
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class _FakeModel:
+    def __init__(self, gemini, model_name):
+        self._gemini = gemini
+        self.model_name = model_name
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        return self._gemini.generate(contents, generation_config)
+
+
+def _first_line(text):
+    return next((line.strip() for line in text.splitlines() if line.strip()), "")
+
+
+def _fill(schema, text, key=""):
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _fill(sub, text, name) for name, sub in schema.get("properties", {}).items()
+                if name != "id"}
+    if kind == "array":
+        items = schema.get("items", {})
+        if items.get("enum"):
+            lowered = text.lower()
+            found = [value for value in items["enum"] if value.lower() in lowered]
+            return found or ([items["enum"][0]] if text.strip() else [])
+        if not text.strip():
+            return []
+        return [_fill(items, text, key)]
+    if key == "name":
+        return _first_line(text)
+    if not text.strip():
+        return ""
+    return f"{key} ({_first_line(text)})"
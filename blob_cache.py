@@ -0,0 +1,145 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "blobs")
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+
+
+# ==========================================
+# 📦 YEREL PDF DEPOSU
+# ==========================================
+
+class BlobCache:
+    """Typeform PDF'lerini diskte tutan, boyut sınırlı (LRU) dosya deposu.
+
+    Anahtar, Typeform dosya URL'sinin (yanıt token'ını içerir) SHA-256
+    özetidir; ETag / Last-Modified / Content-Length kayıtla birlikte saklanır.
+    Doğrulayıcısı olan kayıtlar koşullu GET ile (304 → gövde inmez)
+    tazelenir; doğrulayıcısı olmayanlar Typeform yüklemeleri değişmediği
+    için doğrudan diskten verilir.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), timeout=30,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " key TEXT PRIMARY KEY, url TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " content_length INTEGER, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def lookup(self, url):
+        """Kayıt ve dosyası varsa sözlük olarak döndürür, yoksa None."""
+        key = self.key_for(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_length, size FROM blobs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not os.path.exists(self.path_for(key)):
+                # Dosya elle silinmiş; kaydı da düşürelim
+                self._conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+        if row is None:
+            return None
+        etag, last_modified, content_length, size = row
+        return {"key": key, "path": self.path_for(key), "etag": etag, "last_modified": last_modified,
+                "content_length": content_length, "size": size}
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, entry, revalidated=False):
+        with self._lock:
+            self.hits += 1
+            if revalidated:
+                self.revalidated += 1
+            self._conn.execute("UPDATE blobs SET last_used = ? WHERE key = ?", (time.time(), entry["key"]))
+            self._conn.commit()
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def new_temp_file(self):
+        """İndirmenin yazılacağı geçici dosya (aynı dizinde; commit'te atomik taşınır)."""
+        return tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False)
+
+    def commit(self, url, temp_path, etag=None, last_modified=None, content_length=None):
+        """Tamamlanan indirmeyi depoya alır; eksik inmişse (Content-Length uyuşmazlığı) None döner."""
+        size = os.path.getsize(temp_path)
+        if content_length is not None and int(content_length) != size:
+            os.remove(temp_path)
+            return None
+
+        key = self.key_for(url)
+        path = self.path_for(key)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (key, url, etag, last_modified, content_length, size, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, content_length, size, time.time()),
+            )
+            self._evict(keep=key)
+            self._conn.commit()
+        return path
+
+    def _evict(self, keep=None):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM blobs ORDER BY last_used ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+            try:
+                # Açık tutan okuyucular etkilenmez (POSIX'te dosya kapanana kadar yaşar)
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "entries": entries,
+            "bytes": size,
+        }
@@ -0,0 +1,201 @@
+import os
+
+from font_registry import SingleFacePDF
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+# Türkçe karakterler için gömülü font; yoksa Arial + karakter dönüştürme
+FONT_CANDIDATES = ("DejaVuSans.ttf", "Arial.ttf")
+
+
+def find_font_path():
+    for candidate in FONT_CANDIDATES:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+# ==========================================
+# 📄 STANDART CV PDF'İ
+# ==========================================
+
+class PDF(SingleFacePDF):
+    def __init__(self, font_family='Arial'):
+        super().__init__()
+        self.font_family = font_family
+
+    def header(self):
+        pass
+
+    def section_title(self, label):
+        # 'B' (Bold) için font ailesi desteği gerekir.
+        # Eğer özel font (DejaVu) kullanıyorsan ve Bold dosyasını yüklemediysen
+        # standart Arial'a düşebilir veya hata verebilir.
+        # Güvenlik için burada font_family değişkenini kullanıyoruz.
+        self.set_font(self.font_family, 'B', 12)
+        self.set_text_color(0, 51, 102)
+        self.cell(0, 10, label, 0, 1, 'L')
+        self.line(10, self.get_y(), 200, self.get_y())
+        self.ln(2)
+
+    def section_body(self, text):
+        self.set_font(self.font_family, '', 10)
+        self.set_text_color(0, 0, 0)
+        self.multi_cell(0, 5, text)
+        self.ln()
+
+
+def create_standardized_pdf(json_data):
+    """JSON verisinden PDF üretir (Özet ve Sertifikalar Eklendi)."""
+
+    # 1. Font Kontrolü
+    font_path = find_font_path()
+
+    # 2. PDF Başlatma
+    if font_path:
+        pdf = PDF(font_family='TrFont')
+        # Tek TTF yüzü tüm stiller için kullanılır; çıktıya tek bir alt küme gömülür.
+        # TTF süreç başına bir kez ayrıştırılır; burada sadece belgeye bağlanır.
+        pdf.use_font('TrFont', font_path)
+    else:
+        json_data = sanitize_json_recursively(json_data)
+        pdf = PDF(font_family='Arial')
+
+    pdf.add_page()
+    main_font = pdf.font_family
+
+    # --- ÜST BİLGİ (HEADER) ---
+    pdf.set_font(main_font, 'B', 16)
+    pdf.cell(0, 10, json_data.get('name', ''), 0, 1, 'C')
+
+    pdf.set_font(main_font, 'I', 12)
+    pdf.cell(0, 8, json_data.get('title', ''), 0, 1, 'C')
+
+    pdf.set_font(main_font, '', 10)
+    pdf.cell(0, 6, json_data.get('location', ''), 0, 1, 'C')
+
+    pdf.set_font(main_font, '', 9)
+    pdf.cell(0, 6, json_data.get('contact', ''), 0, 1, 'C')
+    pdf.ln(5)
+
+    # --- 🆕 SUMMARY (HAKKIMDA) ---
+    if json_data.get('summary'):
+        pdf.ln(5)  # Biraz boşluk
+        pdf.section_title('PROFESSIONAL SUMMARY')
+        pdf.section_body(json_data['summary'])
+
+    # --- EDUCATION ---
+    if json_data.get('education'):
+        pdf.section_title('EDUCATION')
+        for edu in json_data['education']:
+            pdf.set_font(main_font, 'B', 10)
+            pdf.cell(0, 5, f"{edu['degree']}", 0, 1)
+            pdf.set_font(main_font, '', 10)
+            pdf.cell(0, 5, f"{edu['school']} | {edu['year']}", 0, 1)
+            pdf.ln(2)
+
+    # --- EXPERIENCE ---
+    if json_data.get('experience'):
+        pdf.section_title('EXPERIENCE')
+        for exp in json_data['experience']:
+            pdf.set_font(main_font, 'B', 10)
+            pdf.write(5, f"{exp['role']} | ")
+            pdf.set_font(main_font, 'I', 10)
+            pdf.write(5, f"{exp['company']}")
+            pdf.ln(6)
+            pdf.set_font(main_font, '', 9)
+            pdf.multi_cell(0, 5, f"- {exp['description']}")
+            pdf.ln(3)
+
+    # --- PROJECTS ---
+    if json_data.get('projects'):
+        pdf.section_title('PROJECTS')
+        for proj in json_data['projects']:
+            pdf.set_font(main_font, 'B', 10)
+            pdf.write(5, f"{proj['name']}")
+            if proj.get('tech'):
+                pdf.set_font(main_font, 'I', 9)
+                pdf.write(5, f" ({proj['tech']})")
+            pdf.ln(6)
+            pdf.set_font(main_font, '', 9)
+            pdf.multi_cell(0, 5, f"{proj['details']}")
+            pdf.ln(3)
+
+    # --- 🆕 CERTIFICATES (SERTİFİKALAR) ---
+    if json_data.get('certificates'):
+        pdf.section_title('CERTIFICATES')
+        for cert in json_data['certificates']:
+            pdf.set_font(main_font, 'B', 10)
+            pdf.write(5, f"• {cert.get('name', '')}")
+
+            # Kurum ve Yıl bilgisi varsa parantez içinde ekleyelim
+            extras = []
+            if cert.get('issuer'): extras.append(cert['issuer'])
+            if cert.get('year'): extras.append(cert['year'])
+
+            if extras:
+                pdf.set_font(main_font, '', 10)
+                pdf.write(5, f" ({' - '.join(extras)})")
+
+            pdf.ln(5)
+        pdf.ln(2)
+
+    # --- SKILLS ---
+    if json_data.get('skills'):
+        pdf.section_title('TECHNICAL SKILLS')
+        skills = json_data['skills']
+        pdf.set_font(main_font, '', 10)
+        if isinstance(skills, dict):
+            for k, v in skills.items():
+                pdf.set_font(main_font, 'B', 10)
+                pdf.write(5, f"{k.capitalize()}: ")
+                pdf.set_font(main_font, '', 10)
+                pdf.write(5, v)
+                pdf.ln(5)
+        else:
+            pdf.multi_cell(0, 5, str(skills))
+        pdf.ln(2)
+
+    # --- LANGUAGES ---
+    if json_data.get('spoken_languages'):
+        pdf.section_title('LANGUAGES')
+        pdf.section_body(json_data['spoken_languages'])
+
+    # --- INTERESTS ---
+    if json_data.get('interests'):
+        pdf.section_title('INTERESTS')
+        pdf.section_body(json_data['interests'])
+
+    return pdf.output()
+
+
+def sanitize_text(text):
+    """Türkçe karakterleri İngilizce karşılıklarına çevirir (Font yoksa kullanılır)."""
+    if not isinstance(text, str):
+        return str(text)
+
+    replacements = {
+        'Ş': 'S', 'ş': 's',
+        'Ğ': 'G', 'ğ': 'g',
+        'İ': 'I', 'ı': 'i',
+        'Ö': 'O', 'ö': 'o',
+        'Ü': 'U', 'ü': 'u',
+        'Ç': 'C', 'ç': 'c'
+    }
+    for tr, eng in replacements.items():
+        text = text.replace(tr, eng)
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def sanitize_json_recursively(data):
+    """JSON içindeki tüm metinleri temizler."""
+    if isinstance(data, dict):
+        return {k: sanitize_json_recursively(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [sanitize_json_recursively(i) for i in data]
+    elif isinstance(data, str):
+        return sanitize_text(data)
+    else:
+        return data
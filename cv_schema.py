@@ -0,0 +1,166 @@
+import dataclasses
+import typing
+from dataclasses import dataclass, field
+
+# ==========================================
+# 🧾 CV VERİ MODELLERİ
+# ==========================================
+# Gemini'nin JSON kipinde istenen şema bu sınıflardan üretilir; dönen yanıt da
+# aynı sınıflara göre doğrulanır. Alan adları cv_pdf'in okuduğu anahtarlardır.
+
+
+@dataclass
+class Education:
+    degree: str = ""
+    school: str = ""
+    year: str = ""
+
+
+@dataclass
+class Experience:
+    role: str = ""
+    company: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    description: str = ""
+
+
+@dataclass
+class Project:
+    name: str = ""
+    tech: str = ""
+    details: str = ""
+
+
+@dataclass
+class Certificate:
+    name: str = ""
+    issuer: str = ""
+    year: str = ""
+
+
+@dataclass
+class Skills:
+    tech: str = ""
+
+
+@dataclass
+class CVData:
+    name: str
+    suggested_categories: typing.List[str]
+    title: str = ""
+    location: str = ""
+    contact: str = ""
+    summary: str = ""
+    education: typing.List[Education] = field(default_factory=list)
+    experience: typing.List[Experience] = field(default_factory=list)
+    projects: typing.List[Project] = field(default_factory=list)
+    certificates: typing.List[Certificate] = field(default_factory=list)
+    skills: Skills = field(default_factory=Skills)
+    spoken_languages: str = ""
+    interests: str = ""
+
+
+# ==========================================
+# 📐 ŞEMA (Gemini response_schema)
+# ==========================================
+
+def required_fields(cls):
+    """Varsayılanı olmayan (modelin mutlaka doldurması gereken) alanlar."""
+    return [f.name for f in dataclasses.fields(cls)
+            if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING]
+
+
+def _type_schema(tp, categories):
+    origin = typing.get_origin(tp)
+    if origin in (list, typing.List):
+        (item,) = typing.get_args(tp)
+        return {"type": "array", "items": _type_schema(item, categories)}
+    if dataclasses.is_dataclass(tp):
+        return response_schema(tp, categories)
+    return {"type": "string"}
+
+
+def response_schema(cls=CVData, categories=None, fields=None):
+    """Dataclass'tan Gemini'nin OpenAPI alt kümesindeki şemayı üretir.
+
+    `categories` verilirse `suggested_categories` bu listeyle sınırlanır;
+    `fields` verilirse sadece o alanlar istenir (hedefli onarım için).
+    """
+    hints = typing.get_type_hints(cls)
+    properties = {}
+    for f in dataclasses.fields(cls):
+        if fields is not None and f.name not in fields:
+            continue
+        schema = _type_schema(hints[f.name], categories)
+        if f.name == "suggested_categories" and categories:
+            schema["items"] = {"type": "string", "format": "enum", "enum": list(categories)}
+        properties[f.name] = schema
+    required = [name for name in required_fields(cls) if name in properties]
+    if fields is not None:
+        required = list(properties)
+    return {"type": "object", "properties": properties, "required": required}
+
+
+# ==========================================
+# ✅ DOĞRULAMA
+# ==========================================
+
+def _coerce(value, tp):
+    """Değeri türe uydurur; uydurulamıyorsa ValueError."""
+    origin = typing.get_origin(tp)
+    if origin in (list, typing.List):
+        (item,) = typing.get_args(tp)
+        if isinstance(value, (str, dict)) or not isinstance(value, (list, tuple)):
+            value = [value] if value not in (None, "") else []
+        return [_coerce(v, item) for v in value]
+    if dataclasses.is_dataclass(tp):
+        if not isinstance(value, dict):
+            raise ValueError(f"{tp.__name__} nesnesi bekleniyordu")
+        clean, problems = validate(value, tp)
+        if problems:
+            raise ValueError(", ".join(problems))
+        return clean
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        # Model bazen "List" yazılan alanlara dizi döndürüyor
+        return ", ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        raise ValueError("metin bekleniyordu")
+    return str(value)
+
+
+def validate(data, cls=CVData, categories=None):
+    """Modele göre temizlenmiş sözlük ve sorunlu (eksik / geçersiz) alan adları döndürür.
+
+    Varsayılanı olan alanlar eksikse varsayılanla doldurulur; zorunlu alanlar
+    boşsa ya da bir alan türüne uydurulamıyorsa adı sorun listesine girer.
+    """
+    if not isinstance(data, dict):
+        return None, [f.name for f in dataclasses.fields(cls)]
+    hints = typing.get_type_hints(cls)
+    required = set(required_fields(cls))
+    clean, problems = {}, []
+    for f in dataclasses.fields(cls):
+        value = data.get(f.name)
+        if value is None:
+            if f.name in required:
+                problems.append(f.name)
+                continue
+            default = f.default if f.default is not dataclasses.MISSING else f.default_factory()
+            if not dataclasses.is_dataclass(default):  # boş alt nesne PDF'te boş bölüm açmasın
+                clean[f.name] = default
+            continue
+        try:
+            value = _coerce(value, hints[f.name])
+        except (ValueError, TypeError):
+            problems.append(f.name)
+            continue
+        if f.name == "suggested_categories" and categories:
+            value = [c for c in value if c in categories]
+        if f.name in required and not value:
+            problems.append(f.name)
+            continue
+        clean[f.name] = value
+    return clean, problems
@@ -0,0 +1,216 @@
+import io
+import mmap
+import os
+import tempfile
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import METRICS
+
+DEFAULT_TIMEOUT = 60          # saniye (okuma); bağlantı için ayrıca CONNECT_TIMEOUT
+CONNECT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 8         # toplu işlemdeki indirme eşzamanlılığı ile aynı tutun
+SPOOL_MAX_BYTES = 4 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+# ==========================================
+# 📄 İNDİRİLEN PDF
+# ==========================================
+
+class PdfDownload:
+    """İndirilen dosya; küçükse bellekte, `SPOOL_MAX_BYTES` üstündeyse geçici dosyada durur.
+
+    `view()` kopyasız bir memoryview verir (fitz ve SHA-256 için),
+    `fileobj()` ise Drive yüklemesinde doğrudan kullanılabilen dosya nesnesidir.
+    Yerel depodan gelen dosyalar (`from_path`) her zaman mmap ile okunur.
+    """
+
+    def __init__(self, status_code, spool_max=SPOOL_MAX_BYTES):
+        self.status_code = status_code
+        self.size = 0
+        self.path = None  # yerel depodan geliyorsa dosya yolu
+        self._spool_max = spool_max
+        self._file = io.BytesIO()
+        self._on_disk = False
+        self._mmap = None
+
+    @classmethod
+    def from_path(cls, path, status_code=200):
+        download = cls(status_code)
+        download._file = open(path, "rb")
+        download.path = path
+        download._on_disk = True
+        download.size = os.fstat(download._file.fileno()).st_size
+        return download
+
+    def write(self, chunk):
+        if not self._on_disk and self.size + len(chunk) > self._spool_max:
+            disk_file = tempfile.TemporaryFile()
+            disk_file.write(self._file.getbuffer())
+            self._file = disk_file
+            self._on_disk = True
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def view(self):
+        if not self._on_disk:
+            return self._file.getbuffer()
+        if self.size == 0:
+            return memoryview(b"")
+        if self._mmap is None:
+            self._file.flush()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def fileobj(self):
+        self._file.seek(0)
+        return self._file
+
+    def read(self):
+        return bytes(self.view())
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Hâlâ açık bir memoryview varsa GC kapatsın
+                pass
+            self._mmap = None
+        try:
+            self._file.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ==========================================
+# 🌐 İNDİRME İSTEMCİSİ
+# ==========================================
+
+class DownloadClient:
+    """Typeform dosyaları için bağlantı havuzlu, yeniden deneyen tek oturum."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, retries=4, backoff_factor=0.5,
+                 backoff_jitter=0.5, spool_max=SPOOL_MAX_BYTES, blob_cache=None, rate_limit=None):
+        self.timeout = (CONNECT_TIMEOUT, float(timeout))
+        self.spool_max = spool_max
+        self.blob_cache = blob_cache
+        self.rate_limit = rate_limit  # Typeform dosya kovası (`typeform_files`, bkz. rate_limit); yerel depodan okumalar harcamaz
+        self.retries = retries
+
+        # Kova varsa 429'u urllib3 değil `_get` yeniden dener: her deneme kovadan yer alır
+        # ve bekleme kovaya bırakılır (call_with_backoff gibi); diğer işçiler de yavaşlar.
+        # urllib3 Retry-After taşıyan 429'u listede olmasa da yeniden dener; o yüzden başlığa
+        # da sadece kova yokken uyar.
+        retry_statuses = [500, 502, 503, 504] if rate_limit is not None else [429, 500, 502, 503, 504]
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=retry_statuses,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=rate_limit is None,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, int(pool_size)), max_retries=retry,
+                              pool_block=True)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _get(self, url, headers):
+        """Akışlı GET; kova varsa her deneme kovadan yer alır, 429'da kova yavaşlar ve yeniden denenir."""
+        attempts = self.retries + 1 if self.rate_limit is not None else 1
+        for attempt in range(attempts):
+            if self.rate_limit is not None:
+                self.rate_limit.acquire()
+            started = time.perf_counter()
+            resp = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            # Akışlı yanıtta süre ilk bayta kadardır; gövde `bytes` sayacına yansır
+            METRICS.observe("api_seconds", time.perf_counter() - started, upstream="typeform")
+            outcome = "rate_limited" if resp.status_code == 429 else ("error" if resp.status_code >= 400 else "ok")
+            METRICS.inc("api_calls", upstream="typeform", outcome=outcome)
+            if self.rate_limit is None:
+                return resp
+            if resp.status_code != 429:
+                self.rate_limit.on_success()
+                return resp
+            retry_after = resp.headers.get("Retry-After")
+            self.rate_limit.on_rate_limited(float(retry_after) if retry_after and retry_after.isdigit() else None)
+            if attempt < attempts - 1:
+                resp.close()
+        return resp
+
+    def fetch(self, url, headers=None):
+        """Dosyayı parça parça indirir; `resp.content` belleğe hiç alınmaz.
+
+        Yerel depo tanımlıysa önce ona bakılır; dosya bir kez indikten sonra
+        sonraki aşamalar ve tekrar çalıştırmalar diskten (mmap) okur.
+        """
+        if self.blob_cache is not None:
+            return self._fetch_cached(url, headers)
+
+        with self._get(url, headers) as resp:
+            download = PdfDownload(resp.status_code, self.spool_max)
+            if resp.status_code == 200:
+                try:
+                    for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:
+                            download.write(chunk)
+                except Exception:
+                    download.close()
+                    raise
+                METRICS.inc("bytes", download.size, direction="in", upstream="typeform")
+        return download
+
+    def _fetch_cached(self, url, headers):
+        cache = self.blob_cache
+        entry = cache.lookup(url)
+        if entry is not None:
+            conditional = cache.conditional_headers(entry)
+            if not conditional:
+                # Doğrulayıcı yok: Typeform yüklemeleri değişmez, ağa hiç çıkmıyoruz
+                cache.hit(entry)
+                return PdfDownload.from_path(entry["path"])
+            headers = dict(headers or {}, **conditional)
+        else:
+            cache.miss()
+
+        with self._get(url, headers) as resp:
+            if resp.status_code == 304 and entry is not None:
+                cache.hit(entry, revalidated=True)
+                return PdfDownload.from_path(entry["path"])
+            if resp.status_code != 200:
+                return PdfDownload(resp.status_code)
+
+            temp = cache.new_temp_file()
+            received = 0
+            try:
+                with temp:
+                    for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:
+                            temp.write(chunk)
+                            received += len(chunk)
+                METRICS.inc("bytes", received, direction="in", upstream="typeform")
+                # Sıkıştırılmış yanıtlarda Content-Length gövdeyle eşleşmez, doğrulamada kullanmıyoruz
+                content_length = None if resp.headers.get("Content-Encoding") else resp.headers.get("Content-Length")
+                path = cache.commit(url, temp.name, etag=resp.headers.get("ETag"),
+                                    last_modified=resp.headers.get("Last-Modified"), content_length=content_length)
+            except Exception:
+                if os.path.exists(temp.name):
+                    os.remove(temp.name)
+                raise
+
+        if path is None:
+            raise IOError(f"İndirme eksik tamamlandı: {url}")
+        return PdfDownload.from_path(path)
@@ -0,0 +1,101 @@
+import threading
+
+from batch_runner import call_with_backoff
+from rate_limit import RATE_LIMITS
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+
+# ==========================================
+# 📁 DRIVE KLASÖR İNDEKSİ
+# ==========================================
+
+class FolderIndex:
+    """(parent_id, klasör adı) → folder_id eşlemesini bellekte tutar.
+
+    Her üst klasör bir kez listelenir; sonraki çağrılar API'ye gitmez.
+    Sadece indekste olmayan bir ad istendiğinde üst klasör yeniden listelenir,
+    hâlâ yoksa klasör oluşturulur. Aynı anahtar için tek kilit kullanıldığından
+    iki işçi aynı kategori klasörünü iki kez oluşturamaz.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _lock_for(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def warm(self, service, parent_id):
+        """Üst klasördeki tüm alt klasörleri tek listelemeyle indekse alır."""
+        if not parent_id:
+            return
+        query = f"'{parent_id}' in parents and mimeType = '{FOLDER_MIME}' and trashed = false"
+        found = {}
+        page_token = None
+        while True:
+            response = call_with_backoff(service.files().list(
+                q=query,
+                spaces='drive',
+                fields='nextPageToken, files(id, name)',
+                orderBy='createdTime',
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ).execute, limit=RATE_LIMITS["drive"])
+            for item in response.get('files', []):
+                # Aynı isimde birden fazla klasör varsa en eskisi kazanır
+                found.setdefault(item['name'].strip(), item['id'])
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        with self._lock:
+            for name, folder_id in found.items():
+                self._ids.setdefault((parent_id, name), folder_id)
+
+    def get_or_create(self, service, folder_name, parent_id):
+        key = (parent_id, folder_name.strip())
+        folder_id = self._ids.get(key)
+        if folder_id:
+            return folder_id
+
+        with self._lock_for(key):
+            # Kilidi beklerken başka bir işçi oluşturmuş olabilir
+            folder_id = self._ids.get(key)
+            if folder_id:
+                return folder_id
+
+            # Iska: Drive'da bizim dışımızda oluşturulmuş olabilir, üst klasörü tazele
+            self.warm(service, parent_id)
+            folder_id = self._ids.get(key)
+            if folder_id:
+                return folder_id
+
+            meta = {
+                'name': key[1],
+                'mimeType': FOLDER_MIME,
+                'parents': [parent_id]
+            }
+            folder = call_with_backoff(service.files().create(
+                body=meta,
+                fields='id',
+                supportsAllDrives=True
+            ).execute, limit=RATE_LIMITS["drive"])
+            folder_id = folder.get('id')
+            with self._lock:
+                self._ids[key] = folder_id
+            return folder_id
+
+    def children(self, parent_id):
+        """İndekste bilinen alt klasörler: {ad: folder_id}."""
+        with self._lock:
+            return {name: folder_id for (parent, name), folder_id in self._ids.items() if parent == parent_id}
+
+    def forget(self, folder_name, parent_id):
+        """Silinen/taşınan bir klasörü indeksten düşürür."""
+        with self._lock:
+            self._ids.pop((parent_id, folder_name.strip()), None)
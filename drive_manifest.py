@@ -0,0 +1,84 @@
+import threading
+import time
+
+from batch_runner import call_with_backoff
+from rate_limit import RATE_LIMITS
+
+DEFAULT_MAX_AGE = 600  # saniye; load_data önbelleğiyle aynı
+
+
+# ==========================================
+# 🧾 DRIVE DOSYA MANİFESTOSU
+# ==========================================
+
+class FolderManifest:
+    """Her klasör için bir kez alınan ad → fileId anlık görüntüsü.
+
+    "Bu dosya zaten yüklendi mi?" sorularını aday başına `files().list`
+    yerine bellekteki kümeden yanıtlar. Başarılı yüklemeler `record` ile
+    yerelde işlenir; görüntü `max_age` saniyeden eskiyse bir sonraki
+    sorguda klasör tekrar listelenir.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._folders = {}  # folder_id -> (alınma zamanı, {ad: fileId})
+        self._lock = threading.Lock()
+        self._folder_locks = {}
+
+    def _lock_for(self, folder_id):
+        with self._lock:
+            return self._folder_locks.setdefault(folder_id, threading.Lock())
+
+    def _is_fresh(self, folder_id):
+        entry = self._folders.get(folder_id)
+        return entry is not None and (self.max_age is None or time.time() - entry[0] < self.max_age)
+
+    def _files(self, service, folder_id):
+        if self._is_fresh(folder_id):
+            return self._folders[folder_id][1]
+
+        with self._lock_for(folder_id):
+            if self._is_fresh(folder_id):
+                return self._folders[folder_id][1]
+
+            files = {}
+            page_token = None
+            while True:
+                response = call_with_backoff(service.files().list(
+                    q=f"'{folder_id}' in parents and trashed = false",
+                    fields='nextPageToken, files(id, name)',
+                    pageSize=1000,
+                    pageToken=page_token,
+                    supportsAllDrives=True,
+                    includeItemsFromAllDrives=True
+                ).execute, limit=RATE_LIMITS["drive"])
+                for item in response.get('files', []):
+                    files.setdefault(item['name'], item['id'])
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+
+            with self._lock:
+                self._folders[folder_id] = (time.time(), files)
+            return files
+
+    def find(self, service, folder_id, file_name):
+        return self._files(service, folder_id).get(file_name)
+
+    def exists(self, service, folder_id, file_name):
+        return file_name in self._files(service, folder_id)
+
+    def record(self, folder_id, file_name, file_id):
+        """Başarılı bir yüklemeyi, klasörü yeniden listelemeden manifeste işler."""
+        with self._lock:
+            entry = self._folders.get(folder_id)
+            if entry is not None:
+                entry[1][file_name] = file_id
+
+    def invalidate(self, folder_id=None):
+        with self._lock:
+            if folder_id is None:
+                self._folders.clear()
+            else:
+                self._folders.pop(folder_id, None)
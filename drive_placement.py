@@ -0,0 +1,76 @@
+from batch_runner import call_with_backoff
+from metrics import METRICS
+from rate_limit import RATE_LIMITS
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+PLACEMENT_COPY = "copy"          # her kategori klasörüne ayrı yükleme (eski davranış)
+PLACEMENT_SHORTCUT = "shortcut"  # bir kez yükle, diğer klasörlere aynı adla Drive kısayolu koy
+PLACEMENT_PARENTS = "parents"    # bir kez yükle, diğer klasörleri ek üst klasör yap (yalnız My Drive)
+PLACEMENT_MODES = (PLACEMENT_COPY, PLACEMENT_SHORTCUT, PLACEMENT_PARENTS)
+
+SHORTCUT_MIME = "application/vnd.google-apps.shortcut"
+
+
+def placement_mode(value):
+    """Ayar değerini doğrular; boşsa eski davranış (kopya)."""
+    mode = str(value or PLACEMENT_COPY).strip().lower()
+    if mode not in PLACEMENT_MODES:
+        raise ValueError(f"Bilinmeyen Drive yerleşim modu: {value!r} (seçenekler: {', '.join(PLACEMENT_MODES)})")
+    return mode
+
+
+# ==========================================
+# 🔗 TEK YÜKLEME, ÇOK KLASÖR
+# ==========================================
+
+def resolve_target(service, file_id):
+    """Klasördeki öğe bir kısayolsa gösterdiği dosyanın kimliğini, değilse kendisini döndürür."""
+    meta = call_with_backoff(service.files().get(fileId=file_id, fields="id, mimeType, shortcutDetails",
+                                                 supportsAllDrives=True).execute,
+                             limit=RATE_LIMITS["drive"])
+    if meta.get("mimeType") == SHORTCUT_MIME:
+        return (meta.get("shortcutDetails") or {}).get("targetId") or file_id
+    return file_id
+
+
+def create_shortcut(service, target_id, folder_id, file_name):
+    """`folder_id` içine `target_id`'yi gösteren, aynı adlı kısayol koyar; kısayolun kimliğini döndürür."""
+    body = {
+        'name': file_name,
+        'mimeType': SHORTCUT_MIME,
+        'parents': [folder_id],
+        'shortcutDetails': {'targetId': target_id},
+    }
+    created = call_with_backoff(service.files().create(body=body, fields='id', supportsAllDrives=True).execute,
+                                limit=RATE_LIMITS["drive"])
+    METRICS.inc("drive_links", mode=PLACEMENT_SHORTCUT)
+    return created.get('id')
+
+
+def add_parent(service, file_id, folder_id):
+    """Dosyayı `folder_id`'ye ek üst klasör olarak bağlar; klasörde görünen kimlik dosyanın kendisidir."""
+    call_with_backoff(service.files().update(fileId=file_id, addParents=folder_id, fields='id, parents',
+                                             supportsAllDrives=True).execute,
+                      limit=RATE_LIMITS["drive"])
+    METRICS.inc("drive_links", mode=PLACEMENT_PARENTS)
+    return file_id
+
+
+def link_into(service, mode, target_id, folder_id, file_name):
+    """Yüklenmiş dosyayı klasöre bağlar; klasörde görünen öğenin kimliğini döndürür.
+
+    Paylaşılan drive'larda bir dosyanın tek üst klasörü olabilir (My Drive'da
+    da çoklu üst klasör kullanımdan kalkıyor); ek üst klasör reddedilirse
+    (403) kısayola düşülür.
+    """
+    if mode == PLACEMENT_PARENTS:
+        try:
+            return add_parent(service, target_id, folder_id)
+        except Exception as e:
+            if getattr(getattr(e, "resp", None), "status", None) != 403:  # googleapiclient HttpError
+                raise
+            print(f"⚠️ Ek üst klasör reddedildi, kısayol kullanılıyor: {e}")
+    return create_shortcut(service, target_id, folder_id, file_name)
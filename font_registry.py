@@ -0,0 +1,124 @@
+import copy
+import io
+import os
+import threading
+
+from fontTools import ttLib
+from fpdf import FPDF
+
+try:
+    from fpdf.fonts import SubsetMap
+except ImportError:  # fpdf2 iç yapısı değiştiyse kopyalama kapalı, düz add_font kullanılır
+    SubsetMap = None
+
+# Kopyalanan TTFFont'ta PDF başına yenilenen (fpdf2'nin özel) alanlar; requirements.txt'te
+# fpdf2 sürümü bu alanların denendiği aralığa sabitlenir
+PER_PDF_ATTRS = ("i", "fontkey", "ttfont", "_hbfont", "biggest_size_pt", "missing_glyphs", "subset")
+
+# ==========================================
+# 🔤 SÜREÇ GENELİ FONT KAYDI
+# ==========================================
+
+
+class FontRegistry:
+    """TTF dosyasını süreç başına bir kez ayrıştırır ve PDF'lere kopyasını bağlar.
+
+    fpdf2 `add_font` her çağrıda TTF'i fontTools ile baştan okur; cmap,
+    glif genişlikleri ve font tanımlayıcısını yeniden hesaplar. Burada bu
+    salt-okunur metrikler ilk ayrıştırmadan paylaşılır; her PDF'e sadece
+    kendi alt küme (subset) durumu ve çıktı sırasında değiştirilecek
+    TTFont nesnesi yeni verilir. Bu alanlar fpdf2'nin iç yapısıdır; şablonda
+    beklenen alanlar yoksa ya da kopyalama hata verirse düz `add_font`
+    kullanılır (yavaş ama doğru).
+    """
+
+    def __init__(self):
+        self._templates = {}  # (yol, stil) -> (TTFFont şablonu, font baytları)
+        self._lock = threading.Lock()
+
+    def _template(self, path, style):
+        key = (os.path.abspath(path), style)
+        template = self._templates.get(key)
+        if template is not None:
+            return template
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                scratch = FPDF()
+                scratch.add_font("registry", style, path)
+                with open(path, "rb") as font_file:
+                    font_bytes = font_file.read()
+                template = (scratch.fonts[f"registry{style}"], font_bytes)
+                self._templates[key] = template
+        return template
+
+    def attach(self, pdf, family, path, styles=("",)):
+        """`pdf.add_font(family, stil, path)` ile aynı sonucu, ayrıştırma yapmadan verir."""
+        for style in styles:
+            style = "".join(sorted(style.upper()))
+            fontkey = f"{family.lower()}{style}"
+            if fontkey in pdf.fonts:
+                continue
+
+            template, font_bytes = self._template(path, style)
+            font = self._clone(template, font_bytes, len(pdf.fonts) + 1, fontkey)
+            if font is None:
+                pdf.add_font(family, style, path)
+            else:
+                pdf.fonts[fontkey] = font
+
+    @staticmethod
+    def _clone(template, font_bytes, index, fontkey):
+        if SubsetMap is None or not all(hasattr(template, attr) for attr in PER_PDF_ATTRS):
+            return None
+        try:
+            font = copy.copy(template)
+            font.i = index
+            font.fontkey = fontkey
+            # Çıktıda alt kümeleme TTFont'u yerinde değiştirir; her PDF kendi (tembel) kopyasını alır
+            font.ttfont = ttLib.TTFont(io.BytesIO(font_bytes), recalcTimestamp=False, lazy=True)
+            font._hbfont = None
+            font.biggest_size_pt = 0
+            font.missing_glyphs = []
+            font.subset = SubsetMap(font)
+        except Exception as e:
+            print(f"⚠️ Font kopyalanamadı, add_font kullanılıyor: {e}")
+            return None
+        return font
+
+    def preload(self, path, styles=("",)):
+        """Uygulama açılışında fontu önceden ayrıştırır (ilk CV beklemesin)."""
+        for style in styles:
+            self._template(path, "".join(sorted(style.upper())))
+
+
+FONT_REGISTRY = FontRegistry()
+
+
+# ==========================================
+# 📄 TEK FONTLU PDF
+# ==========================================
+
+class SingleFacePDF(FPDF):
+    """Tüm stilleri tek bir TTF yüzüyle yazan, sıkıştırılmış çıktı üreten PDF.
+
+    Elimizde sadece DejaVuSans.ttf var; B/I/BI için aynı dosyayı ayrı ayrı
+    kaydetmek çıktıya aynı fontun dört alt kümesini gömüyordu. Burada font
+    bir kez bağlanır ve kalın/italik istekleri düz stile yönlendirilir
+    (görünüm aynı, çünkü dosya zaten aynıydı). U/S gibi çizgi stilleri korunur.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compress = True  # içerik ve font akışları FlateDecode ile
+        self._single_face_families = set()
+
+    def use_font(self, family, path, registry=FONT_REGISTRY):
+        registry.attach(self, family, path)
+        self._single_face_families.add(family.lower())
+
+    def set_font(self, family=None, style="", size=0):
+        if (family or self.font_family).lower() in self._single_face_families and isinstance(style, str):
+            style = style.upper().replace("B", "").replace("I", "")
+        super().set_font(family, style, size)
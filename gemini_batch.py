@@ -0,0 +1,255 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import google.generativeai as genai
+
+from batch_runner import call_with_backoff
+from cv_schema import CVData, required_fields, response_schema, validate
+from rate_limit import estimate_tokens, record_gemini_usage
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_BATCH_SIZE = 6             # bir istekteki en fazla CV (çıktı token sınırı için)
+DEFAULT_BATCH_TOKENS = 24000       # bir istekteki CV metinlerinin toplam (tahmini) token bütçesi
+DEFAULT_LINGER = 0.5               # saniye; ilk CV geldikten sonra diğerleri için bekleme
+OUTPUT_TOKENS_PER_CV = 1500
+
+BATCH_INSTRUCTIONS = """
+You will receive {count} CVs, each wrapped in <cv id="..."> ... </cv> tags.
+Apply the instructions above to EACH CV independently; never mix data between CVs.
+Return ONLY a JSON array with exactly one object per CV. Each object follows the
+schema above and has an extra "id" field equal to the id attribute of its CV.
+"""
+
+REPAIR_INSTRUCTIONS = """
+An earlier extraction of this CV returned missing or invalid values for these fields: {fields}.
+Return ONLY a JSON object containing exactly these fields, following the rules above.
+"""
+
+
+def parse_json_text(text):
+    """Model çıktısındaki (JSON kipinde normalde olmayan) markdown çitlerini atıp JSON'u çözer."""
+    return json.loads(text.replace("```json", "").replace("```", "").strip())
+
+
+def json_config(schema):
+    """Gemini'nin yerel JSON kipi: yanıt doğrudan şemaya uyan JSON olur."""
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+# ==========================================
+# 📦 TOPLU GEMINI ÇIKARIMI
+# ==========================================
+
+class _Entry:
+    __slots__ = ("text", "tokens", "future")
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = estimate_tokens(text, output_tokens=0)
+        self.future = Future()
+
+
+class GeminiBatcher:
+    """Eşzamanlı işçilerin CV metinlerini tek Gemini isteğinde toplar.
+
+    Her işçi `extract(text)` ile bekler; ilk CV geldikten sonra `linger`
+    saniye boyunca gelenler token bütçesi ve adet sınırına kadar aynı isteğe
+    eklenir. Talimat/şema metni istek başına bir kez gönderilir.
+
+    İstekler Gemini'nin JSON kipinde, `schema_class` modelinden üretilen
+    şemayla yapılır (toplu istekte `id` alanlı dizi). Her kayıt modele göre
+    ayrı doğrulanır; sadece bazı alanları eksik/geçersiz olan kayıt için
+    yalnızca o alanlar yeniden istenir. Yanıtta hiç yer almayan kayıtlar
+    (veya istek tümden başarısızsa hepsi) tek başına yeniden istenir.
+    """
+
+    def __init__(self, model_name, instructions, limit=None, schema_class=CVData, categories=None,
+                 max_batch_size=DEFAULT_BATCH_SIZE, max_batch_tokens=DEFAULT_BATCH_TOKENS,
+                 linger=DEFAULT_LINGER, max_inflight=2):
+        self.model_name = model_name
+        self.instructions = instructions.strip()
+        self.limit = limit
+        self.schema_class = schema_class
+        self.categories = list(categories) if categories else None
+        self.schema = response_schema(schema_class, self.categories)
+        self.required = set(required_fields(schema_class))
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_tokens = int(max_batch_tokens)
+        self.linger = float(linger)
+        self.calls = 0
+        self.candidates = 0
+        self.batched = 0         # toplu istekte başarıyla dönen CV sayısı
+        self.retried_alone = 0
+        self.repairs = 0         # sadece eksik alanların yeniden istendiği çağrılar
+        self._pending = []
+        self._cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_inflight)), thread_name_prefix="gemini-batch")
+        self._dispatcher = None
+
+    # --- Dışa açık ---
+
+    def extract(self, text):
+        """CV metnini JSON'a çevirir; başarısızsa None (eski `extract_*` fonksiyonlarıyla aynı sözleşme)."""
+        if self.max_batch_size == 1:
+            return self._extract_alone(text)
+        entry = _Entry(text)
+        with self._cond:
+            self._pending.append(entry)
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch, name="gemini-batcher", daemon=True)
+                self._dispatcher.start()
+            self._cond.notify()
+        return entry.future.result()
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "candidates": self.candidates,
+            "batched": self.batched,
+            "retried_alone": self.retried_alone,
+            "repairs": self.repairs,
+            "calls_per_candidate": round(self.calls / self.candidates, 3) if self.candidates else 0.0,
+        }
+
+    def check(self, item):
+        """Başka yoldan (ör. OCR) gelen yanıtı doğrular; zorunlu alanlar eksikse None."""
+        clean, problems = validate(item, self.schema_class, self.categories)
+        if clean is None or self.required.intersection(problems):
+            return None
+        return clean
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    # --- Gruplama ---
+
+    def _full(self):
+        tokens = sum(entry.tokens for entry in self._pending[:self.max_batch_size])
+        return len(self._pending) >= self.max_batch_size or tokens >= self.max_batch_tokens
+
+    def _take_batch(self):
+        batch, tokens = [], 0
+        while self._pending and len(batch) < self.max_batch_size:
+            entry = self._pending[0]
+            if batch and tokens + entry.tokens > self.max_batch_tokens:
+                break
+            batch.append(self._pending.pop(0))
+            tokens += entry.tokens
+        return batch
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    # Boşta kalan dağıtıcı kapanır; sonraki `extract` yenisini açar
+                    if not self._cond.wait(timeout=30) and not self._pending:
+                        self._dispatcher = None
+                        return
+                    continue
+                deadline = time.monotonic() + self.linger
+                while not self._full():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+                batch = self._take_batch()
+            self._pool.submit(self._run_batch, batch)
+
+    # --- Gemini çağrıları ---
+
+    def _generate(self, prompt, output_tokens, schema):
+        model = genai.GenerativeModel(self.model_name)
+        cost = estimate_tokens(prompt, output_tokens=output_tokens)
+        response = call_with_backoff(model.generate_content, prompt, generation_config=json_config(schema),
+                                     limit=self.limit, cost=cost)
+        self._count(calls=1)
+        if self.limit is not None:
+            record_gemini_usage(self.limit, response, cost)
+        return parse_json_text(response.text)
+
+    def _finish(self, text, item):
+        """Doğrulanmış kaydı döndürür; sorunlu alanlar varsa sadece onları onarır."""
+        clean, problems = validate(item, self.schema_class, self.categories)
+        if not problems:
+            return clean
+        if clean is None:
+            return None
+        return self._repair(text, clean, problems)
+
+    def _extract_alone(self, text):
+        self._count(candidates=1)
+        try:
+            item = self._generate(f"{self.instructions}\n\nCV TEXT:\n{text}", OUTPUT_TOKENS_PER_CV, self.schema)
+        except Exception as e:
+            print(f"Gemini Hatası: {e}")
+            return None
+        return self._finish(text, item)
+
+    def _repair(self, text, partial, fields):
+        self._count(repairs=1)
+        prompt = "\n\n".join([self.instructions, REPAIR_INSTRUCTIONS.format(fields=", ".join(fields)).strip(),
+                              f"CV TEXT:\n{text}"])
+        schema = response_schema(self.schema_class, self.categories, fields=fields)
+        try:
+            patch = self._generate(prompt, OUTPUT_TOKENS_PER_CV // 2, schema)
+        except Exception as e:
+            print(f"Gemini onarım hatası ({', '.join(fields)}): {e}")
+            patch = {}
+        merged = dict(partial)
+        if isinstance(patch, dict):
+            merged.update({name: patch[name] for name in fields if name in patch})
+        clean, problems = validate(merged, self.schema_class, self.categories)
+        if clean is None or self.required.intersection(problems):
+            return None
+        # Hâlâ geçersiz olan isteğe bağlı alanlar boş bırakılır (cv_pdf yoksa atlar)
+        return clean
+
+    def _batch_prompt(self, batch):
+        parts = [self.instructions, BATCH_INSTRUCTIONS.format(count=len(batch))]
+        for number, entry in enumerate(batch):
+            parts.append(f'<cv id="{number}">\n{entry.text}\n</cv>')
+        return "\n\n".join(parts)
+
+    def _batch_schema(self):
+        item = dict(self.schema, properties=dict(self.schema["properties"], id={"type": "string"}),
+                    required=[*self.schema["required"], "id"])
+        return {"type": "array", "items": item}
+
+    def _run_batch(self, batch):
+        if len(batch) == 1:
+            entry = batch[0]
+            self._resolve(entry, self._extract_alone, entry.text)
+            return
+
+        results = {}
+        try:
+            items = self._generate(self._batch_prompt(batch), OUTPUT_TOKENS_PER_CV * len(batch), self._batch_schema())
+            for item in items if isinstance(items, list) else []:
+                if isinstance(item, dict) and "id" in item:
+                    results[str(item.pop("id"))] = item
+        except Exception as e:
+            print(f"Gemini toplu istek hatası ({len(batch)} CV), tek tek deneniyor: {e}")
+
+        for number, entry in enumerate(batch):
+            item = results.get(str(number))
+            if item is not None:
+                self._count(candidates=1, batched=1)
+                self._resolve(entry, self._finish, entry.text, item)
+            else:
+                self._count(retried_alone=1)
+                self._resolve(entry, self._extract_alone, entry.text)
+
+    @staticmethod
+    def _resolve(entry, func, *args):
+        try:
+            entry.future.set_result(func(*args))
+        except Exception as e:
+            entry.future.set_exception(e)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "gemini_cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+
+# ==========================================
+# 🗄️ KALICI GEMINI ÖNBELLEĞİ
+# ==========================================
+
+class GeminiCache:
+    """Gemini çıktılarını diskte (SQLite) tutar.
+
+    Anahtar, PDF baytlarının SHA-256 özeti + model adı + prompt sürümüdür;
+    böylece aynı CV ikinci kez hiçbir entry point'te LLM'e gitmez.
+    Boyut sınırı aşılınca en uzun süredir kullanılmayan kayıtlar silinir (LRU).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Streamlit ve Flask aynı dosyayı paylaşabilsin diye WAL kipinde açıyoruz
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(pdf_bytes, model_name, prompt_version):
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(pdf_bytes).digest())
+        digest.update(f"|{model_name}|{prompt_version}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        if value is None:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_cache(path=None, max_bytes=None):
+    """Süreç genelinde tek önbellek örneği (ilk çağrıdaki ayarlarla açılır)."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            path = path or os.environ.get("GEMINI_CACHE_PATH", DEFAULT_CACHE_PATH)
+            if max_bytes is None:
+                max_bytes = int(os.environ.get("GEMINI_CACHE_MB", DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024
+            _shared_cache = GeminiCache(path, max_bytes)
+        return _shared_cache
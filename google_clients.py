@@ -0,0 +1,86 @@
+import io
+import threading
+
+import gspread
+import httplib2
+from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.http import MediaIoBaseUpload
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+HTTP_TIMEOUT = 120
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024  # 256 KB'nin katı olmalı (Drive resumable yükleme kuralı)
+
+
+def pdf_media(stream):
+    """Akışı başa sarıp Drive yükleme gövdesi yapar: (media, boyut).
+
+    Aynı akış birden fazla klasöre yüklenirken kopyalanmadan tekrar
+    kullanılabilir. `UPLOAD_CHUNK_SIZE`'dan büyük dosyalar parça parça
+    (resumable) gönderilir; böylece istek başına bellekte en fazla bir parça durur.
+    """
+    size = stream.seek(0, io.SEEK_END)
+    stream.seek(0)
+    media = MediaIoBaseUpload(stream, mimetype='application/pdf', chunksize=UPLOAD_CHUNK_SIZE,
+                              resumable=size > UPLOAD_CHUNK_SIZE)
+    return media, size
+
+
+# ==========================================
+# 🔑 PAYLAŞILAN GOOGLE İSTEMCİLERİ
+# ==========================================
+
+class GoogleClients:
+    """Drive ve Sheets istemcilerini süreç boyunca tek kimlik bilgisiyle tutar.
+
+    Kimlik bilgisi (ve token yenilemesi) tüm iş parçacıklarında ortaktır;
+    HTTP bağlantıları ise iş parçacığı başına bir kez kurulup yeniden
+    kullanılır (httplib2 ve googleapiclient servisleri thread-safe değildir).
+    """
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        if hasattr(credentials, "with_non_blocking_refresh"):
+            # Süresi dolmak üzere olan token arka planda, kilitle tek seferde yenilenir
+            credentials.with_non_blocking_refresh()
+        self._local = threading.local()
+
+    @classmethod
+    def from_info(cls, info, scopes=SCOPES):
+        return cls(Credentials.from_service_account_info(info, scopes=scopes))
+
+    @classmethod
+    def from_file(cls, path, scopes=SCOPES):
+        return cls(Credentials.from_service_account_file(path, scopes=scopes))
+
+    def drive(self):
+        """Bu iş parçacığına ait, kalıcı bağlantılı Drive v3 servisi."""
+        service = getattr(self._local, "drive", None)
+        if service is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+            service = build('drive', 'v3', http=http, cache_discovery=False)
+            self._local.drive = service
+        return service
+
+    def sheets(self):
+        """Bu iş parçacığına ait gspread istemcisi (kendi AuthorizedSession havuzuyla)."""
+        client = getattr(self._local, "sheets", None)
+        if client is None:
+            client = gspread.authorize(self.credentials)
+            self._local.sheets = client
+        return client
+
+    def worksheet(self, spreadsheet_name, worksheet):
+        """Çalışma sayfasını açar; açılış (Drive'da isimle arama) iş parçacığı başına bir kez yapılır."""
+        cache = getattr(self._local, "worksheets", None)
+        if cache is None:
+            cache = self._local.worksheets = {}
+        key = (spreadsheet_name, worksheet)
+        if key not in cache:
+            spreadsheet = self.sheets().open(spreadsheet_name)
+            if isinstance(worksheet, int):
+                cache[key] = spreadsheet.get_worksheet(worksheet)
+            else:
+                cache[key] = spreadsheet.worksheet(worksheet)
+        return cache[key]
@@ -0,0 +1,437 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_JOB_DB = os.path.join(".cache", "jobs.sqlite3")
+DEFAULT_ARTIFACT_DIR = os.path.join(".cache", "jobs")
+
+# Aday başına aşamalar (sıralı). Bir aday en son ulaştığı aşamadan devam eder.
+STAGES = ("queued", "downloaded", "extracted", "rendered", "uploaded", "marked")
+FINAL_STAGE = STAGES[-1]
+
+# İş durumları
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+ACTIVE_STATUSES = (JOB_RUNNING,)
+# Bu kadar süre hiç ilerleme kaydetmeyen "running" iş, ölmüş bir süreçten kalmış sayılır
+STALE_AFTER = 15 * 60
+
+
+# ==========================================
+# 📍 ADAY KONTROL NOKTASI
+# ==========================================
+
+class Checkpoint:
+    """Tek adayın ulaştığı aşama ve o aşamanın çıktıları (cv_json, dosya yolu...).
+
+    `store` verilmezse sadece bellekte tutulur; tekil işlemler aynı kodu
+    kalıcı kayıt olmadan kullanabilir.
+    """
+
+    def __init__(self, store=None, job_id=None, key=None, stage=STAGES[0], state=None):
+        self.store = store
+        self.job_id = job_id
+        self.key = key
+        self.stage = stage
+        self.state = state or {}
+
+    def reached(self, stage):
+        return STAGES.index(self.stage) >= STAGES.index(stage)
+
+    def advance(self, stage, **state):
+        # Geri gitmeyiz; yeniden denenen bir aşama önceki ilerlemeyi silmesin
+        if not self.reached(stage):
+            self.stage = stage
+        self.state.update(state)
+        if self.store is not None:
+            self.store.save_checkpoint(self)
+
+    def artifact_path(self, suffix):
+        if self.store is None:
+            return None
+        return self.store.artifact_path(self.job_id, self.key, suffix)
+
+
+# ==========================================
+# 🗃️ KALICI İŞ TABLOSU
+# ==========================================
+
+class JobStore:
+    """Toplu işleri ve aday bazlı aşama durumlarını SQLite'ta tutar.
+
+    Streamlit yeniden çalıştırması, tarayıcı yenilemesi veya konteyner
+    yeniden başlaması işi öldürse bile tablo kalır; `pending_items` bir
+    sonraki çalıştırmada sadece `marked` aşamasına ulaşmamış adayları verir.
+    """
+
+    def __init__(self, path=DEFAULT_JOB_DB, artifact_dir=DEFAULT_ARTIFACT_DIR):
+        self.path = path
+        self.artifact_dir = artifact_dir
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, meta TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            " job_id TEXT NOT NULL, item_key TEXT NOT NULL, name TEXT, payload TEXT,"
+            " stage TEXT NOT NULL, ok INTEGER, attempts INTEGER NOT NULL DEFAULT 0,"
+            " state TEXT, messages TEXT, seconds REAL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (job_id, item_key))"
+        )
+        self._conn.commit()
+
+    # --- İşler ---
+
+    def create_job(self, kind, items, meta=None):
+        """`items` (key, name, payload) üçlüleridir; payload JSON'a çevrilebilir olmalı."""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, meta, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_RUNNING, json.dumps(meta or {}, ensure_ascii=False), now, now),
+            )
+            self._conn.commit()
+        self.add_items(job_id, items)
+        return job_id
+
+    def claim_job(self, kind, meta=None, stale_after=STALE_AFTER, items=()):
+        """Aynı türden canlı bir iş yoksa yenisini açar: (job_id, başlatılmalı_mı).
+
+        Kontrol ve ekleme tek `BEGIN IMMEDIATE` işleminde yapılır; aynı veritabanını
+        paylaşan birden çok gunicorn işçisi de aynı anda iki iş açamaz. `stale_after`
+        saniyedir ilerlemeyen iş devralınır ve kaldığı yerden sürdürülür.
+
+        `items` verilirse aynı işlemde işe eklenir. Başlatılmalı_mı False ise
+        adaylar, işi yürüten (belki başka bir süreçteki) `JobRunner` tarafından
+        kapanmadan önce alınır (bkz. `close_if_drained`).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT j.job_id, MAX(j.updated_at, COALESCE(MAX(i.updated_at), 0)) FROM jobs j"
+                    " LEFT JOIN job_items i ON i.job_id = j.job_id"
+                    " WHERE j.kind = ? AND j.status = ? GROUP BY j.job_id ORDER BY j.created_at DESC LIMIT 1",
+                    (kind, JOB_RUNNING),
+                ).fetchone()
+                if row is not None:
+                    job_id, last_update = row
+                    should_start = now - last_update >= stale_after
+                    if should_start:
+                        # Sahibi ölmüş; devralıyoruz
+                        self._conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+                else:
+                    job_id, should_start = uuid.uuid4().hex[:12], True
+                    self._conn.execute(
+                        "INSERT INTO jobs (job_id, kind, status, meta, created_at, updated_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (job_id, kind, JOB_RUNNING, json.dumps(meta or {}, ensure_ascii=False), now, now),
+                    )
+                self._insert_items(job_id, items, now)
+                self._conn.commit()
+                return job_id, should_start
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def _insert_items(self, job_id, items, now):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO job_items (job_id, item_key, name, payload, stage, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [(job_id, str(key), name, json.dumps(payload, ensure_ascii=False), STAGES[0], now)
+             for key, name, payload in items],
+        )
+
+    def add_items(self, job_id, items):
+        """İşe aday ekler; aynı anahtar ikinci kez eklenmez (ilerlemesi korunur)."""
+        with self._lock:
+            self._insert_items(job_id, items, time.time())
+            self._conn.commit()
+
+    def unfinished_items(self, kind, final_stage=FINAL_STAGE):
+        """Bu türün (ya da türlerin) bitmiş işlerinde son aşamaya ulaşamamış adaylar: (key, name, payload).
+
+        Kaynağı imleçli olan (bir kez okunan) işlerde başarısız adaylar bir
+        sonraki işe böyle taşınır.
+        """
+        kinds = (kind,) if isinstance(kind, str) else tuple(kind)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT i.item_key, i.name, i.payload FROM job_items i JOIN jobs j ON j.job_id = i.job_id"
+                f" WHERE j.kind IN ({','.join('?' * len(kinds))}) AND j.status = ? AND i.stage != ?"
+                " AND i.item_key NOT IN (SELECT item_key FROM job_items WHERE stage = ?)",
+                (*kinds, JOB_DONE, final_stage, final_stage),
+            ).fetchall()
+        unique = {}
+        for key, name, payload in rows:
+            unique.setdefault(key, (key, name, json.loads(payload)))
+        return list(unique.values())
+
+    def completed_keys(self, kind, stage):
+        """Bu türdeki (ya da türlerdeki) herhangi bir işte `stage` aşamasına (veya ötesine) ulaşmış aday anahtarları."""
+        kinds = (kind,) if isinstance(kind, str) else tuple(kind)
+        stages = STAGES[STAGES.index(stage):]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT i.item_key FROM job_items i JOIN jobs j ON j.job_id = i.job_id"
+                f" WHERE j.kind IN ({','.join('?' * len(kinds))}) AND i.stage IN ({','.join('?' * len(stages))})",
+                (*kinds, *stages),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, kind, status, meta, created_at, updated_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"job_id": row[0], "kind": row[1], "status": row[2], "meta": json.loads(row[3] or "{}"),
+                "created_at": row[4], "updated_at": row[5]}
+
+    def active_jobs(self, kind=None):
+        query = f"SELECT job_id FROM jobs WHERE status IN ({','.join('?' * len(ACTIVE_STATUSES))})"
+        params = list(ACTIVE_STATUSES)
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at", params).fetchall()
+        return [row[0] for row in rows]
+
+    def latest_job(self, kind):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE kind = ? ORDER BY created_at DESC LIMIT 1", (kind,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def reopen(self, job_id, final_stage=FINAL_STAGE):
+        """Yarıda kalmış işi yeniden başlatmaya hazırlar; bitmemiş adayların sonucu sıfırlanır."""
+        with self._lock:
+            self._conn.execute("UPDATE job_items SET ok = NULL WHERE job_id = ? AND stage != ?", (job_id, final_stage))
+            self._conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                               (JOB_RUNNING, time.time(), job_id))
+            self._conn.commit()
+
+    def close_if_drained(self, job_id, final_stage=FINAL_STAGE, seen=()):
+        """`seen` dışında hiç denenmemiş aday (ok IS NULL) yoksa işi kapatır ve True döner.
+
+        Kontrol ve kapanış `claim_job` ile aynı yazma kilidinde yapılır: başka
+        bir süreç aday eklediyse ya burada görülür ya da iş kapanmış bulunur
+        ve adaylar yeni bir işe gider; arada aday kaybolmaz.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT item_key FROM job_items WHERE job_id = ? AND stage != ? AND ok IS NULL",
+                    (job_id, final_stage),
+                ).fetchall()
+                drained = all(key in seen for key, in rows)
+                if drained:
+                    self._conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                                       (JOB_DONE, time.time(), job_id))
+                self._conn.commit()
+                return drained
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def set_status(self, job_id, status):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                               (status, time.time(), job_id))
+            self._conn.commit()
+
+    # --- Adaylar ---
+
+    def pending_items(self, job_id, final_stage=FINAL_STAGE):
+        """Son aşamaya ulaşmamış adaylar: (key, name, Checkpoint, payload)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_key, name, payload, stage, state FROM job_items"
+                " WHERE job_id = ? AND stage != ? ORDER BY rowid",
+                (job_id, final_stage),
+            ).fetchall()
+        return [(key, name, Checkpoint(self, job_id, key, stage, json.loads(state or "{}")), json.loads(payload))
+                for key, name, payload, stage, state in rows]
+
+    def save_checkpoint(self, checkpoint):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET stage = ?, state = ?, updated_at = ? WHERE job_id = ? AND item_key = ?",
+                (checkpoint.stage, json.dumps(checkpoint.state, ensure_ascii=False), time.time(),
+                 checkpoint.job_id, str(checkpoint.key)),
+            )
+            self._conn.commit()
+
+    def advance(self, job_id, key, stage):
+        """Kontrol noktası nesnesi olmadan aşama ilerletir (ör. toplu Sheets yazımı sonrası)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET stage = ?, updated_at = ? WHERE job_id = ? AND item_key = ?",
+                (stage, time.time(), job_id, str(key)),
+            )
+            self._conn.commit()
+
+    def record_result(self, job_id, key, ok, seconds, messages):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET ok = ?, attempts = attempts + 1, seconds = ?, messages = ?, updated_at = ?"
+                " WHERE job_id = ? AND item_key = ?",
+                (int(bool(ok)), seconds, " | ".join(messages), time.time(), job_id, str(key)),
+            )
+            # İşin kendisi de "canlı" görünsün (claim_job'daki bayatlık kontrolü)
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (time.time(), job_id))
+            self._conn.commit()
+
+    def items(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_key, name, stage, ok, attempts, seconds, messages FROM job_items"
+                " WHERE job_id = ? ORDER BY rowid",
+                (job_id,),
+            ).fetchall()
+        return [{"key": key, "name": name, "stage": stage, "ok": None if ok is None else bool(ok),
+                 "attempts": attempts, "seconds": seconds, "messages": messages or ""}
+                for key, name, stage, ok, attempts, seconds, messages in rows]
+
+    def progress(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, ok, COUNT(*), COALESCE(SUM(seconds), 0) FROM job_items WHERE job_id = ?"
+                " GROUP BY stage, ok", (job_id,)
+            ).fetchall()
+        by_stage = {stage: 0 for stage in STAGES}
+        total = finished = failed = 0
+        busy_seconds = 0.0
+        for stage, ok, count, seconds in rows:
+            by_stage[stage] += count
+            total += count
+            if ok is not None:
+                finished += count
+                busy_seconds += seconds
+                if not ok:
+                    failed += count
+        return {"total": total, "finished": finished, "failed": failed, "by_stage": by_stage,
+                "avg_seconds": busy_seconds / finished if finished else 0.0}
+
+    def artifact_path(self, job_id, key, suffix):
+        folder = os.path.join(self.artifact_dir, job_id)
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, f"{key}{suffix}")
+
+
+# ==========================================
+# 🏃 ARKA PLAN ÇALIŞTIRICI
+# ==========================================
+
+class JobRunner:
+    """İşleri Streamlit betik iş parçacığının dışında, arka plan iş parçacığında yürütür.
+
+    Betik yeniden çalışsa da iş sürer; arayüz ilerlemeyi `JobStore`'dan okur.
+    Süreç ölürse ya da yürütme hata ile yarıda kalırsa iş `running` durumunda
+    kalır ve `start` ile kaldığı aşamadan devam ettirilir.
+    """
+
+    def __init__(self, store, final_stage=FINAL_STAGE):
+        self.store = store
+        self.final_stage = final_stage
+        self._threads = {}
+        self._workers = {}
+        self._rerun = {}
+        self._lock = threading.Lock()
+
+    def is_running(self, job_id):
+        with self._lock:
+            thread = self._threads.get(job_id)
+        return thread is not None and thread.is_alive()
+
+    def stage_stats(self, job_id):
+        """İş aşamalı hatla yürüdüyse aşama başına hız; bu süreçte hiç çalışmadıysa boş."""
+        with self._lock:
+            worker = self._workers.get(job_id)
+        return worker.stats() if hasattr(worker, "stats") else {}
+
+    def start(self, job_id, worker, on_finish=None, prepare=None):
+        """İşi `worker` (bir `pipeline.Pipeline`) ile başlatır; zaten çalışıyorsa False döner.
+
+        Adaylar aşamalı hattan akar; eşzamanlılık aşama ayarlarından gelir.
+
+        `prepare()` verilirse arka planda önce çağrılır ve döndürdüğü
+        (key, name, payload) üçlüleri işe eklenir (ör. sayfanın okunması).
+        İş zaten çalışıyorsa sonradan eklenen adaylar da o iş parçacığınca
+        işlenir: mevcut tur bitince bekleyenler yeniden okunur. Başka süreçte
+        `claim_job(..., items=...)` ile eklenenler de iş kapanmadan önce alınır.
+        """
+        with self._lock:
+            thread = self._threads.get(job_id)
+            if thread is not None and thread.is_alive():
+                self._rerun[job_id] = True
+                return False
+            thread = threading.Thread(target=self._run, args=(job_id, worker, on_finish, prepare),
+                                      name=f"job-{job_id}", daemon=True)
+            self._threads[job_id] = thread
+            self._workers[job_id] = worker
+            self._rerun[job_id] = False
+        thread.start()
+        return True
+
+    def _run(self, job_id, worker, on_finish, prepare):
+        store = self.store
+        attempted = set()
+
+        def on_progress(done, total, result):
+            store.record_result(job_id, result.key, result.ok, result.seconds, result.messages)
+
+        try:
+            store.reopen(job_id, self.final_stage)
+            if prepare:
+                store.add_items(job_id, prepare())
+            while True:
+                with self._lock:
+                    self._rerun[job_id] = False
+                # Bu turda başarısız olanlar tekrar denenmez; bir sonraki `start`'a kalır
+                items = [(key, name, payload, checkpoint)
+                         for key, name, checkpoint, payload in store.pending_items(job_id, self.final_stage)
+                         if key not in attempted]
+                attempted.update(key for key, _, _, _ in items)
+                if items:
+                    worker.run_batch(items, on_progress)
+                with self._lock:
+                    # Çıkış kararı ve kayıttan düşme aynı kilitte: arada gelen aday kaybolmaz.
+                    # Başka süreçlerin (gunicorn işçileri) eklediği adaylar da kapanış işleminde görülür.
+                    if not self._rerun.get(job_id) and store.close_if_drained(job_id, self.final_stage, attempted):
+                        self._threads.pop(job_id, None)
+                        self._rerun.pop(job_id, None)
+                        break
+        except Exception as e:
+            # İş `running` kalır: sayfa yenilemesi / süreç açılışı (active_jobs) ya da
+            # bayatlayınca claim_job onu kaldığı aşamadan sürdürür
+            print(f"⚠️ İş {job_id} yarıda kaldı, sonra sürdürülecek: {e}")
+            with self._lock:
+                self._threads.pop(job_id, None)
+                self._rerun.pop(job_id, None)
+        finally:
+            # İş yalnızca close_if_drained ile (bekleyen aday kalmadığında) kapanır
+            if on_finish:
+                on_finish()
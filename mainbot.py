@@ -1,17 +1,26 @@
 import os
 import json
 import io
-import requests
-import fitz  # PyMuPDF
 import google.generativeai as genai
-from flask import Flask, request
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
-from fpdf import FPDF # fpdf2 yüklü olduğunda bu satır doğru çalışacaktır
-import gspread
-import gc
+from flask import Flask, Response, request, jsonify
 import time
+from gemini_cache import get_cache
+from drive_index import FolderIndex
+from drive_placement import PLACEMENT_COPY, link_into, placement_mode
+from google_clients import GoogleClients, pdf_media
+from download_client import DownloadClient
+from blob_cache import BlobCache, DEFAULT_CACHE_DIR
+from pdf_text import TextExtractor
+from font_registry import SingleFacePDF
+from job_store import JobRunner, JobStore, DEFAULT_JOB_DB
+from pipeline import Pipeline, Stage, DEFAULT_QUEUE_SIZE
+from metrics import METRICS
+from memory_budget import MemoryBudget, DEFAULT_PER_CANDIDATE_MB
+from sheet_sync import SheetSync, DEFAULT_FULL_READ_INTERVAL, DEFAULT_SNAPSHOT_PATH
+from rate_limit import RATE_LIMITS
+from gemini_batch import GeminiBatcher, DEFAULT_BATCH_SIZE, DEFAULT_BATCH_TOKENS, DEFAULT_LINGER
+from batch_runner import call_with_backoff
+from typeform_source import TypeformSource, TYPEFORM_API, DEFAULT_CURSOR_PATH, parse_response, verify_signature
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,6 +29,54 @@ app = Flask(__name__)
 # ==========================================
 # ⚙️ AYARLAR
 # ==========================================
+# Servis kotaları (dakikalık); işçiler ve webhook istekleri aynı kovaları paylaşır
+RATE_LIMITS.configure("gemini", os.environ.get("GEMINI_RPM"), os.environ.get("GEMINI_TPM"))
+RATE_LIMITS.configure("drive", os.environ.get("DRIVE_RPM"))
+RATE_LIMITS.configure("sheets", os.environ.get("SHEETS_RPM"))
+RATE_LIMITS.configure("typeform", os.environ.get("TYPEFORM_RPM"))
+RATE_LIMITS.configure("typeform_files", os.environ.get("TYPEFORM_FILES_RPM"))
+folder_index = FolderIndex()
+# Typeform indirmeleri tek, havuzlu ve yeniden deneyen oturumdan geçer; PDF'ler yerel depoda tutulur
+download_client = DownloadClient(
+    timeout=float(os.environ.get("DOWNLOAD_TIMEOUT", 60)),
+    blob_cache=BlobCache(os.environ.get("BLOB_CACHE_DIR", DEFAULT_CACHE_DIR),
+                         int(os.environ.get("BLOB_CACHE_MB", 2048)) * 1024 * 1024),
+    rate_limit=RATE_LIMITS["typeform_files"],
+)
+# Metin çıkarma bütçesi; TEXT_WORKERS > 0 ise belgeler süreç havuzunda işlenir
+text_extractor = TextExtractor(
+    workers=int(os.environ.get("TEXT_WORKERS", 0)),
+    max_pages=int(os.environ.get("TEXT_MAX_PAGES", 4)),
+    max_chars=int(os.environ.get("TEXT_MAX_CHARS", 20000)),
+)
+# /process_old_submissions arka planda iş olarak yürür; ilerleme SQLite iş tablosunda tutulur.
+# Bu servis Sheets'e işaret koymadığı için adayın son aşaması "uploaded".
+job_store = JobStore(os.environ.get("JOB_DB_PATH", DEFAULT_JOB_DB))
+job_runner = JobRunner(job_store, final_stage="uploaded")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+# "shortcut" / "parents": standart PDF bir kez yüklenir, diğer kategori klasörlerine bağlanır
+DRIVE_PLACEMENT = placement_mode(os.environ.get("DRIVE_PLACEMENT"))
+OLD_SUBMISSIONS_JOB = "old_submissions"
+# Typeform webhook'u ile gelen tekil adaylar ayrı işte toplanır; toplu taramayı beklemez
+WEBHOOK_JOB = "typeform_webhook"
+INTAKE_JOBS = (OLD_SUBMISSIONS_JOB, WEBHOOK_JOB)
+TYPEFORM_WEBHOOK_SECRET = os.environ.get("TYPEFORM_WEBHOOK_SECRET")
+# Form sayfasının yerel kopyası; her tetiklemede sadece yeni satırlar okunur
+sheet_sync = SheetSync(lambda: google_clients.worksheet("İZMİR CV Form", 0),
+                       os.environ.get("SHEET_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH), token_column="Token",
+                       full_read_interval=float(os.environ.get("SHEET_FULL_READ_SECONDS",
+                                                               DEFAULT_FULL_READ_INTERVAL)))
+# TYPEFORM_FORM_ID verilirse adaylar sayfa yerine doğrudan Typeform Responses API'den gelir
+typeform_source = None
+if os.environ.get("TYPEFORM_FORM_ID"):
+    typeform_source = TypeformSource(
+        download_client.session, os.environ.get("TYPEFORM_TOKEN"), os.environ["TYPEFORM_FORM_ID"],
+        base_url=os.environ.get("TYPEFORM_API_URL", TYPEFORM_API),
+        cursor_path=os.environ.get("TYPEFORM_CURSOR_PATH", DEFAULT_CURSOR_PATH),
+        name_field=os.environ.get("TYPEFORM_NAME_FIELD"),
+        rate_limit=RATE_LIMITS["typeform"],
+    )
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 TYPEFORM_TOKEN = os.getenv("TYPEFORM_TOKEN")
 ROOT_FOLDER_ID = os.getenv("ROOT_FOLDER_ID")
@@ -27,126 +84,305 @@ CREDENTIALS_PATH = "credentials.json"
 
 try:
     genai.configure(api_key=GEMINI_API_KEY)
-    creds = Credentials.from_service_account_file(
-        CREDENTIALS_PATH,
-        scopes=["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-    )
-    drive_service = build('drive', 'v3', credentials=creds)
-    gc_sheet_client = gspread.authorize(creds)
+    google_clients = GoogleClients.from_file(CREDENTIALS_PATH)
 except Exception as e:
     print(f"⚠️ Başlatma Hatası: {e}")
 
+try:
+    # Kategori klasörlerini açılışta tek listelemeyle belleğe al
+    folder_index.warm(google_clients.drive(), ROOT_FOLDER_ID)
+except Exception as e:
+    print(f"⚠️ Drive klasörleri önceden listelenemedi: {e}")
+
 ALLOWED_CATEGORIES = ["Engineering", "Marketing", "HR", "Finance", "Sales", "IT", "Design"]
+GEMINI_MODEL = 'gemini-2.5-flash'
+# Prompt değişirse sürümü artırın (önbellek anahtarının parçası)
+PROMPT_VERSION = f"categorize-v2:{','.join(ALLOWED_CATEGORIES)}"
+CV_PROMPT = f"Act as an HR expert. Extract CV data into JSON. Categories: {ALLOWED_CATEGORIES}."
+# Birden çok CV tek Gemini isteğinde; talimat istek başına bir kez gider
+gemini_batcher = GeminiBatcher(
+    GEMINI_MODEL, CV_PROMPT, limit=RATE_LIMITS["gemini"], categories=ALLOWED_CATEGORIES,
+    max_batch_size=int(os.environ.get("GEMINI_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+    max_batch_tokens=int(os.environ.get("GEMINI_BATCH_TOKENS", DEFAULT_BATCH_TOKENS)),
+    linger=float(os.environ.get("GEMINI_BATCH_LINGER", DEFAULT_LINGER)),
+)
+# /metrics okunurken bileşenlerin kendi sayaçları anlık değer olarak yayınlanır
+METRICS.add_collector("gemini_cache", lambda: get_cache().stats())
+METRICS.add_collector("blob_cache", lambda: download_client.blob_cache.stats())
+METRICS.add_collector("gemini_batch", gemini_batcher.stats)
+METRICS.add_collector("text_extract", text_extractor.stats)
+METRICS.add_collector("sheet_sync", sheet_sync.stats)
+METRICS.add_collector("rate_limit", RATE_LIMITS.stats, label="upstream")
+# MEMORY_BUDGET_MB verilirse yeni adaylar ancak süreç RSS'i bütçeye sığınca hatta alınır (OOM'a karşı)
+memory_budget = None
+if os.environ.get("MEMORY_BUDGET_MB"):
+    memory_budget = MemoryBudget(os.environ["MEMORY_BUDGET_MB"],
+                                 os.environ.get("MEMORY_PER_CANDIDATE_MB", DEFAULT_PER_CANDIDATE_MB))
+    METRICS.add_collector("memory", memory_budget.stats)
 FONT_PATH = "DejaVuSans.ttf"
 
 # ==========================================
 # 🧠 YARDIMCI SINIFLAR
 # ==========================================
 
-class StandardPDF(FPDF):
+class StandardPDF(SingleFacePDF):
     def __init__(self):
         super().__init__()
         if os.path.exists(FONT_PATH):
-            self.add_font('DejaVu', '', FONT_PATH)
-            self.add_font('DejaVu', 'B', FONT_PATH)
-            self.add_font('DejaVu', 'I', FONT_PATH)
+            # Tek alt kümelenmiş font; B/I aynı yüze yönlendirilir (font_registry)
+            self.use_font('DejaVu', FONT_PATH)
             self.font_family_name = 'DejaVu'
         else:
             self.font_family_name = 'Arial'
 
 def extract_and_categorize_with_gemini(text_content):
-    # DÜZELTME: gemini-2.5-flash kullanıyoruz
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    prompt = f"Act as an HR expert. Extract CV data into JSON. Categories: {ALLOWED_CATEGORIES}. CV: {text_content}"
-    try:
-        time.sleep(2)
-        response = model.generate_content(prompt)
-        res_text = response.text.replace("```json", "").replace("```", "").strip()
-        return json.loads(res_text)
-    except Exception as e:
-        print(f"Gemini Hatası: {e}")
-        return None
+    # Eşzamanlı işçilerin CV'leri tek istekte toplanır; kota beklemesi ortak kovada
+    return gemini_batcher.extract(text_content)
+
 
 def get_or_create_folder(folder_name, parent_id):
-    query = f"name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder' and trashed = false and '{parent_id}' in parents"
-    results = drive_service.files().list(q=query, supportsAllDrives=True, includeItemsFromAllDrives=True).execute().get('files', [])
-    if results: return results[0]['id']
-    meta = {'name': folder_name, 'mimeType': 'application/vnd.google-apps.folder', 'parents': [parent_id]}
-    return drive_service.files().create(body=meta, fields='id', supportsAllDrives=True).execute().get('id')
+    # Klasör ID'leri bellekte; Drive'a sadece indekste olmayan bir ad için gidilir
+    return folder_index.get_or_create(google_clients.drive(), folder_name, parent_id)
+
 
 # ==========================================
-# 🚀 ANA İŞLEM
+# 🏭 ADAY HATTI (indir → çıkar → PDF → yükle)
 # ==========================================
-def process_cv(candidate_name, pdf_url):
-    try:
-        print(f"🔍 İşleniyor: {candidate_name}")
-        headers = {"Authorization": f"Bearer {TYPEFORM_TOKEN}"}
-        resp = requests.get(pdf_url, headers=headers)
-
-        if resp.status_code == 200:
-            with fitz.open(stream=resp.content, filetype="pdf") as doc:
-                full_text = "".join([page.get_text() for page in doc])
-
-            analysis = extract_and_categorize_with_gemini(full_text)
-            if analysis:
-                pdf = StandardPDF()
-                pdf.add_page()
-                pdf.set_font(pdf.font_family_name, 'B', 16)
-                # Yeni fpdf2 standardına göre ln=1 yerine bu parametreleri kullanıyoruz
-                pdf.cell(0, 10, str(candidate_name), border=0, new_x="LMARGIN", new_y="NEXT", align='C')
-                new_pdf_bytes = pdf.output()
-
-                categories = analysis.get("suggested_categories", ["Others"])
-                for cat in categories:
-                    folder_id = get_or_create_folder(cat, ROOT_FOLDER_ID)
-                    media = MediaIoBaseUpload(io.BytesIO(new_pdf_bytes), mimetype='application/pdf')
-                    file_meta = {'name': f"{candidate_name}_Standard.pdf", 'parents': [folder_id]}
-
-                    drive_service.files().create(
-                        body=file_meta,
-                        media_body=media,
-                        supportsAllDrives=True
-                    ).execute()
-                print(f"✅ Başarılı: {candidate_name}")
-                return True
-        return False
-    except Exception as e:
-        print(f"❌ Hata ({candidate_name}): {str(e)}")
-        return False
-    finally:
-        gc.collect()
+# Toplu iş de webhook da aynı aşamalı hattı kullanır (bkz. pipeline.py); her
+# aşamanın eşzamanlılığı ayrı ayarlanır, adaylar aşamalar arasında kuyrukla akar.
+
+def stage_download(candidate):
+    print(f"🔍 İşleniyor: {candidate.name}")
+    headers = {"Authorization": f"Bearer {TYPEFORM_TOKEN}"}
+    download = download_client.fetch(candidate.payload["url"], headers=headers)
+    candidate.on_close(download.close)
+    if download.status_code != 200:
+        return candidate.fail(f"Typeform HTTP {download.status_code}", reason=f"http_{download.status_code}")
+    candidate.checkpoint.advance("downloaded")
+    candidate.data["download"] = download
+
+
+def stage_extract(candidate):
+    checkpoint = candidate.checkpoint
+    download = candidate.data["download"]
+    pdf_view = download.view()
+    # Aynı PDF daha önce analiz edildiyse (bu işte ya da önbellekte) Gemini'ye gitmiyoruz
+    gemini_cache = get_cache()
+    cache_key = gemini_cache.make_key(pdf_view, GEMINI_MODEL, PROMPT_VERSION)
+    analysis = checkpoint.state.get("analysis") or gemini_batcher.check(gemini_cache.get(cache_key))
+    if analysis is None:
+        text_result = text_extractor.extract(download.path or pdf_view)
+        full_text = text_result.text
+        METRICS.observe("step_seconds", text_result.seconds, step="pdf_text")
+        print(f"📄 Metin: {text_result.pages_read}/{text_result.page_count} sayfa, "
+              f"{text_result.seconds * 1000:.0f} ms")
+
+        # Aşamadaki diğer adaylar aynı Gemini isteğine katılır
+        analysis = extract_and_categorize_with_gemini(full_text)
+        gemini_cache.put(cache_key, analysis)
+    if not analysis:
+        return candidate.fail("Gemini analiz döndürmedi", reason="no_json")
+    checkpoint.advance("extracted", analysis=analysis)
+    candidate.data["analysis"] = analysis
+    # Bu serviste orijinal PDF yüklenmiyor; PDF üretimi ve yükleme sırasında bellekte tutmayalım
+    candidate.release("download")
+
+
+def stage_render(candidate):
+    pdf = StandardPDF()
+    pdf.add_page()
+    pdf.set_font(pdf.font_family_name, 'B', 16)
+    # Yeni fpdf2 standardına göre ln=1 yerine bu parametreleri kullanıyoruz
+    pdf.cell(0, 10, str(candidate.name), border=0, new_x="LMARGIN", new_y="NEXT", align='C')
+    new_pdf_bytes = pdf.output()
+    print(f"📄 Standart PDF: {len(new_pdf_bytes) / 1024:.1f} KB")
+    candidate.checkpoint.advance("rendered")
+    candidate.data["pdf_bytes"] = new_pdf_bytes
+
+
+def stage_upload(candidate):
+    checkpoint = candidate.checkpoint
+    new_pdf_bytes = candidate.data["pdf_bytes"]
+    file_name = f"{candidate.name}_Standard.pdf"
+    # Yeniden başlatılan işte zaten yüklenmiş klasörlere tekrar yüklemiyoruz
+    uploaded_to = checkpoint.state.get("uploaded_to", [])
+    # Tek yüklemeli yerleşimde ilk yüklenen dosya; kalan klasörler ona bağlanır
+    file_id = checkpoint.state.get("file_id")
+
+    categories = candidate.data["analysis"].get("suggested_categories", ["Others"])
+    # Tüm kategori klasörleri aynı tamponu okur; klasör başına kopya yok
+    stream = io.BytesIO(new_pdf_bytes)
+    for cat in categories:
+        folder_id = get_or_create_folder(cat, ROOT_FOLDER_ID)
+        if folder_id in uploaded_to:
+            continue
+
+        if file_id and DRIVE_PLACEMENT != PLACEMENT_COPY:
+            link_into(google_clients.drive(), DRIVE_PLACEMENT, file_id, folder_id, file_name)
+        else:
+            media, size = pdf_media(stream)
+            file_meta = {'name': file_name, 'parents': [folder_id]}
+
+            created = call_with_backoff(google_clients.drive().files().create(
+                body=file_meta,
+                media_body=media,
+                fields='id',
+                supportsAllDrives=True
+            ).execute, limit=RATE_LIMITS["drive"])
+            METRICS.inc("bytes", size, direction="out", upstream="drive")
+            file_id = created.get('id')
+        uploaded_to.append(folder_id)
+        checkpoint.advance("rendered", uploaded_to=uploaded_to, file_id=file_id)
+    checkpoint.advance("uploaded")
+    print(f"✅ Başarılı: {candidate.name}")
+
+
+def make_cv_pipeline():
+    """İş başına yeni hat; aşama hızları /jobs/<id> yanıtında raporlanır."""
+    return Pipeline([
+        Stage("download", stage_download, int(os.environ.get("DOWNLOAD_WORKERS", JOB_WORKERS))),
+        # Toplayıcı bir isteği dolduracak kadar aday aynı anda beklemeli
+        Stage("extract", stage_extract, int(os.environ.get("EXTRACT_WORKERS", gemini_batcher.max_batch_size))),
+        Stage("render", stage_render, int(os.environ.get("RENDER_WORKERS", 1))),
+        Stage("upload", stage_upload, int(os.environ.get("UPLOAD_WORKERS", JOB_WORKERS))),
+    ], queue_size=int(os.environ.get("PIPELINE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)), memory_budget=memory_budget)
+
 
 # ==========================================
 # 🌐 ENDPOINTLER
 # ==========================================
 
+def collect_old_submissions():
+    """Sayfadaki CV linklerini iş adayı olarak döndürür; önceki işlerde yüklenenler atlanır."""
+    sheet_sync.sync()
+    all_rows = sheet_sync.values()
+    header = all_rows[0]
+    try: name_idx = header.index("Ad ve Soyad")
+    except: name_idx = 0
+
+    done = job_store.completed_keys(INTAKE_JOBS, "uploaded")
+    items = []
+    for row in all_rows[1:]:
+        name = row[name_idx]
+        url = None
+        for cell in row:
+            if str(cell).startswith("http") and ("typeform.com" in str(cell) or "storage" in str(cell)):
+                url = str(cell)
+                break
+        if url and url not in done:
+            items.append((url, name, {"url": url}))
+    return items
+
+
+def collect_typeform_submissions(job_id):
+    """İmleçten sonraki Typeform yanıtlarını işe ekler; imleç ancak ondan sonra ilerler."""
+    submissions, cursor = typeform_source.fetch_new()
+    done = job_store.completed_keys(INTAKE_JOBS, "uploaded")
+    # Önceki işlerde (webhook dahil) başarısız olanlar imleçle tekrar gelmez; onları da taşıyoruz
+    items = job_store.unfinished_items(INTAKE_JOBS, "uploaded")
+    for submission in submissions:
+        for url in submission.file_urls:
+            if url not in done:
+                items.append((url, submission.name, {"url": url, "response_token": submission.token}))
+    job_store.add_items(job_id, items)
+    typeform_source.save_cursor(cursor)
+    print(f"📨 Typeform: {len(submissions)} yeni yanıt, {typeform_source.api_calls} API çağrısı")
+    return []
+
+
+def start_old_submissions_job(job_id):
+    def on_finish():
+        cache_stats = get_cache().stats()
+        print(f"🗄️ İş {job_id} bitti. Gemini önbelleği: {cache_stats['hits']} isabet / {cache_stats['misses']} ıska")
+        batch_stats = gemini_batcher.stats()
+        print(f"📦 Gemini: {batch_stats['calls']} istek / {batch_stats['candidates']} aday "
+              f"({batch_stats['retried_alone']} tek başına yeniden)")
+
+    if typeform_source is not None:
+        prepare = lambda: collect_typeform_submissions(job_id)
+    else:
+        prepare = collect_old_submissions
+    return job_runner.start(job_id, make_cv_pipeline(), on_finish, prepare=prepare)
+
+
 @app.route('/process_old_submissions', methods=['GET'])
 def process_old_submissions():
     try:
-        sheet = gc_sheet_client.open("İZMİR CV Form").get_worksheet(0)
-        all_rows = sheet.get_all_values()
-        header = all_rows[0]
-        try: name_idx = header.index("Ad ve Soyad")
-        except: name_idx = 0
-
-        process_count = 0
-        for row in all_rows[1:]:
-            name = row[name_idx]
-            url = None
-            for cell in row:
-                if str(cell).startswith("http") and ("typeform.com" in str(cell) or "storage" in str(cell)):
-                    url = str(cell)
-                    break
-
-            if url:
-                if process_cv(name, url):
-                    process_count += 1
-                    time.sleep(5)
-
-        return f"Tamamlandı: {process_count} adet işlendi.", 200
+        # Aynı anda tek iş: ikinci tetikleme mevcut işin kimliğini döndürür
+        job_id, should_start = job_store.claim_job(OLD_SUBMISSIONS_JOB)
+        if should_start:
+            start_old_submissions_job(job_id)
+        return jsonify(job_id=job_id, started=should_start, status_url=f"/jobs/{job_id}"), 202
     except Exception as e:
         return f"Hata: {str(e)}", 500
 
+
+@app.route('/typeform_webhook', methods=['POST'])
+def typeform_webhook():
+    """Typeform'un her gönderimde yolladığı webhook; sadece o aday kuyruğa alınır.
+
+    İmza ham gövde üzerinden doğrulanır. Yanıt işleme beklenmeden döner
+    (Typeform birkaç saniyede yanıt alamazsa teslimatı tekrarlar); tekrar
+    gelen teslimatlar aday anahtarı (dosya URL'si) ile elenir.
+    """
+    body = request.get_data(cache=False)
+    if not TYPEFORM_WEBHOOK_SECRET:
+        return jsonify(error="TYPEFORM_WEBHOOK_SECRET tanımlı değil"), 503
+    if not verify_signature(TYPEFORM_WEBHOOK_SECRET, body, request.headers.get("Typeform-Signature")):
+        return jsonify(error="Geçersiz imza"), 401
+
+    try:
+        event = json.loads(body)
+    except ValueError:
+        return jsonify(error="Geçersiz JSON"), 400
+    form_response = event.get("form_response")
+    if event.get("event_type") != "form_response" or not form_response:
+        return jsonify(queued=0), 200
+
+    submission = parse_response(form_response, os.environ.get("TYPEFORM_NAME_FIELD"))
+    done = job_store.completed_keys(INTAKE_JOBS, "uploaded")
+    items = [(url, submission.name, {"url": url, "response_token": submission.token})
+             for url in submission.file_urls if url not in done]
+    if not items:
+        return jsonify(queued=0, token=submission.token), 200
+
+    try:
+        # Açık webhook işi varsa aday aynı işlemde ona eklenir; işi yürüten süreç (başka bir
+        # gunicorn işçisi olabilir) kapanmadan önce onu da alır. İkinci bir yürütücü açılmaz.
+        job_id, should_start = job_store.claim_job(WEBHOOK_JOB, items=items)
+        if should_start:
+            job_runner.start(job_id, make_cv_pipeline())
+    except Exception as e:
+        return jsonify(error=str(e)), 500
+    return jsonify(queued=len(items), token=submission.token, job_id=job_id, status_url=f"/jobs/{job_id}"), 202
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus için: aşama/servis süreleri (p50, p95), çağrı ve bayt sayaçları, önbellek isabetleri."""
+    if "application/openmetrics-text" in request.headers.get("Accept", ""):
+        return Response(METRICS.render_prometheus(openmetrics=True),
+                        mimetype="application/openmetrics-text; version=1.0.0; charset=utf-8")
+    return Response(METRICS.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_store.get_job(job_id)
+    if job is None:
+        return jsonify(error="İş bulunamadı"), 404
+    progress = job_store.progress(job_id)
+    end_time = job["updated_at"] if job["status"] == "done" else time.time()
+    elapsed = max(end_time - job["created_at"], 1e-6)
+    errors = [{"name": item["name"], "stage": item["stage"], "messages": item["messages"]}
+              for item in job_store.items(job_id) if item["ok"] is False]
+    return jsonify(job_id=job_id, status=job["status"], running_here=job_runner.is_running(job_id),
+                   elapsed_seconds=round(elapsed, 1),
+                   throughput_per_min=round(progress["finished"] / elapsed * 60, 2),
+                   errors=errors, rate_limits=RATE_LIMITS.stats(),
+                   stages=job_runner.stage_stats(job_id), **progress)
+
+
 if __name__ == "__main__":
     # debug=False yaparak Windows'taki watchdog (reloading) hatasını engelledik
     app.run(host='127.0.0.1', port=5000, debug=False)
\ No newline at end of file
@@ -0,0 +1,129 @@
+import ctypes
+import ctypes.util
+import gc
+import os
+import resource
+import threading
+import time
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_PER_CANDIDATE_MB = 64   # bir adayın (taranmış CV + OCR görselleri dahil) tepe bellek payı
+DEFAULT_POLL = 0.1              # saniye; bütçe doluyken yeniden kontrol aralığı
+TRIM_INTERVAL = 2.0             # bütçe aşıldığında en sık bu aralıkla bellek iade edilir
+
+
+def current_rss():
+    """Sürecin şu anki yerleşik belleği (bayt); /proc yoksa tepe değer (ru_maxrss)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _load_malloc_trim():
+    path = ctypes.util.find_library("c")
+    if not path:
+        return None
+    try:
+        return getattr(ctypes.CDLL(path), "malloc_trim", None)
+    except OSError:
+        return None
+
+
+_malloc_trim = _load_malloc_trim()
+
+
+def release_memory():
+    """Döngüsel referansları toplar ve (glibc'de) boşalan yığını işletim sistemine iade eder."""
+    gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
+# ==========================================
+# 🧮 BELLEK BÜTÇESİ
+# ==========================================
+
+class MemoryBudget:
+    """Yeni adayı hatta ancak süreç RSS'i + aday payı bütçeye sığıyorsa alır.
+
+    Büyük taranmış CV'ler aynı anda işlenince konteyner OOM ile ölüyordu;
+    eşzamanlılık sabit kalsa da bellek dolunca yeni aday beklemeye alınır.
+    Hatta hiç aday yoksa yine de kabul edilir (ilerleme garanti). Bütçe
+    aşıldığında ara ara `release_memory` çağrılır; Python ve MuPDF boşalan
+    belleği kendiliğinden iade etmeyebilir. Süreç başına tek nesne
+    paylaşılmalı (toplu işler, tekil buton ve webhook aynı bütçeden yer).
+    """
+
+    def __init__(self, limit_mb, per_candidate_mb=DEFAULT_PER_CANDIDATE_MB, poll=DEFAULT_POLL):
+        self.limit = int(float(limit_mb) * 1024 * 1024)
+        self.per_candidate = int(float(per_candidate_mb) * 1024 * 1024)
+        self.poll = float(poll)
+        self.active = 0
+        self.admitted = 0
+        self.deferred = 0          # en az bir kez beklemeye alınan adaylar
+        self.waited_seconds = 0.0
+        self.peak_rss = 0
+        self._last_trim = 0.0
+        self._lock = threading.Lock()
+
+    def try_admit(self, reclaim=True):
+        """Yer varsa adayı sayar ve True döner; yoksa False.
+
+        `reclaim` açıksa dolu bütçede `reclaim()` da çağrılır. Olay döngüsünden
+        çağıranlar kapatıp `reclaim`'i ayrı iş parçacığında yürütmeli.
+        """
+        rss = current_rss()
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            if self.active == 0 or rss + self.per_candidate <= self.limit:
+                self.active += 1
+                self.admitted += 1
+                return True
+        if reclaim:
+            self.reclaim()
+        return False
+
+    def reclaim(self):
+        """En sık TRIM_INTERVAL'da bir `release_memory` çağırır (gc + malloc_trim; bloklayıcı)."""
+        with self._lock:
+            if time.monotonic() - self._last_trim < TRIM_INTERVAL:
+                return False
+            self._last_trim = time.monotonic()
+        release_memory()
+        return True
+
+    def admit(self):
+        """Yer açılana kadar bekler (iş parçacığı kodu için); beklenen süreyi döndürür."""
+        waited = 0.0
+        while not self.try_admit():
+            time.sleep(self.poll)
+            waited += self.poll
+        self.record_wait(waited)
+        return waited
+
+    def record_wait(self, seconds):
+        if seconds:
+            with self._lock:
+                self.deferred += 1
+                self.waited_seconds += seconds
+
+    def release(self):
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit_mb": round(self.limit / (1024 * 1024), 1),
+                "active": self.active,
+                "admitted": self.admitted,
+                "deferred": self.deferred,
+                "waited_seconds": round(self.waited_seconds, 2),
+                "rss_mb": round(current_rss() / (1024 * 1024), 1),
+                "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1),
+            }
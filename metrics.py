@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+METRIC_PREFIX = "cvpool"
+DEFAULT_WINDOW = 1024          # yüzdelikler her seri için son N ölçümden hesaplanır
+QUANTILES = (0.5, 0.95)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+# ==========================================
+# 📈 ÖLÇÜM KAYDI
+# ==========================================
+
+class Metrics:
+    """Süre, sayaç ve anlık değerleri toplayan, iş parçacıkları arasında paylaşılan kayıt.
+
+    - `observe` / `timer`: süre dağılımı (p50/p95, toplam, adet); ör. aşama
+      ve dış servis çağrı süreleri.
+    - `inc`: birikimli sayaç; ör. aktarılan bayt, hata nedenleri.
+    - `add_collector`: mevcut `stats()` sözlüklerini (önbellekler, kotalar)
+      kopyalamadan, okuma anında anlık değer olarak yayınlar.
+
+    Etiket değerleri az sayıda olmalı (aşama adı, servis adı, hata türü);
+    aday adı gibi değerler etiket yapılmaz.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, prefix=METRIC_PREFIX):
+        self.window = int(window)
+        self.prefix = prefix
+        self.started = time.time()
+        self._timings = {}      # (ad, etiketler) -> [adet, toplam, son ölçümler]
+        self._counters = {}     # (ad, etiketler) -> değer
+        self._collectors = {}   # ad -> (fonksiyon, etiket adı)
+        self._lock = threading.Lock()
+
+    # --- Kayıt ---
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = [0, 0.0, deque(maxlen=self.window)]
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2].append(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def add_collector(self, name, func, label=None):
+        """`func()` sayısal değerler sözlüğü döndürür; `label` verilirse {etiket değeri: sözlük}."""
+        with self._lock:
+            self._collectors[name] = (func, label)
+
+    # --- Okuma ---
+
+    def _collected(self):
+        with self._lock:
+            collectors = dict(self._collectors)
+        gauges = []
+        for name, (func, label) in collectors.items():
+            try:
+                values = func()
+            except Exception as e:
+                print(f"⚠️ Ölçüm okunamadı ({name}): {e}")
+                continue
+            groups = values.items() if label else [(None, values)]
+            for label_value, stats in groups:
+                labels = ((label, label_value),) if label else ()
+                for key, value in (stats or {}).items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        gauges.append((f"{name}_{key}", labels, value))
+        return gauges
+
+    def summary(self):
+        """Arayüz ve JSON için: süre özetleri, sayaçlar ve toplayıcı değerleri."""
+        with self._lock:
+            timings = {key: (count, total, sorted(samples)) for key, (count, total, samples) in self._timings.items()}
+            counters = dict(self._counters)
+        result = {"timings": {}, "counters": {}, "gauges": {}}
+        for (name, labels), (count, total, samples) in sorted(timings.items()):
+            result["timings"].setdefault(name, []).append({
+                **dict(labels),
+                "count": count,
+                "avg_ms": round(total / count * 1000, 1) if count else 0.0,
+                "p50_ms": round(_percentile(samples, 0.5) * 1000, 1),
+                "p95_ms": round(_percentile(samples, 0.95) * 1000, 1),
+            })
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].setdefault(name, []).append({**dict(labels), "value": value})
+        for name, labels, value in self._collected():
+            result["gauges"].setdefault(name, []).append({**dict(labels), "value": value})
+        return result
+
+    def render_prometheus(self, openmetrics=False):
+        """Prometheus metin biçimi (text/plain; version=0.0.4) ya da `openmetrics=True` ile OpenMetrics 1.0.
+
+        Her metrik adı tek `# HELP` / `# TYPE` bloğudur ve tüm örnekleri
+        art arda yazılır. Sayaç ailesi 0.0.4'te `_total` adıyla, OpenMetrics'te
+        eksiz adla bildirilir. Sayaç ya da süre özetiyle çakışan toplayıcı
+        adları `_gauge` eki alır.
+        """
+        with self._lock:
+            timings = {key: (count, total, sorted(samples)) for key, (count, total, samples) in self._timings.items()}
+            counters = dict(self._counters)
+        families = {}  # ad -> (tür, açıklama, örnek satırları); ekleme sırası korunur
+
+        def family(metric, kind, help_text):
+            return families.setdefault(metric, (kind, help_text, []))[2]
+
+        for (name, labels), (count, total, samples) in sorted(timings.items()):
+            metric = f"{self.prefix}_{name}"
+            lines = family(metric, "summary", f"{name} süresi (saniye; p50/p95 son {self.window} ölçümden)")
+            for q in QUANTILES:
+                lines.append(f"{metric}{_label_text(labels + (('quantile', q),))} {_percentile(samples, q):.6f}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{_label_text(labels)} {count}")
+        for (name, labels), value in sorted(counters.items()):
+            metric = f"{self.prefix}_{name}"
+            counter = metric if openmetrics else f"{metric}_total"
+            family(counter, "counter", f"{name} sayacı").append(f"{metric}_total{_label_text(labels)} {value}")
+
+        # Toplayıcı değerleri aynı ada sahip etiket grupları arasında dağılır; ada göre toplanır
+        reserved = set()
+        for metric in families:
+            base = metric[:-len("_total")] if metric.endswith("_total") else metric
+            reserved.update({base, f"{base}_total", f"{base}_sum", f"{base}_count"})
+        for name, labels, value in self._collected():
+            metric = f"{self.prefix}_{name}"
+            if metric in reserved or metric.endswith(("_total", "_sum", "_count", "_created")):
+                metric = f"{metric}_gauge"
+            family(metric, "gauge", f"{name} anlık değeri").append(f"{metric}{_label_text(labels)} {value}")
+        metric = f"{self.prefix}_uptime_seconds"
+        family(metric, "gauge", "sürecin çalışma süresi (saniye)").append(f"{metric} {time.time() - self.started:.1f}")
+
+        output = []
+        for metric, (kind, help_text, lines) in families.items():
+            output.append(f"# HELP {metric} {help_text}")
+            output.append(f"# TYPE {metric} {kind}")
+            output.extend(lines)
+        if openmetrics:
+            output.append("# EOF")
+        return "\n".join(output) + "\n"
+
+
+# Süreç başına tek kayıt: hat aşamaları, istemciler ve uç noktalar paylaşır
+METRICS = Metrics()
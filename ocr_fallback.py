@@ -0,0 +1,75 @@
+import time
+from dataclasses import dataclass, field
+
+import fitz  # PyMuPDF
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_BYTE_BUDGET = 1536 * 1024   # tek istekteki tüm görsellerin toplamı
+DPI_STEPS = (150, 120, 96, 72)      # bütçeye sığana kadar sırayla denenir
+JPEG_QUALITY = 70
+
+
+# ==========================================
+# 🔍 GÖRSEL (OCR) YEDEK YOLU
+# ==========================================
+
+@dataclass
+class VisionPayload:
+    parts: list = field(default_factory=list)   # generate_content'e eklenecek görsel blob'ları
+    pages: list = field(default_factory=list)
+    dpis: list = field(default_factory=list)
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+def _encode_page(page, dpi, mime_type=None):
+    """Sayfayı gri tonlamada işler; `mime_type` verilmezse JPEG ve PNG'den küçük olanı seçer.
+
+    Biçim sayfa içeriğine bağlıdır (taranmış fotoğraf → JPEG, çizgi/metin → PNG),
+    DPI'a değil; bu yüzden sadece ilk adımda ikisi de denenir.
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    if mime_type == "image/png":
+        return mime_type, pix.tobytes("png")
+    jpeg = pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+    if mime_type == "image/jpeg":
+        return mime_type, jpeg
+    png = pix.tobytes("png")
+    if len(png) < len(jpeg):
+        return "image/png", png
+    return "image/jpeg", jpeg
+
+
+def render_for_vision(doc, page_numbers, byte_budget=DEFAULT_BYTE_BUDGET):
+    """Sadece istenen sayfaları, toplam bayt bütçesine sığacak en yüksek DPI'da işler.
+
+    Hangi sayfaların metin katmanı olmadığı `pdf_text.TextResult.empty_pages`
+    ile zaten bilinir; tüm belge rasterlanmaz.
+
+    Bütçe sayfalara eşit bölünür; bir sayfa en düşük DPI'da bile sığmazsa
+    o hâliyle gönderilir (metni kaybetmektense büyük istek daha iyidir).
+    """
+    started = time.perf_counter()
+    payload = VisionPayload()
+    if not page_numbers:
+        return payload
+
+    per_page = byte_budget / len(page_numbers)
+    for number in page_numbers:
+        page = doc[number]
+        mime_type = None
+        for dpi in DPI_STEPS:
+            # İlk adımda seçilen biçim sonraki (düşük DPI) adımlarda tek başına kodlanır
+            mime_type, data = _encode_page(page, dpi, mime_type)
+            if len(data) <= per_page:
+                break
+        payload.parts.append({"mime_type": mime_type, "data": data})
+        payload.pages.append(number)
+        payload.dpis.append(dpi)
+        payload.bytes += len(data)
+
+    payload.seconds = time.perf_counter() - started
+    return payload
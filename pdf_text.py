@@ -0,0 +1,117 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import fitz  # PyMuPDF
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+# Sadece LLM'e gidecek düz metin lazım: ligatür / boşluk koruması ve görsel
+# blokları kapalı, sayfa dışı metin kırpılır.
+LEAN_TEXT_FLAGS = fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_CID_FOR_UNKNOWN_UNICODE
+DEFAULT_MAX_PAGES = 4        # 4 sayfadan sonrası prompt için çoğunlukla gürültü
+DEFAULT_MAX_CHARS = 20000
+EMPTY_PAGE_CHARS = 20        # Bundan az metni olan sayfa "metin katmanı yok" sayılır
+
+
+# ==========================================
+# 📄 METİN ÇIKARMA
+# ==========================================
+
+@dataclass
+class TextResult:
+    text: str
+    page_count: int
+    pages_read: int
+    truncated: bool
+    seconds: float
+    empty_pages: list = field(default_factory=list)  # metin katmanı olmayan sayfalar (0 tabanlı)
+
+    @property
+    def chars(self):
+        return len(self.text)
+
+
+def extract_text(source, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+    """PDF'ten düz metni sayfa/karakter bütçesiyle çıkarır.
+
+    `source` bayt, memoryview veya dosya yolu olabilir. Bütçe dolunca kalan
+    sayfalar hiç okunmaz.
+    """
+    started = time.perf_counter()
+    if isinstance(source, str):
+        doc = fitz.open(source)
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+
+    with doc:
+        page_count = doc.page_count
+        parts = []
+        empty_pages = []
+        total = 0
+        pages_read = 0
+        for page in doc:
+            if max_pages and pages_read >= max_pages:
+                break
+            page_text = page.get_text("text", flags=LEAN_TEXT_FLAGS, sort=False)
+            pages_read += 1
+            if len(page_text.strip()) < EMPTY_PAGE_CHARS:
+                empty_pages.append(page.number)
+            parts.append(page_text)
+            total += len(page_text)
+            if max_chars and total >= max_chars:
+                break
+
+    text = "".join(parts)
+    truncated = pages_read < page_count or (bool(max_chars) and len(text) > max_chars)
+    if max_chars:
+        text = text[:max_chars]
+    return TextResult(text, page_count, pages_read, truncated, time.perf_counter() - started, empty_pages)
+
+
+class TextExtractor:
+    """Metin çıkarma aşaması; `workers > 0` ise belgeler süreç havuzuna dağıtılır.
+
+    fitz çalışırken GIL'i nadiren bırakır; iş parçacığı havuzundaki
+    işçiler bu yüzden çıkarmayı ayrı süreçlere gönderir. Dosya yolu
+    verilirse (yerel PDF deposu) süreçler arası sadece yol taşınır.
+    """
+
+    def __init__(self, workers=0, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.documents = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        self._pool = None
+        if workers:
+            # Streamlit/Flask çok iş parçacıklı; fork yerine spawn güvenli
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def extract(self, source):
+        if self._pool is not None:
+            if isinstance(source, memoryview):
+                source = source.tobytes()
+            result = self._pool.submit(extract_text, source, self.max_pages, self.max_chars).result()
+        else:
+            result = extract_text(source, self.max_pages, self.max_chars)
+        with self._lock:
+            self.documents += 1
+            self.seconds += result.seconds
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "seconds": self.seconds,
+                "avg_ms": (self.seconds / self.documents * 1000) if self.documents else 0.0,
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
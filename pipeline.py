@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from batch_runner import RowResult
+from metrics import METRICS
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_QUEUE_SIZE = 4  # aşamalar arası kuyruk; dolunca önceki aşama bekler (geri basınç)
+
+
+# ==========================================
+# 🧩 AŞAMA VE ADAY
+# ==========================================
+
+@dataclass
+class Stage:
+    """Hattın bir adımı: `func(candidate)` senkron çalışır, False dönerse aday elenir."""
+    name: str
+    func: object
+    concurrency: int = 1
+
+
+@dataclass
+class Candidate:
+    """Hat boyunca taşınan aday; aşamalar ara sonuçları `data` içinde paylaşır."""
+    key: object
+    name: str
+    payload: dict
+    checkpoint: object
+    messages: list = field(default_factory=list)
+    log: list = field(default_factory=list)     # (seviye, metin); arayüz sonradan gösterir
+    data: dict = field(default_factory=dict)
+    ok: bool = True
+    reason: str = ""                            # hata nedeni (ölçüm etiketi; az sayıda sabit değer)
+    done: bool = False                          # iş erken bitti (ör. zaten yüklenmiş), kalan aşamalar atlanır
+    started: float = 0.0
+    _closers: list = field(default_factory=list)
+
+    def notify(self, level, text):
+        self.messages.append(text)
+        self.log.append((level, text))
+
+    def fail(self, text, level="error", reason="rejected"):
+        self.notify(level, text)
+        self.ok = False
+        self.reason = reason
+        return False
+
+    def finish(self):
+        """Adayı başarıyla erken bitirir; sonraki aşamalar çalışmaz."""
+        self.done = True
+        return True
+
+    def on_close(self, func):
+        self._closers.append(func)
+
+    def release(self, *keys):
+        """Sonraki aşamaların ihtiyaç duymadığı ara sonuçları hemen bırakır (kapatılabilirse kapatır)."""
+        for key in keys:
+            value = self.data.pop(key, None)
+            if hasattr(value, "close"):
+                value.close()
+
+    def close(self):
+        for func in reversed(self._closers):
+            try:
+                func()
+            except Exception as e:
+                print(f"⚠️ {self.name} kapatılırken hata: {e}")
+        self._closers.clear()
+        self.data.clear()
+
+
+class StageStats:
+    def __init__(self):
+        self.items = 0
+        self.ok = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.first_start = None
+        self.last_end = None
+
+    def add(self, ok, started, ended):
+        self.items += 1
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+        self.busy_seconds += ended - started
+        self.first_start = started if self.first_start is None else min(self.first_start, started)
+        self.last_end = ended if self.last_end is None else max(self.last_end, ended)
+
+    def as_dict(self):
+        span = (self.last_end - self.first_start) if self.items else 0.0
+        return {
+            "items": self.items,
+            "ok": self.ok,
+            "failed": self.failed,
+            "avg_ms": round(self.busy_seconds / self.items * 1000, 1) if self.items else 0.0,
+            "per_min": round(self.items / span * 60, 2) if span > 0 else 0.0,
+        }
+
+
+# ==========================================
+# 🏭 AŞAMALI HAT
+# ==========================================
+
+class Pipeline:
+    """İndirme → çıkarma → LLM → PDF → yükleme → işaretleme gibi aşamaları akış halinde yürütür.
+
+    Her aşamanın kendi eşzamanlılığı (iş parçacığı havuzu) ve önünde sınırlı
+    bir asyncio kuyruğu vardır: ağ bekleyen aşamalar PDF üretimiyle üst üste
+    biner, yavaş bir aşama önündeki kuyruk dolunca öncekileri durdurur.
+    Aşama fonksiyonları senkron kalır (requests, fitz, Google istemcileri).
+    `JobRunner` işleri `run_batch` ile yürütür.
+    """
+
+    def __init__(self, stages, queue_size=DEFAULT_QUEUE_SIZE, metrics=METRICS, memory_budget=None):
+        self.stages = list(stages)
+        self.queue_size = max(1, int(queue_size))
+        self.metrics = metrics
+        self.memory_budget = memory_budget  # bkz. memory_budget.MemoryBudget; None ise sadece kuyruklar sınırlar
+        self._stats = {stage.name: StageStats() for stage in self.stages}
+        self._stats_lock = threading.Lock()
+
+    def stats(self):
+        """Aşama başına işlenen aday, ortalama süre ve dakikadaki aday sayısı."""
+        with self._stats_lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def run_batch(self, items, on_progress=None):
+        """(key, name, payload, checkpoint) dörtlülerini hattan geçirir; `RowResult` listesi döndürür.
+
+        `on_progress(done, total, result)` çağıran iş parçacığında çalışır.
+        """
+        items = list(items)
+        if not items:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._run(items, on_progress))
+        # Zaten bir olay döngüsü içindeysek (ör. async sunucu) ayrı iş parçacığında yürüt
+        result = []
+        thread = threading.Thread(target=lambda: result.extend(asyncio.run(self._run(items, on_progress))))
+        thread.start()
+        thread.join()
+        return result
+
+    async def _run(self, items, on_progress):
+        loop = asyncio.get_running_loop()
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        pools = [ThreadPoolExecutor(max_workers=max(1, stage.concurrency), thread_name_prefix=f"stage-{stage.name}")
+                 for stage in self.stages]
+        total = len(items)
+        results = []
+        budget = self.memory_budget
+        admitted = [0]
+
+        async def admit():
+            waited = 0.0
+            # Kabul kontrolü bloklamaz; bellek iadesi (gc + malloc_trim) aşama aktarımlarını durdurmasın diye
+            # olay döngüsünde değil iş parçacığında yapılır
+            while not budget.try_admit(reclaim=False):
+                started = time.perf_counter()
+                await loop.run_in_executor(None, budget.reclaim)
+                await asyncio.sleep(budget.poll)
+                waited += time.perf_counter() - started
+            budget.record_wait(waited)
+            admitted[0] += 1
+
+        async def feed():
+            for key, name, payload, checkpoint in items:
+                if budget is not None:
+                    # Bellek bütçesi doluysa yeni aday indirilmeden bekler
+                    await admit()
+                candidate = Candidate(key, name, payload, checkpoint, started=time.perf_counter())
+                await queues[0].put(candidate)
+
+        async def work(index, stage):
+            inbox, outbox, pool = queues[index], queues[index + 1], pools[index]
+            while True:
+                candidate = await inbox.get()
+                if candidate.ok and not candidate.done:
+                    started = time.perf_counter()
+                    try:
+                        if await loop.run_in_executor(pool, stage.func, candidate) is False:
+                            candidate.ok = False
+                    except Exception as e:
+                        candidate.fail(f"❌ {candidate.name} işlenirken hata ({stage.name}): {e}",
+                                       reason=type(e).__name__)
+                    ended = time.perf_counter()
+                    with self._stats_lock:
+                        self._stats[stage.name].add(candidate.ok, started, ended)
+                    if self.metrics is not None:
+                        self.metrics.observe("stage_seconds", ended - started, stage=stage.name)
+                        if not candidate.ok:
+                            self.metrics.inc("failures", stage=stage.name, reason=candidate.reason)
+                await outbox.put(candidate)
+
+        workers = [asyncio.ensure_future(feed())]
+        for index, stage in enumerate(self.stages):
+            workers.extend(asyncio.ensure_future(work(index, stage)) for _ in range(max(1, stage.concurrency)))
+
+        try:
+            while len(results) < total:
+                candidate = await queues[-1].get()
+                candidate.close()
+                if budget is not None:
+                    budget.release()
+                    admitted[0] -= 1
+                result = RowResult(candidate.key, candidate.name, candidate.ok,
+                                   time.perf_counter() - candidate.started, candidate.messages, candidate.log)
+                if self.metrics is not None:
+                    self.metrics.observe("candidate_seconds", result.seconds)
+                    self.metrics.inc("candidates", outcome="ok" if result.ok else "failed")
+                results.append(result)
+                if on_progress:
+                    on_progress(len(results), total, result)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for pool in pools:
+                pool.shutdown(wait=True)
+            if budget is not None:
+                # Yarıda kesilen turda kabul edilmiş ama çıkmamış adayların payı geri verilir
+                for _ in range(admitted[0]):
+                    budget.release()
+        return results
@@ -0,0 +1,190 @@
+import threading
+import time
+
+from metrics import METRICS
+
+# ==========================================
+# ⚙️ VARSAYILAN KOTALAR
+# ==========================================
+
+# Dakikalık değerler; uygulamalar secrets / ortam değişkenleriyle `configure` eder
+DEFAULT_RATE_LIMITS = {
+    "gemini": {"requests_per_min": 15, "tokens_per_min": 1_000_000},  # Flash ücretsiz katman
+    "drive": {"requests_per_min": 600},
+    "sheets": {"requests_per_min": 60},       # kullanıcı başına okuma/yazma kotası
+    "typeform": {"requests_per_min": 120},    # Responses API saniyede 2 istek
+    "typeform_files": {"requests_per_min": 600},  # CV indirmeleri; Responses API kotasını tüketmesin
+}
+
+MIN_RATE_FRACTION = 0.1    # 429 sonrası hız en fazla bu orana iner
+RECOVERY_FRACTION = 0.05   # her başarılı çağrıda hız, kotanın bu kadarı geri kazanılır
+DEFAULT_PENALTY = 5.0      # Retry-After yoksa 429 sonrası bekleme (saniye)
+
+
+def estimate_tokens(text, output_tokens=1024, images=0):
+    """Gemini token tüketimi için kaba tahmin (~4 karakter/token, görsel başına 258 + beklenen yanıt)."""
+    return len(text) // 4 + images * 258 + output_tokens
+
+
+def record_gemini_usage(limit, response, estimated):
+    """Yanıttaki gerçek token sayısıyla tahmin arasındaki farkı kovaya yansıtır."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    if total:
+        limit.record_tokens(total - estimated)
+        METRICS.inc("tokens", total, upstream=limit.name)
+
+
+# ==========================================
+# 🪣 TOKEN KOVASI
+# ==========================================
+
+class TokenBucket:
+    """Dakikada `per_minute` birim dolan, iş parçacıkları arasında paylaşılan kova.
+
+    Kapasite bir dakikalık kotadır; boşta kalan süre birikir ama kotayı aşmaz.
+    Kovanın alabileceğinden büyük istekler (ör. çok uzun bir CV) kova dolunca
+    geçer ve borç olarak düşülür, böylece sonraki çağrılar onu telafi eder.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.per_minute = float(per_minute)
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now, rate):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount, now, rate):
+        """`amount` birim için beklenecek süre; 0 ise hemen alınabilir."""
+        self._refill(now, rate)
+        needed = min(amount, self.capacity) - self._tokens
+        return 0.0 if needed <= 0 else needed * 60.0 / rate
+
+    def take(self, amount):
+        self._tokens -= amount
+
+
+class RateLimit:
+    """Tek bir servis (Gemini, Drive, Sheets, Typeform) için istek ve token kovaları.
+
+    Hız uyarlanır: 429 gelince kova Retry-After süresince kapanır ve hız
+    yarıya iner; başarılı çağrılarla yavaşça yapılandırılan kotaya döner.
+    Tüm işçiler aynı nesneyi paylaştığı için toplam hız kotada kalır.
+    """
+
+    def __init__(self, name, requests_per_min, tokens_per_min=None):
+        self.name = name
+        self.requests = TokenBucket(requests_per_min)
+        self.tokens = TokenBucket(tokens_per_min) if tokens_per_min else None
+        self.scale = 1.0              # uyarlanan hız / yapılandırılan kota
+        self.blocked_until = 0.0
+        self.waited_seconds = 0.0
+        self.calls = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def reconfigure(self, requests_per_min, tokens_per_min=None):
+        with self._lock:
+            self.requests = TokenBucket(requests_per_min)
+            self.tokens = TokenBucket(tokens_per_min) if tokens_per_min else None
+
+    def acquire(self, tokens=0):
+        """Kotada yer açılana kadar bekler; beklenen süreyi döndürür."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = max(0.0, self.blocked_until - now)
+                delay = max(delay, self.requests.wait_time(1, now, self.requests.per_minute * self.scale))
+                if self.tokens is not None and tokens:
+                    delay = max(delay, self.tokens.wait_time(tokens, now, self.tokens.per_minute * self.scale))
+                if delay <= 0:
+                    self.requests.take(1)
+                    if self.tokens is not None and tokens:
+                        self.tokens.take(tokens)
+                    self.calls += 1
+                    self.waited_seconds += waited
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+    def record_tokens(self, extra):
+        """Gerçek token kullanımı tahminden farklıysa farkı kovaya yansıtır."""
+        if self.tokens is None or not extra:
+            return
+        with self._lock:
+            self.tokens.take(extra)
+
+    def on_success(self):
+        if self.scale >= 1.0:
+            return
+        with self._lock:
+            self.scale = min(1.0, self.scale + RECOVERY_FRACTION)
+
+    def on_rate_limited(self, retry_after=None):
+        """429 geldi: Retry-After kadar tüm işçiler durur ve hız düşürülür."""
+        with self._lock:
+            self.rate_limited += 1
+            self.scale = max(MIN_RATE_FRACTION, self.scale / 2)
+            pause = retry_after if retry_after is not None else DEFAULT_PENALTY
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            # Bekleme sonrası herkes aynı anda saldırmasın
+            self.requests._tokens = min(self.requests._tokens, 0.0)
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "rate_limited": self.rate_limited,
+            "waited_seconds": round(self.waited_seconds, 2),
+            "rate_per_min": round(self.requests.per_minute * self.scale, 2),
+        }
+
+
+# ==========================================
+# 🗂️ SERVİS KAYDI
+# ==========================================
+
+class RateLimits:
+    """Servis adına göre paylaşılan `RateLimit` nesneleri."""
+
+    def __init__(self, defaults=None):
+        self._config = {name: dict(values) for name, values in (defaults or DEFAULT_RATE_LIMITS).items()}
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def configure(self, name, requests_per_min=None, tokens_per_min=None):
+        """Kotayı değiştirir; None verilen değer varsayılanda kalır."""
+        with self._lock:
+            config = self._config.setdefault(name, {"requests_per_min": 60})
+            if requests_per_min:
+                config["requests_per_min"] = float(requests_per_min)
+            if tokens_per_min:
+                config["tokens_per_min"] = float(tokens_per_min)
+            limit = self._limits.get(name)
+        # Kovayı tutan istemciler (ör. DownloadClient) aynı nesneyi kullanmaya devam eder
+        if limit is not None:
+            limit.reconfigure(config["requests_per_min"], config.get("tokens_per_min"))
+
+    def get(self, name):
+        with self._lock:
+            limit = self._limits.get(name)
+            if limit is None:
+                config = self._config.get(name, {"requests_per_min": 60})
+                limit = RateLimit(name, config["requests_per_min"], config.get("tokens_per_min"))
+                self._limits[name] = limit
+            return limit
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def stats(self):
+        with self._lock:
+            limits = dict(self._limits)
+        return {name: limit.stats() for name, limit in limits.items()}
+
+
+# Süreç başına tek kayıt: Streamlit oturumları, işçi iş parçacıkları ve Flask istekleri paylaşır
+RATE_LIMITS = RateLimits()
@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from gspread.utils import rowcol_to_a1
+
+from batch_runner import call_with_backoff
+from rate_limit import RATE_LIMITS
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(".cache", "sheet_snapshot.parquet")
+# Artımlı eşitleme mevcut satırlarda sadece Token/IsProcessed'i okur; diğer hücrelerdeki
+# düzeltmeler (ad, CV bağlantısı) en geç bu aralıkla yapılan tam okumada kopyaya gelir
+DEFAULT_FULL_READ_INTERVAL = 60 * 60  # saniye
+
+
+def unique_headers(header):
+    """Tekrarlanan başlıklara `_1`, `_2` ekler (DataFrame sütunları eşsiz olmalı)."""
+    seen = {}
+    result = []
+    for col in header:
+        if col in seen:
+            seen[col] += 1
+            result.append(f"{col}_{seen[col]}")
+        else:
+            seen[col] = 0
+            result.append(col)
+    return result
+
+
+def _column_letter(col):
+    return rowcol_to_a1(1, col)[:-1]
+
+
+def _trimmed(header):
+    # Sheets aralık okumalarında sondaki boş hücreleri kırpar, get_all_values kırpmaz
+    header = list(header)
+    while header and header[-1] == "":
+        header.pop()
+    return header
+
+
+def _column_values(value_range, length):
+    """Tek sütunluk aralığı düz listeye çevirir; Sheets'in kırptığı boş hücreleri doldurur."""
+    values = [row[0] if row else "" for row in value_range]
+    return values + [""] * (length - len(values))
+
+
+# ==========================================
+# 🔄 ARTIMLI SAYFA EŞİTLEME
+# ==========================================
+
+class SheetSync:
+    """Form sayfasının yerel kopyası; her eşitlemede sadece değişen kısım okunur.
+
+    Tek `batch_get` çağrısıyla başlık satırı, (varsa) Token ve IsProcessed
+    sütunları ve son eşitlenen satırdan sonra eklenen satırlar gelir.
+    Başlık değişmişse ya da mevcut satırların token'ları tutmuyorsa (sayfa
+    sıralanmış / satır silinmiş) tam okumaya düşülür. Kopya Parquet olarak
+    diske yazılır; soğuk açılışta Sheets API beklenmeden gösterilir.
+
+    Sınır: mevcut satırların diğer hücrelerindeki elle düzeltmeler (ad, CV
+    bağlantısı) artımlı okumada görülmez. Bunlar bayat kalmasın diye son
+    tam okumanın üzerinden `full_read_interval` saniye geçtiyse eşitleme
+    tam okuma yapar (None / 0: kapalı).
+    """
+
+    def __init__(self, open_worksheet, snapshot_path=DEFAULT_SNAPSHOT_PATH, processed_column=None,
+                 token_column=None, full_read_interval=DEFAULT_FULL_READ_INTERVAL):
+        self.open_worksheet = open_worksheet
+        self.snapshot_path = snapshot_path
+        self.processed_column = processed_column
+        self.token_column = token_column
+        self.full_read_interval = full_read_interval
+        self.header = []
+        self.rows = []
+        self.synced_at = 0.0
+        self.full_read_at = 0.0
+        self.api_calls = 0
+        self.full_reads = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._background = None
+        self._load_snapshot()
+
+    # --- Yerel kopya ---
+
+    @property
+    def has_snapshot(self):
+        return bool(self.header)
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            table = pq.read_table(self.snapshot_path)
+            meta = json.loads(table.schema.metadata[b"sheet_sync"])
+            columns = [table.column(i).to_pylist() for i in range(table.num_columns)]
+            self.header = meta["header"]
+            self.rows = [list(row) for row in zip(*columns)] if columns else []
+            self.synced_at = meta["synced_at"]
+            # Bu alan yokken yazılmış kopyalar ilk eşitlemede bir kez tam okunur
+            self.full_read_at = meta.get("full_read_at", 0.0)
+        except Exception as e:
+            # Bozuk kopya: ilk eşitlemede tam okuma yapılır
+            print(f"⚠️ Sayfa kopyası okunamadı, tam okuma yapılacak: {e}")
+            self.header, self.rows, self.synced_at, self.full_read_at = [], [], 0.0, 0.0
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        folder = os.path.dirname(self.snapshot_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._lock:
+            header, rows, synced_at = list(self.header), [list(r) for r in self.rows], self.synced_at
+            full_read_at = self.full_read_at
+        table = pa.table({f"c{i}": pa.array([row[i] for row in rows], pa.string()) for i in range(len(header))})
+        table = table.replace_schema_metadata(
+            {"sheet_sync": json.dumps({"header": header, "synced_at": synced_at, "full_read_at": full_read_at},
+                                      ensure_ascii=False)})
+        # Streamlit ve Flask aynı kopyayı paylaşabilir; geçici dosya süreç başına ayrı
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        pq.write_table(table, temp_path, compression="zstd")
+        os.replace(temp_path, self.snapshot_path)
+
+    def _normalise(self, row):
+        width = len(self.header)
+        return (list(row) + [""] * width)[:width]
+
+    # --- Eşitleme ---
+
+    def _column_index(self, name):
+        return self.header.index(name) if name and name in self.header else None
+
+    def _full_read(self, worksheet):
+        data = call_with_backoff(worksheet.get_all_values, limit=RATE_LIMITS["sheets"])
+        self.api_calls += 1
+        self.full_reads += 1
+        with self._lock:
+            self.header = data[0] if data else []
+            self.rows = [self._normalise(row) for row in data[1:]]
+            self.full_read_at = time.time()
+        return {"full": True, "new_rows": len(data) - 1 if data else 0, "patched": 0}
+
+    def sync(self, max_age=0):
+        """Kopyayı sayfayla eşitler; `max_age` saniyeden tazeyse API'ye hiç gitmez."""
+        with self._sync_lock:
+            if max_age and self.has_snapshot and time.time() - self.synced_at < max_age:
+                return {"full": False, "new_rows": 0, "patched": 0}
+
+            worksheet = self.open_worksheet()
+            if not self.has_snapshot or self._full_read_due():
+                result = self._full_read(worksheet)
+            else:
+                result = self._incremental_read(worksheet)
+
+            self.synced_at = time.time()
+            self._save_snapshot()
+            return result
+
+    def _full_read_due(self):
+        return bool(self.full_read_interval) and time.time() - self.full_read_at >= self.full_read_interval
+
+    def _incremental_read(self, worksheet):
+        count = len(self.rows)
+        last_col = _column_letter(len(self.header))
+        ranges = ["1:1", f"A{count + 2}:{last_col}"]
+        tracked = []
+        for name in (self.token_column, self.processed_column):
+            index = self._column_index(name)
+            if index is not None and count:
+                letter = _column_letter(index + 1)
+                ranges.append(f"{letter}2:{letter}{count + 1}")
+                tracked.append(index)
+
+        values = call_with_backoff(worksheet.batch_get, ranges, limit=RATE_LIMITS["sheets"])
+        self.api_calls += 1
+        header = values[0][0] if values[0] else []
+        if _trimmed(header) != _trimmed(self.header):
+            return self._full_read(worksheet)
+
+        columns = {index: _column_values(value_range, count) for index, value_range in zip(tracked, values[2:])}
+        token_index = self._column_index(self.token_column)
+        if token_index in columns:
+            # Satırlar yer değiştirdiyse artımlı yama güvenli değil
+            if any(row[token_index] != token for row, token in zip(self.rows, columns[token_index])):
+                return self._full_read(worksheet)
+
+        patched = 0
+        processed_index = self._column_index(self.processed_column)
+        with self._lock:
+            if processed_index in columns:
+                for row, value in zip(self.rows, columns[processed_index]):
+                    if row[processed_index] != value:
+                        row[processed_index] = value
+                        patched += 1
+            new_rows = [self._normalise(row) for row in values[1]]
+            self.rows.extend(new_rows)
+        return {"full": False, "new_rows": len(new_rows), "patched": patched}
+
+    def sync_in_background(self, max_age=0):
+        """Eşitlemeyi arka planda başlatır; çağıran mevcut kopyayla hemen devam eder."""
+        if self._background is not None and self._background.is_alive():
+            return False
+
+        def run():
+            try:
+                self.sync(max_age)
+            except Exception as e:
+                print(f"⚠️ Arka plan sayfa eşitlemesi başarısız: {e}")
+
+        self._background = threading.Thread(target=run, name="sheet-sync", daemon=True)
+        self._background.start()
+        return True
+
+    def mark_processed(self, sheet_row, value="Yes"):
+        """Bizim yazdığımız IsProcessed hücresini kopyada da günceller (yeniden okumadan)."""
+        index = self._column_index(self.processed_column)
+        if index is None:
+            return
+        with self._lock:
+            position = int(sheet_row) - 2
+            if 0 <= position < len(self.rows):
+                self.rows[position][index] = value
+
+    # --- Okuma ---
+
+    def values(self):
+        """`get_all_values` biçiminde (başlık + satırlar) kopya."""
+        with self._lock:
+            return [list(self.header)] + [list(row) for row in self.rows]
+
+    def dataframe(self):
+        with self._lock:
+            if not self.header:
+                return pd.DataFrame()
+            return pd.DataFrame([list(row) for row in self.rows], columns=unique_headers(self.header))
+
+    def stats(self):
+        return {
+            "rows": len(self.rows),
+            "api_calls": self.api_calls,
+            "full_reads": self.full_reads,
+            "synced_at": self.synced_at,
+            "full_read_at": self.full_read_at,
+        }
@@ -0,0 +1,120 @@
+import threading
+
+from gspread.utils import rowcol_to_a1
+
+from batch_runner import call_with_backoff
+from rate_limit import RATE_LIMITS
+
+
+# ==========================================
+# 📝 TOPLU "IsProcessed" YAZIMI
+# ==========================================
+
+class ProcessedWriteBack:
+    """İşlenen satırları biriktirip tek `batch_update` ile Sheets'e yazar.
+
+    Satır numaraları `load_data` sırasında zaten bilindiği için `find` /
+    `row_values` çağrısına gerek yoktur. Kuyruk `flush_every` satırda bir veya
+    en geç `flush_interval` saniyede bir boşaltılır; `close()` (veya `with`
+    bloğunun sonu) kalanları yazar.
+
+    `token_col` verilirse yazmadan önce token hücreleri tek `batch_get` ile
+    doğrulanır; sayfa bu arada sıralandıysa eşleşmeyen satırlar yazılmaz ve
+    `on_mismatch(token, key)` ile yavaş yola devredilir. `on_written(key)`
+    her başarıyla yazılan satır için çağrılır (ör. iş tablosunda `marked`).
+    `key` satırın iş tablosundaki anahtarıdır; verilmezse token kullanılır
+    (token'sız satırlar da böylece işaretlenebilir).
+    """
+
+    def __init__(self, worksheet, processed_col, token_col=None, flush_every=25, flush_interval=10.0,
+                 value="Yes", on_mismatch=None, on_written=None):
+        self.worksheet = worksheet
+        self.processed_col = processed_col
+        self.token_col = token_col
+        self.flush_every = max(1, int(flush_every))
+        self.flush_interval = flush_interval
+        self.value = value
+        self.on_mismatch = on_mismatch
+        self.on_written = on_written
+        self.written = 0
+        self.api_calls = 0
+
+        self._pending = []  # (satır, token, anahtar)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+        if flush_interval:
+            self._timer = threading.Thread(target=self._run_timer, daemon=True)
+            self._timer.start()
+
+    def mark(self, row, token=None, key=None):
+        with self._lock:
+            self._pending.append((int(row), token, token if key is None else key))
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def _run_timer(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ IsProcessed toplu yazımı başarısız: {e}")
+
+    def _verified(self, batch):
+        if not self.token_col:
+            return batch, []
+        ranges = [rowcol_to_a1(row, self.token_col) for row, _, _ in batch]
+        values = call_with_backoff(self.worksheet.batch_get, ranges, limit=RATE_LIMITS["sheets"])
+        self.api_calls += 1
+        ok, mismatched = [], []
+        for (row, token, key), cell in zip(batch, values):
+            current = cell[0][0] if cell and cell[0] else ""
+            if token is None or str(current).strip() == str(token).strip():
+                ok.append((row, token, key))
+            else:
+                mismatched.append((token, key))
+        return ok, mismatched
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            try:
+                ok, mismatched = self._verified(batch)
+                if ok:
+                    call_with_backoff(self.worksheet.batch_update, [
+                        {'range': rowcol_to_a1(row, self.processed_col), 'values': [[self.value]]}
+                        for row, _, _ in ok
+                    ], limit=RATE_LIMITS["sheets"])
+                    self.api_calls += 1
+                    self.written += len(ok)
+            except Exception:
+                # Yazılamayanları kaybetmeyelim, bir sonraki flush'ta tekrar denensin
+                with self._lock:
+                    self._pending = batch + self._pending
+                raise
+
+        if self.on_written:
+            for _, _, key in ok:
+                self.on_written(key)
+        for token, key in mismatched:
+            if self.on_mismatch:
+                self.on_mismatch(token, key)
+        return len(ok)
+
+    def close(self):
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
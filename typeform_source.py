@@ -0,0 +1,186 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from metrics import METRICS
+
+# ==========================================
+# ⚙️ AYARLAR
+# ==========================================
+
+TYPEFORM_API = "https://api.typeform.com"
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000             # Typeform'un izin verdiği en büyük sayfa
+DEFAULT_CURSOR_PATH = os.path.join(".cache", "typeform_cursor.json")
+
+
+# ==========================================
+# 📨 TYPEFORM YANITLARI
+# ==========================================
+
+@dataclass
+class Submission:
+    token: str
+    name: str
+    submitted_at: str
+    file_urls: list = field(default_factory=list)
+    answers: dict = field(default_factory=dict)  # alan ref/id -> değer
+
+
+def _answer_value(answer):
+    kind = answer.get("type")
+    value = answer.get(kind)
+    if kind == "choice":
+        return (value or {}).get("label", "")
+    if kind == "choices":
+        return ", ".join((value or {}).get("labels", []))
+    return value
+
+
+def parse_response(item, name_field=None):
+    """Responses API kaydını `Submission`'a çevirir; dosya alanları doğrudan indirme URL'si olur."""
+    answers = {}
+    file_urls = []
+    first_text = ""
+    for answer in item.get("answers") or []:
+        field_info = answer.get("field") or {}
+        value = _answer_value(answer)
+        for key in (field_info.get("ref"), field_info.get("id")):
+            if key:
+                answers[key] = value
+        if answer.get("type") == "file_url" and value:
+            file_urls.append(value)
+        elif answer.get("type") == "text" and value and not first_text:
+            first_text = value
+
+    name = answers.get(name_field) if name_field else None
+    return Submission(
+        token=item.get("token") or item.get("response_id"),
+        name=str(name or first_text or item.get("token")),
+        submitted_at=item.get("submitted_at", ""),
+        file_urls=file_urls,
+        answers=answers,
+    )
+
+
+def sign_payload(secret, body):
+    """Typeform'un webhook imzası: `sha256=` + base64(HMAC-SHA256(secret, ham gövde))."""
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).digest()
+    return "sha256=" + base64.b64encode(digest).decode("ascii")
+
+
+def verify_signature(secret, body, signature):
+    """`Typeform-Signature` başlığını ham gövdeyle doğrular (sabit zamanlı karşılaştırma)."""
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+class TypeformSource:
+    """Form yanıtlarını Responses API'den sayfa sayfa, sadece yenileri olacak şekilde çeker.
+
+    İmleç (son `submitted_at` ve o anki token) diske yazılır. Typeform
+    `after` parametresinin `sort` ile birlikte kullanılmasına izin vermez;
+    bu yüzden `since` + `sort=submitted_at,asc` ile ilerlenir ve aynı
+    saniyedeki sınır kayıtları token ile elenir.
+    """
+
+    def __init__(self, session, access_token, form_id, base_url=TYPEFORM_API, page_size=DEFAULT_PAGE_SIZE,
+                 cursor_path=DEFAULT_CURSOR_PATH, name_field=None, timeout=30, rate_limit=None):
+        self.session = session
+        self.access_token = access_token
+        self.form_id = form_id
+        self.base_url = base_url.rstrip("/")
+        self.page_size = int(page_size)
+        self.cursor_path = cursor_path
+        self.name_field = name_field
+        self.timeout = timeout
+        self.rate_limit = rate_limit
+        self.api_calls = 0
+        self._lock = threading.Lock()
+
+    # --- İmleç ---
+
+    def load_cursor(self):
+        if not self.cursor_path or not os.path.exists(self.cursor_path):
+            return {}
+        with open(self.cursor_path, encoding="utf-8") as f:
+            return json.load(f).get(self.form_id, {})
+
+    def save_cursor(self, cursor):
+        """İmleci kalıcı yapar; yanıtlar işe eklendikten sonra çağrılmalı."""
+        if not self.cursor_path:
+            return
+        with self._lock:
+            data = {}
+            if os.path.exists(self.cursor_path):
+                with open(self.cursor_path, encoding="utf-8") as f:
+                    data = json.load(f)
+            data[self.form_id] = cursor
+            folder = os.path.dirname(self.cursor_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            temp_path = f"{self.cursor_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.cursor_path)
+
+    # --- Sayfalama ---
+
+    def _get_page(self, since, page_size):
+        params = {"page_size": page_size, "completed": "true", "sort": "submitted_at,asc"}
+        if since:
+            params["since"] = since
+        # Oturum (DownloadClient.session) 429/5xx'te Retry-After'a uyarak kendisi yeniden dener
+        if self.rate_limit is not None:
+            self.rate_limit.acquire()
+        started = time.perf_counter()
+        resp = self.session.get(f"{self.base_url}/forms/{self.form_id}/responses", params=params,
+                                headers={"Authorization": f"Bearer {self.access_token}"}, timeout=self.timeout)
+        self.api_calls += 1
+        METRICS.observe("api_seconds", time.perf_counter() - started, upstream="typeform_api")
+        METRICS.inc("api_calls", upstream="typeform_api", outcome="ok" if resp.ok else "error")
+        METRICS.inc("bytes", len(resp.content), direction="in", upstream="typeform_api")
+        resp.raise_for_status()
+        return resp.json().get("items") or []
+
+    def fetch_new(self, cursor=None):
+        """İmleçten sonraki tüm yanıtları döndürür: (submissions, yeni_imleç).
+
+        İmleç otomatik kaydedilmez; çağıran yanıtları kalıcı olarak
+        kuyruğa aldıktan sonra `save_cursor` çağırmalı (yoksa yanıt kaybolabilir).
+        """
+        cursor = dict(self.load_cursor() if cursor is None else cursor)
+        since = cursor.get("since")
+        seen = set(cursor.get("tokens_at_since", []))
+        submissions = []
+        page_size = self.page_size
+        while True:
+            items = self._get_page(since, page_size)
+            fresh = [item for item in items if item.get("token") not in seen]
+            if not fresh:
+                if len(items) == page_size and page_size < MAX_PAGE_SIZE:
+                    # Sayfanın tamamı aynı saniyede ve zaten görülmüş; daha geniş sayfayla bakalım
+                    page_size = min(MAX_PAGE_SIZE, page_size * 2)
+                    continue
+                break
+            for item in fresh:
+                submissions.append(parse_response(item, self.name_field))
+            last = fresh[-1]["submitted_at"]
+            # Aynı saniyede gönderilmiş yanıtlar bir sonraki `since` sorgusunda tekrar gelir
+            if last != since:
+                seen = set()
+            seen.update(item["token"] for item in fresh if item["submitted_at"] == last)
+            since = last
+            if len(items) < page_size:
+                break
+
+        if since:
+            cursor = {"since": since, "tokens_at_since": sorted(seen), "after": submissions[-1].token
+                      if submissions else cursor.get("after")}
+        return submissions, cursor